@@ -0,0 +1 @@
+"""Performance benchmarks for fate_core / gml. Run modules with `python -m benchmarks.<name>`."""
@@ -0,0 +1,139 @@
+"""
+Cold-start cost of `fate-cli`: `python -X importtime` import profile of gml.cli
+plus wall time of common commands, each run in a fresh interpreter.
+
+    python -m benchmarks.cli_startup --repeat 7 --budget-ms 250 --json startup.json
+
+Exits non-zero when a command's median exceeds the budget or when a module that
+should stay lazy (e.g. openpyxl) is imported at startup.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+COMMANDS = {
+    "help": ["--help"],
+    "stats_today": ["stats", "today"],
+    "stats_week": ["stats", "week"],
+    "task_list": ["task", "list"],
+}
+# must not be imported unless an export subcommand runs
+LAZY_MODULES = ("openpyxl", "gml.export_xlsx", "gml.export_csv", "csv")
+
+
+def import_profile(module: str = "gml.cli", env: dict | None = None) -> dict:
+    """Parse `-X importtime` output: total time, heaviest top-level imports, module set."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    rows = []  # (name, depth, cumulative_us), in output order (children before parents)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line.split("|", 2)
+        name = name.rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2  # one space after "|", two per level
+        rows.append((name.strip(), depth, int(cumulative_us)))
+    # only what `import module` pulled in, not interpreter startup (site, .pth hooks)
+    start = max((i + 1 for i, (name, depth, _) in enumerate(rows) if name == "site" and depth == 0), default=0)
+    rows = rows[start:]
+    names = {name for name, _, _ in rows}
+    target = next((cum for name, depth, cum in rows if name == module and depth == 0), 0)
+    heaviest = sorted(
+        ((name, cum) for name, depth, cum in rows if depth == 1),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:10]
+    return {
+        "module": module,
+        "cumulative_ms": round(target / 1000, 2),
+        "heaviest": [{"module": name, "cumulative_ms": round(us / 1000, 2)} for name, us in heaviest],
+        "lazy_violations": sorted(m for m in LAZY_MODULES if m in names),
+    }
+
+
+def command_latency(argv: list[str], repeat: int, env: dict) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "gml.cli", *argv],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            check=True,
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "argv": argv,
+        "min_ms": round(min(samples), 2),
+        "median_ms": round(statistics.median(samples), 2),
+    }
+
+
+def baseline_ms(repeat: int, env: dict) -> float:
+    """Bare interpreter start, to read command numbers against."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], env=env, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 2)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--budget-ms", type=float, default=250.0, help="max median wall time per command")
+    ap.add_argument("--json", type=str, default=None, help="also write results to this file")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, FATE_DB=str(Path(tmp) / "fate.db"), HOME=tmp)
+        subprocess.run(
+            [sys.executable, "-m", "gml.cli", "init", "--seed"],
+            stdout=subprocess.DEVNULL,
+            env=env,
+            check=True,
+        )
+        report = {
+            "budget_ms": args.budget_ms,
+            "python_start_ms": baseline_ms(args.repeat, env),
+            "imports": import_profile(env=env),
+            "commands": {name: command_latency(argv, args.repeat, env) for name, argv in COMMANDS.items()},
+        }
+
+    imports = report["imports"]
+    print(f"python startup: {report['python_start_ms']} ms")
+    print(f"import gml.cli: {imports['cumulative_ms']} ms")
+    for item in imports["heaviest"][:5]:
+        print(f"  {item['module']:<32} {item['cumulative_ms']:>8} ms")
+    print(f"{'command':<14} {'min ms':>9} {'median ms':>10}")
+    over = []
+    for name, r in report["commands"].items():
+        flag = "  OVER BUDGET" if r["median_ms"] > args.budget_ms else ""
+        print(f"{name:<14} {r['min_ms']:>9} {r['median_ms']:>10}{flag}")
+        if flag:
+            over.append(name)
+    if imports["lazy_violations"]:
+        print(f"imported at startup but should be lazy: {', '.join(imports['lazy_violations'])}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 1 if over or imports["lazy_violations"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,132 @@
+"""
+Concurrent read/write throughput on one SQLite file: rollback journal vs WAL.
+
+One writer process appends gml logs (one transaction each) while N reader
+processes run the `stats today` aggregate, all for a fixed duration.
+
+    python -m benchmarks.sqlite_concurrency --seconds 3 --readers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from fate_core.connection import connect
+from gml import db
+
+READ_SQL = """
+    SELECT t.domain AS domain, COUNT(*) AS n, COALESCE(SUM(l.minutes), 0) AS mins
+    FROM logs l
+    JOIN tasks t ON t.id = l.task_id
+    WHERE l.date = ?
+    GROUP BY t.domain
+"""
+
+
+def _open(path: Path, mode: str, read_only: bool) -> sqlite3.Connection:
+    if mode == "wal":
+        return connect(path, read_only=read_only)
+    # baseline: what both layers did before (default rollback journal, default pragmas)
+    return sqlite3.connect(str(path), timeout=5)
+
+
+def _writer(path: Path, mode: str, seconds: float, out: mp.Queue) -> None:
+    conn = _open(path, mode, read_only=False)
+    commits = busy = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            conn.execute(
+                "INSERT INTO logs(ts,date,task_id,minutes,xp,notes) VALUES(?,?,?,?,?,?)",
+                (db.now_ts(), "2026-01-01", "B001", 20, 0, ""),
+            )
+            conn.commit()
+            commits += 1
+        except sqlite3.OperationalError:
+            conn.rollback()
+            busy += 1
+    conn.close()
+    out.put(("write", commits, busy))
+
+
+def _reader(path: Path, mode: str, seconds: float, out: mp.Queue) -> None:
+    conn = _open(path, mode, read_only=True)
+    reads = busy = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            conn.execute(READ_SQL, ("2026-01-01",)).fetchall()
+            reads += 1
+        except sqlite3.OperationalError:
+            busy += 1
+    conn.close()
+    out.put(("read", reads, busy))
+
+
+def _prepare(path: Path, mode: str, rows: int) -> None:
+    conn = sqlite3.connect(str(path))
+    conn.execute(f"PRAGMA journal_mode = {'WAL' if mode == 'wal' else 'DELETE'}")
+    conn.executescript(db.SCHEMA)
+    conn.execute(
+        "INSERT INTO tasks(id,name,domain,cadence,default_minutes,default_xp,active,created_at) "
+        "VALUES('B001','Walk','BODY','daily',20,0,1,?)",
+        (db.now_ts(),),
+    )
+    conn.executemany(
+        "INSERT INTO logs(ts,date,task_id,minutes,xp,notes) VALUES(?,?,?,?,?,?)",
+        [(db.now_ts(), f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}", "B001", 20, 0, "") for i in range(rows)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def run(mode: str, seconds: float, readers: int, rows: int, workdir: Path) -> dict:
+    path = workdir / f"bench_{mode}.db"
+    _prepare(path, mode, rows)
+    out: mp.Queue = mp.Queue()
+    procs = [mp.Process(target=_writer, args=(path, mode, seconds, out))]
+    procs += [mp.Process(target=_reader, args=(path, mode, seconds, out)) for _ in range(readers)]
+    for p in procs:
+        p.start()
+    results = [out.get() for _ in procs]
+    for p in procs:
+        p.join()
+    writes = sum(n for kind, n, _ in results if kind == "write")
+    reads = sum(n for kind, n, _ in results if kind == "read")
+    return {
+        "mode": mode,
+        "seconds": seconds,
+        "readers": readers,
+        "writes_per_s": round(writes / seconds, 1),
+        "reads_per_s": round(reads / seconds, 1),
+        "write_busy": sum(b for kind, _, b in results if kind == "write"),
+        "read_busy": sum(b for kind, _, b in results if kind == "read"),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--readers", type=int, default=4)
+    ap.add_argument("--rows", type=int, default=20000, help="pre-existing log rows")
+    ap.add_argument("--json", type=str, default=None, help="also write results to this file")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [run(mode, args.seconds, args.readers, args.rows, Path(tmp)) for mode in ("rollback", "wal")]
+
+    print(f"{'mode':<9} {'writes/s':>9} {'reads/s':>9} {'w_busy':>7} {'r_busy':>7}")
+    for r in results:
+        print(f"{r['mode']:<9} {r['writes_per_s']:>9} {r['reads_per_s']:>9} {r['write_busy']:>7} {r['read_busy']:>7}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
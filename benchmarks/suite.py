@@ -0,0 +1,143 @@
+"""
+Timed scenarios over a synthetic DB (see benchmarks.synthetic):
+compute_streak, the Today page's data loading, `fate stats week` and both exporters.
+
+    python -m benchmarks.suite --years 3 --repeat 5 --json bench.json
+
+Cold runs clear the fate_core read cache and stored perfect days first; warm runs hit them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sqlite3
+import statistics
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable
+
+from fate_core import cache, crud, profiles, rules
+from fate_core import db as core_db
+from fate_core.storage import get_storage
+
+from .synthetic import SynthConfig, build_app_db, build_gml_db
+
+
+def timed(func: Callable[[], object], repeat: int, before: Callable[[], None] | None = None) -> dict:
+    samples = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "repeat": repeat,
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+def today_page_data(day: str) -> None:
+    """The reads today_page issues on a render (no Streamlit)."""
+    all_habits = crud.list_habits(active_only=True)
+    rules.list_scheduled_habits(day)
+    rules.cooldown_due_dates(day)
+    crud.get_habit_logs(day, [habit["id"] for habit in all_habits])
+    rules.compute_perfect_day(day)
+    rules.compute_streak(day)
+    for line in crud.list_lines(active_only=True):
+        rules.get_next_quest(line["id"])
+    crud.list_evidence_types(active_only=True)
+    rules.compute_effort_xp(day)
+    rules.compute_skill_xp(day)
+
+
+def cold() -> None:
+    """Drop the read cache and the stored perfect days (queued behind any pending stores)."""
+    cache.clear()
+    get_storage(core_db.current_db_path()).write(lambda conn: conn.execute("DELETE FROM perfect_days"))
+
+
+def scenarios(cfg: SynthConfig, app_db: Path, gml_path: Path, workdir: Path) -> dict[str, tuple]:
+    from gml import cli
+    from gml.export_csv import export_csv_bundle
+    from gml.export_xlsx import export_xlsx
+
+    day = cfg.end
+
+    def stats_week() -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            cli.cmd_stats(["week", "--db", str(gml_path), "--date", day])
+
+    return {
+        "compute_streak.cold": (lambda: rules.compute_streak(day), cold),
+        "compute_streak.warm": (lambda: rules.compute_streak(day), None),
+        "today_page_data.cold": (lambda: today_page_data(day), cold),
+        "today_page_data.warm": (lambda: today_page_data(day), None),
+        "gml.stats_week": (stats_week, None),
+        "gml.export_xlsx": (
+            lambda: export_xlsx(db_path=gml_path, out_path=workdir / "out.xlsx"),
+            None,
+        ),
+        "gml.export_csv": (
+            lambda: export_csv_bundle(db_path=gml_path, out_dir=workdir / "csv", overwrite=True),
+            None,
+        ),
+    }
+
+
+def run(cfg: SynthConfig, repeat: int, only: list[str] | None, workdir: Path) -> dict:
+    app_db, gml_path = workdir / "app.db", workdir / "gml.db"
+    start = time.perf_counter()
+    rows = {"app": build_app_db(app_db, cfg), "gml": build_gml_db(gml_path, cfg)}
+    generate_s = time.perf_counter() - start
+    results = {}
+    with profiles.using_db(app_db):
+        for name, (func, before) in scenarios(cfg, app_db, gml_path, workdir).items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            results[name] = timed(func, repeat, before)
+    return {
+        "config": asdict(cfg),
+        "rows": rows,
+        "generate_s": round(generate_s, 2),
+        "env": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", nargs="*", default=None, help="scenario name prefixes")
+    ap.add_argument("--json", type=str, default=None, help="also write results to this file")
+    for field, value in asdict(SynthConfig()).items():
+        ap.add_argument(f"--{field.replace('_', '-')}", type=type(value), default=value)
+    args = ap.parse_args()
+    cfg = SynthConfig(**{field: getattr(args, field) for field in asdict(SynthConfig())})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = run(cfg, args.repeat, args.only, Path(tmp))
+
+    print(f"rows: {report['rows']}  (generated in {report['generate_s']}s)")
+    print(f"{'scenario':<24} {'min ms':>10} {'median ms':>10} {'mean ms':>10}")
+    for name, r in report["results"].items():
+        print(f"{name:<24} {r['min_ms']:>10} {r['median_ms']:>10} {r['mean_ms']:>10}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
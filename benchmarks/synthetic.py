@@ -0,0 +1,229 @@
+"""
+Seeded synthetic data for benchmarks: a fate_core app DB (habits with mixed
+schedules, years of habit_logs, lines, quests, completions) and a gml DB
+(tasks and logs). The same seed and sizes always produce the same rows.
+
+    python -m benchmarks.synthetic --out /tmp/bench --years 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+from fate_core import db as core_db
+from fate_core import profiles
+from fate_core.storage import get_storage
+from gml import db as gml_db
+
+SCHEDULE_TYPES = ("always", "weekly", "interval", "cooldown")
+GROUPS = ("growth", "health", "maintenance")
+WORDS = (
+    "parser refactor review notes run walk stretch read write budget plan fix test "
+    "deploy draft outline meeting garden clean cook sleep focus 复盘 跑步 阅读 写作"
+).split()
+
+
+@dataclass
+class SynthConfig:
+    seed: int = 42
+    end: str = "2026-01-31"
+    years: int = 3
+    habits: int = 24
+    log_rate: float = 0.85
+    streak_days: int = 120
+    lines: int = 12
+    quests_per_line: int = 150
+    chapters_per_line: int = 10
+    completed_share: float = 0.6
+    gml_tasks: int = 16
+    gml_logs_per_day: int = 4
+
+    @property
+    def end_date(self) -> date:
+        return date.fromisoformat(self.end)
+
+    @property
+    def start_date(self) -> date:
+        return self.end_date - timedelta(days=365 * self.years - 1)
+
+    def days(self) -> list[date]:
+        start = self.start_date
+        return [start + timedelta(days=i) for i in range((self.end_date - start).days + 1)]
+
+
+def _note(rng: random.Random, words: int = 6) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _schedule(rng: random.Random, habit_id: int, cfg: SynthConfig) -> tuple:
+    kind = SCHEDULE_TYPES[habit_id % len(SCHEDULE_TYPES)]
+    weekly = interval = anchor = cooldown = None
+    if kind == "weekly":
+        weekly = ",".join(str(d) for d in sorted(rng.sample(range(7), rng.randint(2, 5))))
+    elif kind == "interval":
+        interval = rng.randint(2, 4)
+        anchor = cfg.start_date.isoformat()
+    elif kind == "cooldown":
+        cooldown = rng.randint(1, 3)
+    return (habit_id, kind, weekly, interval, anchor, cooldown)
+
+
+def build_app_db(path: Path, cfg: SynthConfig) -> dict:
+    """Create (or extend) the fate_core DB at `path`; returns row counts."""
+    # like a profile: callers reading it back (benchmarks.suite) wrap their calls in the same using_db
+    with profiles.using_db(path):
+        core_db.init_db()
+        return _fill_app_db(cfg)
+
+
+def _fill_app_db(cfg: SynthConfig) -> dict:
+    rng = random.Random(cfg.seed)
+    counts = {}
+    with get_storage(core_db.current_db_path()).connection() as conn:
+        habits = [
+            (
+                f"Habit {i}",
+                GROUPS[i % len(GROUPS)],
+                "min",
+                "normal",
+                rng.randint(1, 3),
+                rng.randint(3, 8),
+                1,
+                i,
+            )
+            for i in range(cfg.habits)
+        ]
+        conn.executemany(
+            """
+            INSERT INTO habits (name, "group", min_desc, normal_desc, min_xp, normal_xp, active, sort_order)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            habits,
+        )
+        habit_ids = [row[0] for row in conn.execute("SELECT id FROM habits ORDER BY id")]
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO habit_schedules
+                (habit_id, schedule_type, weekly_days, interval_days, anchor_date, cooldown_days)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [_schedule(rng, habit_id, cfg) for habit_id in habit_ids],
+        )
+        # schedule history dates the habits from today; backdate them to the first synthetic day
+        conn.execute(
+            "UPDATE habit_schedule_history SET valid_from = ? WHERE valid_to IS NULL",
+            (cfg.start_date.isoformat(),),
+        )
+
+        streak_from = cfg.end_date - timedelta(days=cfg.streak_days)
+        logs = []
+        for day in cfg.days():
+            always = day > streak_from
+            for habit_id in habit_ids:
+                if always or rng.random() < cfg.log_rate:
+                    status = "normal" if rng.random() < 0.6 else "min"
+                    note = _note(rng) if rng.random() < 0.15 else None
+                    logs.append((day.isoformat(), habit_id, status, rng.randint(5, 60), note))
+        conn.executemany(
+            "INSERT OR IGNORE INTO habit_logs (date, habit_id, status, minutes, note) VALUES (?, ?, ?, ?, ?)",
+            logs,
+        )
+        counts["habit_logs"] = len(logs)
+
+        days = cfg.days()
+        completions = 0
+        for line_idx in range(cfg.lines):
+            cur = conn.execute(
+                "INSERT INTO lines (name, type, ultimate_goal, active, sort_order) VALUES (?, ?, ?, 1, ?)",
+                (f"Line {line_idx}", "main" if line_idx % 3 else "side", _note(rng), line_idx),
+            )
+            line_id = cur.lastrowid
+            done = int(cfg.quests_per_line * cfg.completed_share)
+            for order_idx in range(1, cfg.quests_per_line + 1):
+                chapter = f"Chapter {1 + (order_idx - 1) * cfg.chapters_per_line // cfg.quests_per_line}"
+                cur = conn.execute(
+                    """
+                    INSERT INTO quests (line_id, chapter, order_idx, title, dod, difficulty, is_boss, active)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+                    """,
+                    (line_id, chapter, order_idx, f"Quest {order_idx}", "", rng.randint(1, 5),
+                     1 if order_idx % 25 == 0 else 0),
+                )
+                if order_idx <= done:
+                    day = days[min(len(days) - 1, order_idx * len(days) // (done + 1))]
+                    conn.execute(
+                        """
+                        INSERT INTO quest_completions
+                            (date, quest_id, minutes, evidence_type, evidence_text, evidence_ref, created_at)
+                        VALUES (?, ?, ?, 'note', ?, ?, ?)
+                        """,
+                        (day.isoformat(), cur.lastrowid, rng.choice((5, 25)), _note(rng, 10),
+                         f"ref-{line_id}-{order_idx}", f"{day.isoformat()} 12:00:{order_idx % 60:02d}"),
+                    )
+                    completions += 1
+        core_db.refresh_line_progress(conn, [row[0] for row in conn.execute("SELECT id FROM lines")])
+        counts["quests"] = cfg.lines * cfg.quests_per_line
+        counts["quest_completions"] = completions
+
+        reviews = [
+            (day.isoformat(), _note(rng), _note(rng), _note(rng))
+            for day in days
+            if day.weekday() == 0
+        ]
+        conn.executemany(
+            "INSERT OR IGNORE INTO reviews_weekly (week_start, effective, friction, next_change) VALUES (?, ?, ?, ?)",
+            reviews,
+        )
+        counts["reviews_weekly"] = len(reviews)
+    counts["habits"] = cfg.habits
+    return counts
+
+
+def build_gml_db(path: Path, cfg: SynthConfig) -> dict:
+    """Create the gml DB at `path` with tasks in every domain and cfg.years of logs."""
+    rng = random.Random(cfg.seed + 1)
+    gml_db.init_db(path)
+    tasks = []
+    for i in range(cfg.gml_tasks):
+        domain = gml_db.DOMAINS[i % len(gml_db.DOMAINS)]
+        tasks.append((f"{domain[0]}{i:03d}", f"Task {i}", domain, "daily", 20, 5, 1, gml_db.now_ts()))
+    logs = []
+    for day in cfg.days():
+        for _ in range(rng.randint(0, 2 * cfg.gml_logs_per_day)):
+            task = rng.choice(tasks)
+            note = _note(rng) if rng.random() < 0.3 else ""
+            logs.append((f"{day.isoformat()} 08:00:00", day.isoformat(), task[0], rng.randint(5, 60), task[5], note))
+    with gml_db.connection(path) as conn:
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO tasks (id, name, domain, cadence, default_minutes, default_xp, active, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            tasks,
+        )
+        conn.executemany(
+            "INSERT INTO logs (ts, date, task_id, minutes, xp, notes) VALUES (?, ?, ?, ?, ?, ?)",
+            logs,
+        )
+    return {"tasks": len(tasks), "logs": len(logs)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--out", type=str, required=True, help="directory for app.db and gml.db")
+    for field, value in asdict(SynthConfig()).items():
+        ap.add_argument(f"--{field.replace('_', '-')}", type=type(value), default=value)
+    args = ap.parse_args()
+    cfg = SynthConfig(**{field: getattr(args, field) for field in asdict(SynthConfig())})
+    out = Path(args.out).expanduser().resolve()
+    out.mkdir(parents=True, exist_ok=True)
+    print("app:", build_app_db(out / "app.db", cfg))
+    print("gml:", build_gml_db(out / "gml.db", cfg))
+
+
+if __name__ == "__main__":
+    main()
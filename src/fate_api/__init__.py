@@ -0,0 +1 @@
+# Local HTTP/JSON API over fate_core (see fate_api.server)
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+from fate_core import crud, rules, search
+from fate_core import db as core_db
+from fate_core.storage import get_storage
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    method: str
+    path: str
+    handler: Callable[[dict], object]
+    # tables the read depends on (its ETag changes with their cache generations); () = no ETag
+    tables: tuple[str, ...] = ()
+
+    @property
+    def write(self) -> bool:
+        return self.method == "POST"
+
+
+# ---- parameters (query string and JSON body share one dict) ----
+
+_MISSING = object()
+
+
+def _param(params: dict, key: str, default=_MISSING):
+    value = params.get(key)
+    if value is None or value == "":
+        if default is _MISSING:
+            raise ApiError(400, f"missing parameter: {key}")
+        return default
+    return value
+
+
+def _int(params: dict, key: str, default=_MISSING) -> int | None:
+    value = _param(params, key, default)
+    if value is default:
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"{key} must be an integer") from None
+
+
+def _str(params: dict, key: str, default=_MISSING) -> str | None:
+    value = _param(params, key, default)
+    return value if value is default else str(value)
+
+
+def _flag(params: dict, key: str, default: bool = False) -> bool:
+    value = params.get(key)
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def _ids(params: dict, key: str) -> list[int] | None:
+    value = params.get(key)
+    if value is None or value == "":
+        return None
+    items = value if isinstance(value, list) else str(value).split(",")
+    try:
+        return [int(item) for item in items]
+    except (TypeError, ValueError):
+        raise ApiError(400, f"{key} must be a list of integers") from None
+
+
+def _active_habit_ids(params: dict) -> list[int]:
+    ids = _ids(params, "habit_ids")
+    if ids is None:
+        ids = [habit["id"] for habit in crud.list_habits(active_only=True)]
+    return ids
+
+
+# ---- reads ----
+
+def get_habits(params: dict):
+    return crud.list_habits(active_only=_flag(params, "active_only"))
+
+
+def get_scheduled_habits(params: dict):
+    return rules.list_scheduled_habits(_str(params, "date"))
+
+
+def get_habit_logs(params: dict):
+    return crud.get_habit_logs(_str(params, "date"), _active_habit_ids(params))
+
+
+def get_habit_schedules(params: dict):
+    return crud.list_habit_schedules(_active_habit_ids(params))
+
+
+def get_lines(params: dict):
+    return crud.list_lines(active_only=_flag(params, "active_only"), line_type=_str(params, "type", None))
+
+
+def get_lines_overview(params: dict):
+    return rules.lines_overview(active_only=_flag(params, "active_only", True))
+
+
+def get_quests(params: dict):
+    return crud.list_quests(_int(params, "line_id"), active_only=_flag(params, "active_only"))
+
+
+def get_next_quest(params: dict):
+    return rules.get_next_quest(_int(params, "line_id"))
+
+
+def get_completions(params: dict):
+    before_id = _int(params, "before_id", None)
+    before = (_str(params, "before_created_at"), before_id) if before_id is not None else None
+    return crud.list_quest_completions(
+        date=_str(params, "date", None),
+        before=before,
+        limit=_int(params, "limit", 100),
+        line_id=_int(params, "line_id", None),
+        quest_id=_int(params, "quest_id", None),
+        start_date=_str(params, "start_date", None),
+        end_date=_str(params, "end_date", None),
+    )
+
+
+def get_review_weekly(params: dict):
+    return crud.get_review_weekly(_str(params, "week_start"))
+
+
+def get_day(params: dict):
+    """What the Today page shows for a date, in one call."""
+    day = _str(params, "date")
+    return {
+        "date": day,
+        "scheduled_habit_ids": [habit["id"] for habit in rules.list_scheduled_habits(day)],
+        "perfect_day": rules.compute_perfect_day(day),
+        "streak": rules.compute_streak(day),
+        "effort_xp": rules.compute_effort_xp(day),
+        "skill_xp": rules.compute_skill_xp(day),
+    }
+
+
+def get_forecast(params: dict):
+    """Due day offsets per active habit over [start, start + days), plus per-day counts."""
+    try:
+        plan = rules.forecast(_str(params, "start"), _int(params, "days", 28))
+    except ValueError as exc:
+        raise ApiError(400, str(exc)) from None
+    return {
+        "start": plan.start,
+        "days": plan.days,
+        "habits": {habit_id: plan.due_offsets(index) for index, habit_id in enumerate(plan.habit_ids)},
+        "counts": plan.counts().tolist(),
+    }
+
+
+def get_totals(params: dict):
+    return crud.count_totals()
+
+
+def get_search(params: dict):
+    return search.search(_str(params, "q"), limit=_int(params, "limit", search.DEFAULT_LIMIT))
+
+
+def get_metrics(params: dict):
+    return {"writes": get_storage(core_db.current_db_path()).write_metrics()}
+
+
+# ---- writes ----
+
+def post_habit_log(params: dict):
+    try:
+        rules.log_habit_status(
+            _str(params, "date"),
+            _int(params, "habit_id"),
+            _str(params, "status"),
+            _int(params, "minutes", None),
+            _str(params, "note", None),
+        )
+    except ValueError as exc:
+        raise ApiError(400, str(exc)) from None
+    return {"ok": True}
+
+
+def post_completion(params: dict):
+    """Complete `quest_id`, or the next open quest of `line_id` (the Today page's mainline push)."""
+    quest_id = _int(params, "quest_id", None)
+    if quest_id is None:
+        next_quest = rules.get_next_quest(_int(params, "line_id"))
+        if next_quest is None:
+            raise ApiError(409, "No quest available to complete.")
+        quest_id = next_quest["id"]
+    try:
+        completion_id = crud.create_quest_completion(
+            _str(params, "date"),
+            quest_id,
+            _int(params, "minutes", None),
+            _str(params, "evidence_type", None),
+            _str(params, "evidence_text", ""),
+            _str(params, "evidence_ref", ""),
+        )
+    except ValueError as exc:
+        raise ApiError(400, str(exc)) from None
+    return {"id": completion_id, "quest_id": quest_id}
+
+
+def post_habit(params: dict):
+    habit_id = crud.upsert_habit(
+        _str(params, "name"),
+        _str(params, "group"),
+        _str(params, "min_desc", ""),
+        _str(params, "normal_desc", ""),
+        _int(params, "min_xp", 1),
+        _int(params, "normal_xp", 2),
+        _int(params, "active", 1),
+        _int(params, "sort_order", 0),
+        habit_id=_int(params, "id", None),
+    )
+    return {"id": habit_id}
+
+
+def post_quest(params: dict):
+    quest_id = crud.upsert_quest(
+        _int(params, "line_id"),
+        _str(params, "chapter", None),
+        _int(params, "order_idx", 0),
+        _str(params, "title"),
+        _str(params, "dod", ""),
+        _int(params, "difficulty", 1),
+        _int(params, "is_boss", 0),
+        _int(params, "active", 1),
+        quest_id=_int(params, "id", None),
+    )
+    return {"id": quest_id}
+
+
+def post_review_weekly(params: dict):
+    crud.upsert_review_weekly(
+        _str(params, "week_start"),
+        _str(params, "effective", ""),
+        _str(params, "friction", ""),
+        _str(params, "next_change", ""),
+    )
+    return {"ok": True}
+
+
+_HABITS = ("habits", "habit_schedules", "habit_logs")
+_QUESTS = ("lines", "line_progress", "quests", "quest_completions")
+
+ENDPOINTS = [
+    Endpoint("GET", "/habits", get_habits, ("habits",)),
+    Endpoint("GET", "/habits/scheduled", get_scheduled_habits, _HABITS),
+    Endpoint("GET", "/habit-logs", get_habit_logs, ("habits", "habit_logs")),
+    Endpoint("GET", "/habit-schedules", get_habit_schedules, ("habits", "habit_schedules")),
+    Endpoint("GET", "/lines", get_lines, ("lines",)),
+    Endpoint("GET", "/lines/overview", get_lines_overview, _QUESTS),
+    Endpoint("GET", "/quests", get_quests, ("quests",)),
+    Endpoint("GET", "/quests/next", get_next_quest, ("line_progress", "quests")),
+    Endpoint("GET", "/completions", get_completions, ("quest_completions", "quests")),
+    Endpoint("GET", "/reviews/weekly", get_review_weekly, ("reviews_weekly",)),
+    Endpoint("GET", "/day", get_day, _HABITS + _QUESTS),
+    Endpoint("GET", "/forecast", get_forecast, _HABITS),
+    Endpoint("GET", "/totals", get_totals, ("habits", "lines", "quest_completions")),
+    Endpoint("GET", "/search", get_search, ("habit_logs", "quest_completions", "reviews_weekly")),
+    Endpoint("GET", "/metrics", get_metrics),
+    Endpoint("POST", "/habit-logs", post_habit_log),
+    Endpoint("POST", "/completions", post_completion),
+    Endpoint("POST", "/habits", post_habit),
+    Endpoint("POST", "/quests", post_quest),
+    Endpoint("POST", "/reviews/weekly", post_review_weekly),
+]
+
+ROUTES: dict[tuple[str, str], Endpoint] = {(e.method, e.path): e for e in ENDPOINTS}
@@ -0,0 +1,239 @@
+"""
+`fate-api`: a small asyncio HTTP/JSON server over fate_core for scripts and phone shortcuts.
+
+    fate-api --port 8765
+    curl localhost:8765/day?date=2026-01-05
+    curl -X POST localhost:8765/habit-logs -d '{"date": "2026-01-05", "habit_id": 1, "status": "normal"}'
+
+Reads run on a thread pool and carry an ETag (If-None-Match -> 304 without touching
+the DB); writes go through the storage write queue, which group-commits them with
+any other writer in this process. POST /batch takes
+{"requests": [{"method", "path", "params"}, ...]} and answers them in order.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+from fate_core import cache, init_db, profiles, sync_read_cache
+from fate_core import db as core_db
+from fate_core.records import to_json
+from fate_core.storage import get_storage
+
+from .routes import ROUTES, ApiError, Endpoint
+
+DEFAULT_PORT = 8765
+MAX_BODY = 1 << 20
+MAX_BATCH = 100
+READ_WORKERS = 4
+
+_REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class Api:
+    def __init__(self, token: str | None = None) -> None:
+        self.token = token
+        self.readers = ThreadPoolExecutor(READ_WORKERS, thread_name_prefix="fate-api-read")
+        self.storage = get_storage(core_db.current_db_path())
+        self.data_version = 0
+
+    def etag(self, endpoint: Endpoint, params: dict) -> str:
+        key = json.dumps(
+            [endpoint.path, sorted(params.items()), cache.generation(endpoint.tables), self.data_version],
+            default=str,
+        )
+        return f'W/"{hashlib.blake2b(key.encode(), digest_size=12).hexdigest()}"'
+
+    def call(self, method: str, path: str, params: dict) -> tuple[int, object]:
+        """Run one endpoint synchronously (on whichever executor the caller picked)."""
+        endpoint = ROUTES.get((method, path))
+        if endpoint is None:
+            if any(p == path for _, p in ROUTES):
+                return 405, {"error": f"{method} not allowed on {path}"}
+            return 404, {"error": f"no such endpoint: {path}"}
+        try:
+            return 200, to_json(endpoint.handler(params))
+        except ApiError as exc:
+            return exc.status, {"error": exc.message}
+        except sqlite3.IntegrityError as exc:
+            return 409, {"error": str(exc)}
+
+    def run_batch(self, requests: list) -> list[dict]:
+        results = []
+        for item in requests:
+            if not isinstance(item, dict):
+                results.append({"status": 400, "body": {"error": "batch items must be objects"}})
+                continue
+            status, body = self.call(
+                str(item.get("method", "GET")).upper(),
+                str(item.get("path", "")),
+                dict(item.get("params") or {}),
+            )
+            results.append({"status": status, "body": body})
+        return results
+
+    async def dispatch(self, method: str, target: str, headers: dict, body: bytes) -> tuple[int, dict, object]:
+        if self.token and headers.get("authorization") != f"Bearer {self.token}":
+            return 401, {}, {"error": "missing or wrong bearer token"}
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        params: dict = dict(parse_qsl(url.query))
+        if body:
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                return 400, {}, {"error": "body must be JSON"}
+            if not isinstance(payload, dict):
+                return 400, {}, {"error": "body must be a JSON object"}
+            params.update(payload)
+
+        loop = asyncio.get_running_loop()
+        # drop read-cache entries made stale by the app or the CLI (cache generations
+        # only see this process's writes)
+        self.data_version = await loop.run_in_executor(self.readers, sync_read_cache)
+
+        if method == "POST" and path == "/batch":
+            requests = params.get("requests")
+            if not isinstance(requests, list) or len(requests) > MAX_BATCH:
+                return 400, {}, {"error": f"requests must be a list of at most {MAX_BATCH} items"}
+            writes = any(
+                isinstance(item, dict) and str(item.get("method", "GET")).upper() == "POST"
+                for item in requests
+            )
+            if writes:
+                # one write job: the whole batch lands in a single commit
+                results = await self.storage.write_async(lambda conn: self.run_batch(requests))
+            else:
+                results = await loop.run_in_executor(self.readers, self.run_batch, requests)
+            return 200, {}, {"results": results}
+
+        endpoint = ROUTES.get((method, path))
+        extra: dict = {}
+        if endpoint is not None and endpoint.tables:
+            tag = self.etag(endpoint, params)
+            extra = {"ETag": tag, "Cache-Control": "no-cache"}
+            if tag in (t.strip() for t in headers.get("if-none-match", "").split(",")):
+                return 304, extra, None
+        if endpoint is not None and endpoint.write:
+            status, result = await self.storage.write_async(lambda conn: self.call(method, path, params))
+        else:
+            status, result = await loop.run_in_executor(self.readers, self.call, method, path, params)
+        return status, (extra if status == 200 else {}), result
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self.respond(writer, 400, {}, {"error": "bad request line"}, False)
+                    break
+                headers: dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    if version == "HTTP/1.1"
+                    else headers.get("connection", "").lower() == "keep-alive"
+                )
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    await self.respond(writer, 413, {}, {"error": "body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, extra, result = await self.dispatch(method.upper(), target, headers, body)
+                except Exception as exc:  # keep serving; report the failure to this client only
+                    status, extra, result = 500, {}, {"error": f"{type(exc).__name__}: {exc}"}
+                await self.respond(writer, status, extra, result, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        extra: dict,
+        result: object,
+        keep_alive: bool,
+    ) -> None:
+        payload = b"" if status == 304 else json.dumps(result, ensure_ascii=False).encode("utf-8")
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+        if status != 304:
+            lines.append("Content-Type: application/json; charset=utf-8")
+        lines.append(f"Content-Length: {len(payload)}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        lines.extend(f"{name}: {value}" for name, value in extra.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+        await writer.drain()
+
+
+async def serve(host: str, port: int, token: str | None = None) -> None:
+    api = Api(token)
+    server = await asyncio.start_server(api.handle, host, port)
+    print(f"fate-api: listening on http://{host}:{port} (db {core_db.current_db_path()})", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        prog="fate-api",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=int(os.environ.get("FATE_API_PORT", DEFAULT_PORT)))
+    ap.add_argument("--db", default=None, help="app DB (default: FATE_APP_DB or data/fate_v1.db)")
+    ap.add_argument("--profile", default=profiles.env_profile(), help="serve this profile's DB (see fate-cli profile list)")
+    args = ap.parse_args()
+
+    # one DB per server process: request threads don't carry a profile context
+    try:
+        profile_path = profiles.db_path(args.profile)
+    except KeyError as exc:
+        raise SystemExit(f"fate-api: {exc.args[0]}") from None
+    # resolved once: the served file must not depend on the cwd of whoever started us
+    core_db.set_db_path(args.db or profile_path or core_db.DB_PATH)
+    # required when listening beyond localhost; clients send `Authorization: Bearer <token>`
+    token = os.environ.get("FATE_API_TOKEN")
+    if args.host not in ("127.0.0.1", "localhost", "::1") and not token:
+        raise SystemExit("fate-api: set FATE_API_TOKEN before listening on a non-local address.")
+    init_db()
+    try:
+        asyncio.run(serve(args.host, args.port, token))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
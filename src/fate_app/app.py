@@ -1,29 +1,38 @@
 from __future__ import annotations
 
+import json
+import re
 from datetime import date as date_cls, timedelta
 
 import streamlit as st
 
-from fate_core import init_db
-from fate_core import crud, rules
+from fate_core import init_db, sync_read_cache
+from fate_core import crud, profiles, profiling, rules, search
 from fate_core.labels import L, list_ui_labels, upsert_ui_label
 
+from fate_app import tracing
+
 NAV_KEYS = {
     "today": ("nav.today", "Today"),
     "consistency": ("nav.consistency", "Consistency"),
     "mainlines": ("nav.mainlines", "Mainlines"),
     "reviews": ("nav.reviews", "Reviews"),
     "dashboard": ("nav.dashboard", "Dashboard"),
+    "search": ("nav.search", "Search"),
+    "plan": ("nav.plan", "Planning"),
 }
 
 LABEL_KEYS = {
     "app.title": "Fate V1",
     "sidebar.navigate": "Navigate",
+    "sidebar.profile": "Profile",
     "nav.today": "Today",
     "nav.consistency": "Consistency",
     "nav.mainlines": "Mainlines",
     "nav.reviews": "Reviews",
     "nav.dashboard": "Dashboard",
+    "nav.search": "Search",
+    "nav.plan": "Planning",
     "term.perfect_day": "完美的一天",
     "term.streak": "连胜",
     "term.effort_xp": "努力经验",
@@ -54,6 +63,8 @@ LABEL_KEYS = {
     "btn.save_labels": "Save Labels",
     "btn.add_evidence_type": "Add Evidence Type",
     "btn.delete_evidence_type": "Delete Evidence Type",
+    "btn.prev_page": "Previous",
+    "btn.next_page": "Next",
     "section.habits": "Habits",
     "section.mainline_push": "Mainline Push",
     "section.feedback": "Feedback",
@@ -64,7 +75,9 @@ LABEL_KEYS = {
     "section.quests": "Quests",
     "section.add_quest": "Add Quest",
     "section.edit_quest": "Edit Quest",
+    "section.completion_history": "Completion History",
     "section.ui_labels_editor": "UI Labels Editor",
+    "section.lines_overview": "All Lines Overview",
     "field.date": "Date",
     "field.focus_line": "Focus Line",
     "field.minutes": "Minutes",
@@ -92,6 +105,7 @@ LABEL_KEYS = {
     "field.ultimate_goal": "Ultimate Goal",
     "field.select_line": "Select Line",
     "field.title": "Title",
+    "field.chapter": "Chapter",
     "field.chapter_optional": "Chapter (optional)",
     "field.definition_of_done": "Definition of Done",
     "field.order_index": "Order Index",
@@ -102,13 +116,24 @@ LABEL_KEYS = {
     "field.effective": "Effective",
     "field.friction": "Friction",
     "field.next_change": "Next Change",
+    "field.search_query": "Search evidence, notes and reviews",
+    "field.start_date": "Start Date",
+    "field.end_date": "End Date",
+    "field.days": "Days",
+    "field.habit": "Habit",
     "label.next_action": "Next Action",
     "label.progress": "Progress",
     "label.weighted_progress": "Weighted Progress",
     "label.line_progress": "Line Progress",
     "label.chapter_progress": "Chapter Progress",
     "label.uncategorized": "Uncategorized",
+    "label.page": "Page",
+    "label.due_count": "Due",
+    "label.all_quests": "All Quests",
+    "label.quest": "Quest",
+    "label.evidence": "Evidence",
     "label.schedule": "Schedule",
+    "label.last_completion": "Last Completion",
     "label.next_due_date": "Next Due Date",
     "label.rest_day": "Rest Day",
     "label.cooldown_remaining": "Cooldown Remaining Days",
@@ -124,6 +149,8 @@ LABEL_KEYS = {
     "info.no_habits": "No habits yet.",
     "info.no_lines": "No lines yet.",
     "info.no_quests": "No quests yet.",
+    "info.no_completions": "No completions yet.",
+    "info.no_search_results": "No matches.",
     "msg.habits.saved": "Habits saved.",
     "msg.habit_created": "Habit created.",
     "msg.habit_updated": "Habit updated.",
@@ -153,6 +180,10 @@ LABEL_KEYS = {
     "weekday.4": "Friday",
     "weekday.5": "Saturday",
     "weekday.6": "Sunday",
+    "search.kind.completion": "Evidence",
+    "search.kind.habit_note": "Habit Note",
+    "search.kind.review": "Weekly Review",
+    "search.kind.gml_log": "CLI Log",
     "evidence.type.none": "",
     "evidence.type.commit": "commit",
     "evidence.type.file": "file",
@@ -163,6 +194,7 @@ LABEL_KEYS = {
 
 SCHEDULE_TYPES = ["always", "weekly", "interval", "cooldown"]
 WEEKDAY_OPTIONS = list(range(7))
+PLAN_MAX_DAYS = 90
 
 
 def label(key: str, default_value: str) -> str:
@@ -225,7 +257,7 @@ def serialize_weekly_days(days: list[int]) -> str | None:
     return ",".join(str(day) for day in sorted(set(days)))
 
 
-def schedule_summary(schedule: dict | None) -> str:
+def schedule_summary(schedule: dict | None, next_due_date: str | None = None) -> str:
     if not schedule:
         return schedule_type_label("always")
     schedule_type = schedule.get("schedule_type") or "always"
@@ -244,7 +276,6 @@ def schedule_summary(schedule: dict | None) -> str:
             return f"{schedule_type_label('interval')}: {interval_days}"
     if schedule_type == "cooldown":
         cooldown_days = schedule.get("cooldown_days")
-        next_due_date = schedule.get("next_due_date")
         if cooldown_days and next_due_date:
             return (
                 f"{schedule_type_label('cooldown')}: {cooldown_days} "
@@ -255,6 +286,7 @@ def schedule_summary(schedule: dict | None) -> str:
     return schedule_type_label(schedule_type)
 
 
+@tracing.traced("page.today")
 def today_page() -> None:
     st.title(nav_label("today"))
     selected_date = st.date_input(label("field.date", "Date"), value=date_cls.today())
@@ -263,7 +295,7 @@ def today_page() -> None:
     all_habits = crud.list_habits(active_only=True)
     scheduled_habits = rules.list_scheduled_habits(day_str)
     scheduled_ids = {habit["id"] for habit in scheduled_habits}
-    schedule_map = crud.list_habit_schedules([habit["id"] for habit in all_habits])
+    cooldown_due = rules.cooldown_due_dates(day_str)
     hide_rest_habits = st.checkbox(label("field.hide_rest_habits", "Hide Rest Day Habits"))
     habits = (
         [habit for habit in all_habits if habit["id"] in scheduled_ids]
@@ -272,34 +304,33 @@ def today_page() -> None:
     )
     habit_logs = crud.get_habit_logs(day_str, [h["id"] for h in habits])
 
-    st.subheader(label("section.habits", "Habits"))
-    if not habits:
-        st.info(label("info.habits.empty", "Create your first habit in Consistency."))
-    else:
-        with st.form("habits_form"):
-            for group in ("growth", "health", "maintenance"):
-                group_habits = [h for h in habits if h["group"] == group]
-                if not group_habits:
-                    continue
-                st.markdown(f"**{group_label(group)}**")
-                for habit in group_habits:
-                    default_status = habit_logs.get(habit["id"], {}).get("status", "none")
-                    is_active_today = habit["id"] in scheduled_ids
-                    st.selectbox(
-                        habit["name"],
-                        options=["none", "min", "normal"],
-                        index=["none", "min", "normal"].index(default_status),
-                        format_func=status_label,
-                        disabled=not is_active_today,
-                        key=f"habit_status_{habit['id']}",
-                    )
-                    if not is_active_today:
-                        schedule = schedule_map.get(habit["id"])
-                        rest_label = label("label.rest_day", "Rest Day")
-                        if schedule and schedule.get("schedule_type") == "cooldown":
-                            next_due = schedule.get("next_due_date")
+    with tracing.span("today.habits"):
+        st.subheader(label("section.habits", "Habits"))
+        if not habits:
+            st.info(label("info.habits.empty", "Create your first habit in Consistency."))
+        else:
+            with st.form("habits_form"):
+                for group in ("growth", "health", "maintenance"):
+                    group_habits = [h for h in habits if h["group"] == group]
+                    if not group_habits:
+                        continue
+                    st.markdown(f"**{group_label(group)}**")
+                    for habit in group_habits:
+                        default_status = habit_logs.get(habit["id"], {}).get("status", "none")
+                        is_active_today = habit["id"] in scheduled_ids
+                        st.selectbox(
+                            habit["name"],
+                            options=["none", "min", "normal"],
+                            index=["none", "min", "normal"].index(default_status),
+                            format_func=status_label,
+                            disabled=not is_active_today,
+                            key=f"habit_status_{habit['id']}",
+                        )
+                        if not is_active_today:
+                            rest_label = label("label.rest_day", "Rest Day")
+                            next_due = cooldown_due.get(habit["id"])
                             if next_due:
-                                due_date = date_cls.fromisoformat(next_due[:10])
+                                due_date = date_cls.fromisoformat(next_due)
                                 remaining = (due_date - selected_date).days
                                 if remaining > 0:
                                     st.caption(
@@ -308,22 +339,15 @@ def today_page() -> None:
                                         f"{remaining}"
                                     )
                                     continue
-                        st.caption(rest_label)
-            if st.form_submit_button(label("btn.save_habits", "Save Habits")):
-                for habit in habits:
-                    if habit["id"] not in scheduled_ids:
-                        continue
-                    status = st.session_state.get(f"habit_status_{habit['id']}", "none")
-                    crud.upsert_habit_log(day_str, habit["id"], status, None, None)
-                    if status in ("min", "normal"):
-                        schedule = schedule_map.get(habit["id"])
-                        if schedule and schedule.get("schedule_type") == "cooldown":
-                            cooldown_days = int(schedule.get("cooldown_days") or 0)
-                            if cooldown_days > 0:
-                                next_due = (selected_date + timedelta(days=cooldown_days)).isoformat()
-                                crud.set_habit_next_due_date(habit["id"], next_due)
-                st.success(label("msg.habits.saved", "Habits saved."))
-                st.rerun()
+                            st.caption(rest_label)
+                if st.form_submit_button(label("btn.save_habits", "Save Habits")):
+                    for habit in habits:
+                        if habit["id"] not in scheduled_ids:
+                            continue
+                        status = st.session_state.get(f"habit_status_{habit['id']}", "none")
+                        rules.log_habit_status(day_str, habit["id"], status)
+                    st.success(label("msg.habits.saved", "Habits saved."))
+                    st.rerun()
 
     perfect_day = rules.compute_perfect_day(day_str)
     today_streak = rules.compute_streak(date_cls.today().isoformat())
@@ -335,142 +359,147 @@ def today_page() -> None:
     if not lines:
         st.info(label("info.lines.empty", "Create a line in Mainlines to start pushes."))
     else:
-        line_ids = [line["id"] for line in lines]
-        stored_focus = crud.get_setting("focus_line_id")
-        try:
-            stored_focus_id = int(stored_focus) if stored_focus else None
-        except ValueError:
-            stored_focus_id = None
-        default_line_id = stored_focus_id if stored_focus_id in line_ids else line_ids[0]
-        selected_line_id = st.selectbox(
-            label("field.focus_line", "Focus Line"),
-            options=line_ids,
-            format_func=lambda lid: next(line["name"] for line in lines if line["id"] == lid),
-            index=line_ids.index(default_line_id),
-        )
-        crud.set_setting("focus_line_id", str(selected_line_id))
-
-        next_quest = rules.get_next_quest(selected_line_id)
-        if next_quest:
-            st.write(f"**{label('label.next_action', 'Next Action')}:** {next_quest['title']}")
-            if next_quest.get("dod"):
-                st.caption(next_quest["dod"])
-        else:
-            st.info(label("info.no_remaining_quests", "No remaining quests for this line."))
-
-        col_25, col_5 = st.columns(2)
-        with col_25:
-            if st.button(label("btn.start_25", "Start 25’")):
-                st.session_state["completion_minutes"] = 25
-        with col_5:
-            if st.button(label("btn.start_5", "Start 5’")):
-                st.session_state["completion_minutes"] = 5
-
-        with st.form("completion_form"):
-            minutes = st.number_input(
-                label("field.minutes", "Minutes"),
-                min_value=1,
-                max_value=240,
-                value=int(st.session_state.get("completion_minutes", 25)),
-                step=1,
-            )
-            evidence_types = crud.list_evidence_types(active_only=True)
-            evidence_type_map = {etype["id"]: etype for etype in evidence_types}
-            evidence_type_id = st.selectbox(
-                label("field.evidence_type", "Evidence Type"),
-                options=[None, *evidence_type_map.keys()],
-                format_func=lambda etype_id: (
-                    label("option.none", "None")
-                    if etype_id is None
-                    else evidence_type_map[etype_id]["name"]
-                ),
-            )
-            new_type_name = st.text_input(label("field.evidence_type_new", "New Evidence Type"))
-            add_type = st.form_submit_button(label("btn.add_evidence_type", "Add Evidence Type"))
-            delete_type = st.form_submit_button(
-                label("btn.delete_evidence_type", "Delete Evidence Type")
+        with tracing.span("today.mainline_push"):
+            line_ids = [line["id"] for line in lines]
+            stored_focus = crud.get_setting("focus_line_id")
+            try:
+                stored_focus_id = int(stored_focus) if stored_focus else None
+            except ValueError:
+                stored_focus_id = None
+            default_line_id = stored_focus_id if stored_focus_id in line_ids else line_ids[0]
+            selected_line_id = st.selectbox(
+                label("field.focus_line", "Focus Line"),
+                options=line_ids,
+                format_func=lambda lid: next(line["name"] for line in lines if line["id"] == lid),
+                index=line_ids.index(default_line_id),
             )
-            evidence_text = st.text_input(
-                label("field.evidence_text_required", "Evidence Text (required)")
-            )
-            evidence_ref = st.text_input(
-                label("field.evidence_ref_required", "Evidence Reference (required)")
-            )
-            save_completion = st.form_submit_button(
-                label("btn.save_evidence", "Save Evidence / Complete Push")
-            )
-            if add_type:
-                if not new_type_name.strip():
-                    st.error(label("error.evidence_type_required", "Evidence type name is required."))
-                else:
-                    existing = crud.get_evidence_type_by_name(new_type_name.strip())
-                    if existing and existing["active"]:
-                        st.error(label("error.evidence_type_exists", "Evidence type already exists."))
+            crud.set_setting("focus_line_id", str(selected_line_id), defer=True)
+
+            next_quest = rules.get_next_quest(selected_line_id)
+            if next_quest:
+                st.write(f"**{label('label.next_action', 'Next Action')}:** {next_quest['title']}")
+                if next_quest.get("dod"):
+                    st.caption(next_quest["dod"])
+            else:
+                st.info(label("info.no_remaining_quests", "No remaining quests for this line."))
+
+            col_25, col_5 = st.columns(2)
+            with col_25:
+                if st.button(label("btn.start_25", "Start 25’")):
+                    st.session_state["completion_minutes"] = 25
+            with col_5:
+                if st.button(label("btn.start_5", "Start 5’")):
+                    st.session_state["completion_minutes"] = 5
+
+            with st.form("completion_form"):
+                minutes = st.number_input(
+                    label("field.minutes", "Minutes"),
+                    min_value=1,
+                    max_value=240,
+                    value=int(st.session_state.get("completion_minutes", 25)),
+                    step=1,
+                )
+                evidence_types = crud.list_evidence_types(active_only=True)
+                evidence_type_map = {etype["id"]: etype for etype in evidence_types}
+                evidence_type_id = st.selectbox(
+                    label("field.evidence_type", "Evidence Type"),
+                    options=[None, *evidence_type_map.keys()],
+                    format_func=lambda etype_id: (
+                        label("option.none", "None")
+                        if etype_id is None
+                        else evidence_type_map[etype_id]["name"]
+                    ),
+                )
+                new_type_name = st.text_input(label("field.evidence_type_new", "New Evidence Type"))
+                add_type = st.form_submit_button(label("btn.add_evidence_type", "Add Evidence Type"))
+                delete_type = st.form_submit_button(
+                    label("btn.delete_evidence_type", "Delete Evidence Type")
+                )
+                evidence_text = st.text_input(
+                    label("field.evidence_text_required", "Evidence Text (required)")
+                )
+                evidence_ref = st.text_input(
+                    label("field.evidence_ref_required", "Evidence Reference (required)")
+                )
+                save_completion = st.form_submit_button(
+                    label("btn.save_evidence", "Save Evidence / Complete Push")
+                )
+                if add_type:
+                    if not new_type_name.strip():
+                        st.error(label("error.evidence_type_required", "Evidence type name is required."))
                     else:
-                        if existing:
-                            crud.set_evidence_type_active(existing["id"], 1)
+                        existing = crud.get_evidence_type_by_name(new_type_name.strip())
+                        if existing and existing["active"]:
+                            st.error(label("error.evidence_type_exists", "Evidence type already exists."))
                         else:
-                            next_sort = (
-                                max((etype["sort_order"] for etype in evidence_types), default=-1) + 1
-                            )
-                            crud.upsert_evidence_type(new_type_name.strip(), 1, next_sort)
-                        st.success(label("msg.evidence_type_added", "Evidence type added."))
-                        st.rerun()
-            elif delete_type:
-                if evidence_type_id is None:
-                    st.error(
-                        label("error.evidence_type_delete_none", "Select an evidence type to delete.")
-                    )
-                else:
-                    crud.set_evidence_type_active(evidence_type_id, 0)
-                    st.success(label("msg.evidence_type_deleted", "Evidence type deleted."))
-                    st.rerun()
-            elif save_completion:
-                if not next_quest:
-                    st.error(label("error.no_quest_available", "No quest available to complete."))
-                else:
-                    evidence_type_name = (
-                        evidence_type_map[evidence_type_id]["name"] if evidence_type_id else None
-                    )
-                    try:
-                        crud.create_quest_completion(
-                            day_str,
-                            next_quest["id"],
-                            minutes,
-                            evidence_type_name,
-                            evidence_text,
-                            evidence_ref,
+                            if existing:
+                                crud.set_evidence_type_active(existing["id"], 1)
+                            else:
+                                next_sort = (
+                                    max((etype["sort_order"] for etype in evidence_types), default=-1) + 1
+                                )
+                                crud.upsert_evidence_type(new_type_name.strip(), 1, next_sort)
+                            st.success(label("msg.evidence_type_added", "Evidence type added."))
+                            st.rerun()
+                elif delete_type:
+                    if evidence_type_id is None:
+                        st.error(
+                            label("error.evidence_type_delete_none", "Select an evidence type to delete.")
                         )
-                    except ValueError as exc:
-                        st.error(str(exc))
                     else:
-                        st.success(label("msg.quest_completion_saved", "Quest completion saved."))
+                        crud.set_evidence_type_active(evidence_type_id, 0)
+                        st.success(label("msg.evidence_type_deleted", "Evidence type deleted."))
                         st.rerun()
+                elif save_completion:
+                    if not next_quest:
+                        st.error(label("error.no_quest_available", "No quest available to complete."))
+                    else:
+                        evidence_type_name = (
+                            evidence_type_map[evidence_type_id]["name"] if evidence_type_id else None
+                        )
+                        try:
+                            crud.create_quest_completion(
+                                day_str,
+                                next_quest["id"],
+                                minutes,
+                                evidence_type_name,
+                                evidence_text,
+                                evidence_ref,
+                            )
+                        except ValueError as exc:
+                            st.error(str(exc))
+                        else:
+                            st.success(label("msg.quest_completion_saved", "Quest completion saved."))
+                            st.rerun()
+
+        with tracing.span("today.feedback"):
+            st.subheader(label("section.feedback", "Feedback"))
+            effort = rules.compute_effort_xp(day_str)
+            st.write(
+                f"{label('term.effort_xp', 'Effort XP')}: "
+                f"{effort['total']} ("
+                f"{label('term.growth', 'Growth')} {effort['growth']}, "
+                f"{label('term.health', 'Health')} {effort['health']}, "
+                f"{label('term.maintenance', 'Maintenance')} {effort['maintenance']})"
+            )
+            skill = rules.compute_skill_xp(day_str)
+            st.write(f"{label('term.skill_xp', 'Skill XP')}: {skill['total']}")
+            for line_id, payload in skill["by_line"].items():
+                st.caption(f"{payload['line_name']}: {payload['xp']}")
 
-        st.subheader(label("section.feedback", "Feedback"))
-        effort = rules.compute_effort_xp(day_str)
-        st.write(
-            f"{label('term.effort_xp', 'Effort XP')}: "
-            f"{effort['total']} ("
-            f"{label('term.growth', 'Growth')} {effort['growth']}, "
-            f"{label('term.health', 'Health')} {effort['health']}, "
-            f"{label('term.maintenance', 'Maintenance')} {effort['maintenance']})"
-        )
-        skill = rules.compute_skill_xp(day_str)
-        st.write(f"{label('term.skill_xp', 'Skill XP')}: {skill['total']}")
-        for line_id, payload in skill["by_line"].items():
-            st.caption(f"{payload['line_name']}: {payload['xp']}")
-
-        completed, total = rules.line_progress(selected_line_id)
-        if total > 0:
-            st.progress(completed / total)
-            st.caption(f"{label('label.progress', 'Progress')}: {completed} / {total}")
+            completed, total = rules.line_progress(selected_line_id)
+            if total > 0:
+                st.progress(completed / total)
+                st.caption(f"{label('label.progress', 'Progress')}: {completed} / {total}")
 
 
+@tracing.traced("page.consistency")
 def consistency_page() -> None:
     st.title(nav_label("consistency"))
     habits = crud.list_habits(active_only=False)
     schedules = crud.list_habit_schedules([habit["id"] for habit in habits])
+    # as of tomorrow, so a habit done today shows its next due date
+    cooldown_due = rules.cooldown_due_dates((date_cls.today() + timedelta(days=1)).isoformat())
 
     if habits:
         habit_rows = []
@@ -486,7 +515,9 @@ def consistency_page() -> None:
                     label("field.normal_xp", "Normal XP"): habit["normal_xp"],
                     label("field.sort_order", "Sort Order"): habit["sort_order"],
                     label("field.active", "Active"): yes_no(bool(habit["active"])),
-                    label("label.schedule", "Schedule"): schedule_summary(schedule),
+                    label("label.schedule", "Schedule"): schedule_summary(
+                        schedule, cooldown_due.get(habit["id"])
+                    ),
                 }
             )
         st.dataframe(habit_rows, use_container_width=True, hide_index=True)
@@ -660,9 +691,6 @@ def consistency_page() -> None:
                 if not name.strip():
                     st.error(label("error.name_required", "Name is required."))
                 else:
-                    next_due_date = None
-                    if schedule_type == "cooldown":
-                        next_due_date = schedule.get("next_due_date")
                     crud.upsert_habit(
                         name.strip(),
                         group,
@@ -681,12 +709,12 @@ def consistency_page() -> None:
                         int(interval_days) if interval_days else None,
                         anchor_date.isoformat() if anchor_date else None,
                         int(cooldown_days) if cooldown_days else None,
-                        next_due_date,
                     )
                     st.success(label("msg.habit_updated", "Habit updated."))
                     st.rerun()
 
 
+@tracing.traced("page.mainlines")
 def mainlines_page() -> None:
     st.title(nav_label("mainlines"))
     filter_choice = st.selectbox(
@@ -753,6 +781,27 @@ def mainlines_page() -> None:
                     st.success(label("msg.line_created", "Line created."))
                     st.rerun()
 
+    with st.expander(label("section.lines_overview", "All Lines Overview"), expanded=False):
+        overview = rules.lines_overview(active_only=True)
+        overview_rows = []
+        for row in overview:
+            overview_rows.append(
+                {
+                    label("field.name", "Name"): row["line_name"],
+                    label("field.type", "Type"): line_type_label(row["line_type"]),
+                    label("label.progress", "Progress"): f"{row['completed']} / {row['total']}",
+                    label("label.weighted_progress", "Weighted Progress"): (
+                        f"{row['completed_weight']} / {row['total_weight']}"
+                    ),
+                    label("label.next_action", "Next Action"): row["next_quest_title"] or "",
+                    label("label.last_completion", "Last Completion"): (
+                        row["last_completion_date"] or ""
+                    ),
+                }
+            )
+        if overview_rows:
+            st.dataframe(overview_rows, use_container_width=True, hide_index=True)
+
     line_map = {line["id"]: line for line in lines}
     selected_line_id = st.selectbox(
         label("field.select_line", "Select Line"),
@@ -797,27 +846,9 @@ def mainlines_page() -> None:
                     st.rerun()
 
     st.subheader(label("section.quests", "Quests"))
-    quests = crud.list_quests(selected_line_id, active_only=False)
-    active_quests = [quest for quest in quests if quest["active"]]
-
-    from fate_core.db import db_connection
-
-    with db_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT DISTINCT qc.quest_id
-            FROM quest_completions qc
-            JOIN quests q ON q.id = qc.quest_id
-            WHERE q.line_id = ?
-            """,
-            (selected_line_id,),
-        ).fetchall()
-    completed_ids = {row["quest_id"] for row in rows}
-
-    total_weight = sum(quest["difficulty"] for quest in active_quests)
-    completed_weight = sum(
-        quest["difficulty"] for quest in active_quests if quest["id"] in completed_ids
-    )
+    chapters = crud.list_quest_chapters(selected_line_id)
+
+    completed_weight, total_weight = rules.line_weighted_progress(selected_line_id)
     if total_weight > 0:
         st.caption(
             f"{label('label.line_progress', 'Line Progress')} — "
@@ -826,41 +857,65 @@ def mainlines_page() -> None:
         )
         st.progress(completed_weight / total_weight)
 
-    if quests:
-        quests_by_chapter = {}
-        for quest in quests:
-            chapter = quest.get("chapter") or label("label.uncategorized", "Uncategorized")
-            quests_by_chapter.setdefault(chapter, []).append(quest)
-
-        for chapter_name, chapter_quests in quests_by_chapter.items():
-            st.markdown(f"**{chapter_name}**")
-            chapter_active = [quest for quest in chapter_quests if quest["active"]]
-            chapter_total = sum(quest["difficulty"] for quest in chapter_active)
-            chapter_completed = sum(
-                quest["difficulty"]
-                for quest in chapter_active
-                if quest["id"] in completed_ids
+    if chapters:
+        chapter_map = {row["chapter"]: row for row in chapters}
+        uncategorized = label("label.uncategorized", "Uncategorized")
+        selected_chapter = st.selectbox(
+            label("field.chapter", "Chapter"),
+            options=list(chapter_map.keys()),
+            format_func=lambda name: f"{name or uncategorized} ({chapter_map[name]['quests']})",
+            key=f"quest_chapter_{selected_line_id}",
+        )
+        chapter_row = chapter_map[selected_chapter]
+        if chapter_row["total_weight"] > 0:
+            st.caption(
+                f"{label('label.chapter_progress', 'Chapter Progress')} — "
+                f"{label('label.weighted_progress', 'Weighted Progress')}: "
+                f"{chapter_row['completed_weight']} / {chapter_row['total_weight']}"
             )
-            if chapter_total > 0:
-                st.caption(
-                    f"{label('label.chapter_progress', 'Chapter Progress')} — "
-                    f"{label('label.weighted_progress', 'Weighted Progress')}: "
-                    f"{chapter_completed} / {chapter_total}"
-                )
-                st.progress(chapter_completed / chapter_total)
-            for quest in chapter_quests:
-                boss_label = yes_no(bool(quest["is_boss"]))
-                active_label = yes_no(bool(quest["active"]))
-                st.write(
-                    f"{quest['order_idx']}. {quest['title']} "
-                    f"({label('label.difficulty', 'difficulty')} {quest['difficulty']}, "
-                    f"{label('label.boss', 'boss')}={boss_label}, "
-                    f"{label('field.active', 'Active')}={active_label})"
-                )
+            st.progress(chapter_row["completed_weight"] / chapter_row["total_weight"])
+
+        # keyset cursors of the pages visited so far; the last one is the current page
+        cursors = st.session_state.setdefault(
+            f"quest_page_{selected_line_id}_{selected_chapter}", [None]
+        )
+        quests = crud.list_quests_page(
+            selected_line_id,
+            chapter=selected_chapter,
+            after=cursors[-1],
+            limit=crud.QUEST_PAGE_SIZE + 1,
+        )
+        has_next = len(quests) > crud.QUEST_PAGE_SIZE
+        quests = quests[: crud.QUEST_PAGE_SIZE]
+
+        difficulty_text = label("label.difficulty", "difficulty")
+        boss_text = label("label.boss", "boss")
+        active_text = label("field.active", "Active")
+        st.markdown(
+            "  \n".join(
+                f"{quest['order_idx']}. {quest['title']} "
+                f"({difficulty_text} {quest['difficulty']}, "
+                f"{boss_text}={yes_no(bool(quest['is_boss']))}, "
+                f"{active_text}={yes_no(bool(quest['active']))})"
+                for quest in quests
+            )
+        )
+        if has_next or len(cursors) > 1:
+            col_prev, col_page, col_next = st.columns(3)
+            with col_prev:
+                if st.button(label("btn.prev_page", "Previous"), disabled=len(cursors) == 1):
+                    cursors.pop()
+                    st.rerun()
+            with col_page:
+                st.caption(f"{label('label.page', 'Page')} {len(cursors)}")
+            with col_next:
+                if st.button(label("btn.next_page", "Next"), disabled=not has_next):
+                    cursors.append((quests[-1]["order_idx"], quests[-1]["id"]))
+                    st.rerun()
     else:
         st.info(label("info.no_quests", "No quests yet."))
 
-    with st.expander(label("section.add_quest", "Add Quest"), expanded=not quests):
+    with st.expander(label("section.add_quest", "Add Quest"), expanded=not chapters):
         with st.form("quest_add_form"):
             title = st.text_input(label("field.title", "Title"))
             chapter = st.text_input(label("field.chapter_optional", "Chapter (optional)"))
@@ -894,15 +949,16 @@ def mainlines_page() -> None:
                     st.success(label("msg.quest_created", "Quest created."))
                     st.rerun()
 
-    if quests:
-        quest_map = {quest["id"]: quest for quest in quests}
+    # the picker covers every quest in the line, not just the visible page
+    quest_titles = {row["id"]: row["title"] for row in crud.list_quest_titles(selected_line_id)}
+    if quest_titles:
         with st.expander(label("section.edit_quest", "Edit Quest"), expanded=False):
             selected_quest_id = st.selectbox(
                 label("field.select_quest", "Select Quest"),
-                options=list(quest_map.keys()),
-                format_func=lambda qid: quest_map[qid]["title"],
+                options=list(quest_titles.keys()),
+                format_func=lambda qid: quest_titles[qid],
             )
-            quest = quest_map[selected_quest_id]
+            quest = crud.get_quest(selected_quest_id)
             with st.form("quest_edit_form"):
                 title = st.text_input(label("field.title", "Title"), value=quest["title"])
                 chapter = st.text_input(
@@ -946,7 +1002,82 @@ def mainlines_page() -> None:
                         st.success(label("msg.quest_updated", "Quest updated."))
                         st.rerun()
 
+    completion_history(selected_line_id, quest_titles)
+
+
+def completion_history(line_id: int, quest_titles: dict[int, str]) -> None:
+    """Newest-first completions of a line, filterable by quest and date range, keyset paged."""
+    with st.expander(label("section.completion_history", "Completion History"), expanded=False):
+        col_quest, col_start, col_end = st.columns(3)
+        with col_quest:
+            quest_id = st.selectbox(
+                label("field.select_quest", "Select Quest"),
+                options=[None, *quest_titles.keys()],
+                format_func=lambda qid: label("label.all_quests", "All Quests")
+                if qid is None
+                else quest_titles[qid],
+                key=f"history_quest_{line_id}",
+            )
+        with col_start:
+            start = st.date_input(
+                label("field.start_date", "Start Date"), value=None, key=f"history_start_{line_id}"
+            )
+        with col_end:
+            end = st.date_input(
+                label("field.end_date", "End Date"), value=None, key=f"history_end_{line_id}"
+            )
+        filters = {
+            "line_id": line_id,
+            "quest_id": quest_id,
+            "start_date": start.isoformat() if start else None,
+            "end_date": end.isoformat() if end else None,
+        }
+        # (created_at, id) cursors of the pages visited so far, reset when the filters change
+        cursors = st.session_state.setdefault(
+            f"history_page_{line_id}_{quest_id}_{filters['start_date']}_{filters['end_date']}",
+            [None],
+        )
+        rows = crud.list_quest_completions(
+            before=cursors[-1], limit=crud.COMPLETION_PAGE_SIZE + 1, **filters
+        )
+        has_next = len(rows) > crud.COMPLETION_PAGE_SIZE
+        rows = rows[: crud.COMPLETION_PAGE_SIZE]
+        if not rows:
+            st.info(label("info.no_completions", "No completions yet."))
+            return
+        st.dataframe(
+            [
+                {
+                    label("field.date", "Date"): row["date"],
+                    label("label.quest", "Quest"): quest_titles.get(row["quest_id"], row["quest_id"]),
+                    label("field.minutes", "Minutes"): row["minutes"],
+                    label("label.evidence", "Evidence"): row["evidence_text"],
+                    label("field.evidence_type", "Evidence Type"): row["evidence_type"] or "",
+                }
+                for row in rows
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+        if has_next or len(cursors) > 1:
+            col_prev, col_page, col_next = st.columns(3)
+            with col_prev:
+                if st.button(
+                    label("btn.prev_page", "Previous"),
+                    disabled=len(cursors) == 1,
+                    key="history_prev",
+                ):
+                    cursors.pop()
+                    st.rerun()
+            with col_page:
+                st.caption(f"{label('label.page', 'Page')} {len(cursors)}")
+            with col_next:
+                if st.button(label("btn.next_page", "Next"), disabled=not has_next, key="history_next"):
+                    cursors.append((rows[-1]["created_at"], rows[-1]["id"]))
+                    st.rerun()
+
 
+@tracing.traced("page.reviews")
 def reviews_page() -> None:
     st.title(nav_label("reviews"))
     today = date_cls.today()
@@ -973,16 +1104,15 @@ def reviews_page() -> None:
             st.rerun()
 
 
+@tracing.traced("page.dashboard")
 def dashboard_page() -> None:
     st.title(nav_label("dashboard"))
     today_str = date_cls.today().isoformat()
 
-    from fate_core.db import db_connection
-
-    with db_connection() as conn:
-        total_habits = conn.execute("SELECT COUNT(*) AS c FROM habits").fetchone()["c"]
-        total_lines = conn.execute("SELECT COUNT(*) AS c FROM lines").fetchone()["c"]
-        total_completions = conn.execute("SELECT COUNT(*) AS c FROM quest_completions").fetchone()["c"]
+    totals = crud.count_totals()
+    total_habits = totals["habits"]
+    total_lines = totals["lines"]
+    total_completions = totals["quest_completions"]
     streak = rules.compute_streak(today_str)
     last_7 = rules.count_perfect_days_last_n(today_str, 7)
 
@@ -994,24 +1124,145 @@ def dashboard_page() -> None:
     )
     st.write(f"{label('label.perfect_days_last_7', 'Perfect Days (last 7)')}: {last_7}")
 
-    st.subheader(label("section.ui_labels_editor", "UI Labels Editor"))
-    stored = list_ui_labels(list(LABEL_KEYS.keys()))
-    with st.form("labels_form"):
-        updates = {}
-        for key, default_value in LABEL_KEYS.items():
-            updates[key] = st.text_input(key, value=stored.get(key, default_value))
-        if st.form_submit_button(label("btn.save_labels", "Save Labels")):
-            for key, value in updates.items():
-                upsert_ui_label(key, value)
-            st.success(label("msg.labels_updated", "Labels updated."))
-            st.rerun()
+    with tracing.span("dashboard.label_editor"):
+        st.subheader(label("section.ui_labels_editor", "UI Labels Editor"))
+        stored = list_ui_labels(list(LABEL_KEYS.keys()))
+        with st.form("labels_form"):
+            updates = {}
+            for key, default_value in LABEL_KEYS.items():
+                updates[key] = st.text_input(key, value=stored.get(key, default_value))
+            if st.form_submit_button(label("btn.save_labels", "Save Labels")):
+                for key, value in updates.items():
+                    upsert_ui_label(key, value)
+                st.success(label("msg.labels_updated", "Labels updated."))
+                st.rerun()
 
 
-def main() -> None:
+@st.cache_resource
+def init_db_once(profile: str) -> None:
+    # schema setup once per profile per server process; fate_core reads are cached across reruns
     init_db()
+
+
+def activate_profile() -> str:
+    """Point this session's fate_core calls at its profile (sidebar selector, else FATE_PROFILE)."""
+    profile = st.session_state.get("profile") or profiles.env_profile()
+    try:
+        profiles.activate(profile)
+    except KeyError:
+        profile = profiles.DEFAULT
+        profiles.activate(profile)
+    st.session_state["profile"] = profile
+    return profile
+
+
+@tracing.traced("page.search")
+def search_page() -> None:
+    st.title(nav_label("search"))
+    query = st.text_input(label("field.search_query", "Search evidence, notes and reviews"))
+    if not query.strip():
+        return
+    results = search.search(query)
+    if not results:
+        st.info(label("info.no_search_results", "No matches."))
+        return
+    for row in results:
+        kind = label(f"search.kind.{row['kind']}", row["kind"])
+        st.markdown(f"**{_md_escape(kind)}** · {row['date'] or ''}  \n{_snippet_markdown(row['snippet'])}")
+
+
+def _md_escape(text: str) -> str:
+    return re.sub(r"([\\`*_{}\[\]()<>#+\-.!|~$])", r"\\\1", text)
+
+
+def _snippet_markdown(snippet: str) -> str:
+    # user text is escaped; only the highlight markers from search() stay bold
+    parts = (snippet or "").split(search.HIGHLIGHT)
+    return "".join(
+        f"**{_md_escape(part)}**" if i % 2 and part else _md_escape(part)
+        for i, part in enumerate(parts)
+    )
+
+
+@tracing.traced("page.plan")
+def plan_page() -> None:
+    st.title(nav_label("plan"))
+    col1, col2 = st.columns(2)
+    with col1:
+        start = st.date_input(label("field.start_date", "Start Date"), value=date_cls.today())
+    with col2:
+        days = st.slider(label("field.days", "Days"), min_value=7, max_value=PLAN_MAX_DAYS, value=28)
+    plan = rules.forecast(start.isoformat(), days)
+    if not plan.habit_ids:
+        st.info(label("info.no_habits", "No habits yet."))
+        return
+
+    names = {habit["id"]: habit["name"] for habit in crud.list_habits(active_only=True)}
+    # one "0101..." string per habit, reversed so character k is day k; columns come from zip
+    rows = [format(mask, f"0{days}b")[::-1] for mask in plan.masks]
+    habit_col = label("field.habit", "Habit")
+    table = {habit_col: [names.get(habit_id, str(habit_id)) for habit_id in plan.habit_ids]}
+    table[habit_col].append(label("label.due_count", "Due"))
+    for offset, (column, count) in enumerate(zip(zip(*rows), plan.counts())):
+        day = start + timedelta(days=offset)
+        header = f"{day.isoformat()[5:]} {weekday_label(day.weekday())[:2]}"
+        table[header] = ["●" if bit == "1" else "" for bit in column] + [str(count)]
+    st.dataframe(table, use_container_width=True, hide_index=True)
+
+
+def sql_profile_panel(page: str) -> None:
+    """Debug-only (FATE_PROFILE_SQL=1): the queries this rerun issued, grouped by SQL."""
+    entries = profiling.take()
+    profiling.write_trace(entries, label=f"app:{page}")
+    with st.sidebar.expander("SQL profile", expanded=False):
+        total_ms = sum(stat.duration_ms for stat in entries)
+        st.caption(f"{len(entries)} queries, {total_ms:.1f} ms")
+        rows = [
+            {
+                "sql": group["sql"][:200],
+                "calls": group["calls"],
+                "total_ms": group["total_ms"],
+                "max_ms": group["max_ms"],
+                "rows": group["rows"],
+                "callers": ", ".join(group["callers"]),
+            }
+            for group in profiling.aggregate(entries)
+        ]
+        if rows:
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+
+
+def trace_panel(spans: list[tracing.Span]) -> None:
+    """Debug-only (FATE_TRACE=1): wall time and DB calls per span of this rerun."""
+    tracing.export(spans)
+    with st.sidebar.expander("Render timing", expanded=False):
+        rows = [
+            {"span": "· " * span.depth + span.name, "ms": round(span.ms, 2), "db_calls": span.db_calls}
+            for span in spans
+        ]
+        if rows:
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+            st.download_button(
+                "Chrome trace JSON",
+                data=json.dumps(tracing.chrome_trace(spans)),
+                file_name="fate_trace.json",
+                mime="application/json",
+            )
+
+
+def main() -> None:
+    if profiling.ENABLED:
+        profiling.take()  # drop anything recorded between reruns
+    tracing.start()
+    profile = activate_profile()
+    init_db_once(profile)
+    sync_read_cache()  # once per rerun: picks up writes from fate-api / fate-cli
     st.set_page_config(page_title=label("app.title", "Fate V1"), layout="wide")
 
     st.sidebar.title(label("app.title", "Fate V1"))
+    profile_names = profiles.names()
+    if len(profile_names) > 1:
+        st.sidebar.selectbox(label("sidebar.profile", "Profile"), options=profile_names, key="profile")
     page = st.sidebar.radio(
         label("sidebar.navigate", "Navigate"),
         options=list(NAV_KEYS.keys()),
@@ -1028,6 +1279,16 @@ def main() -> None:
         reviews_page()
     elif page == "dashboard":
         dashboard_page()
+    elif page == "search":
+        search_page()
+    elif page == "plan":
+        plan_page()
+
+    crud.flush_settings()
+    if profiling.ENABLED:
+        sql_profile_panel(page)
+    if tracing.ENABLED:
+        trace_panel(tracing.finish())
 
 
 if __name__ == "__main__":
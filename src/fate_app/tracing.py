@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, TypeVar
+
+from fate_core import profiling
+from fate_core.storage import checkout_count
+
+F = TypeVar("F", bound=Callable)
+
+# Opt-in: FATE_TRACE=1 records spans per rerun and shows them in the sidebar.
+ENABLED = os.environ.get("FATE_TRACE", "").lower() in ("1", "true", "yes")
+EXPORT_PATH = os.environ.get("FATE_TRACE_EXPORT")  # Chrome-trace JSON of the latest rerun
+
+_local = threading.local()  # Streamlit runs each session's script on its own thread
+
+
+@dataclass
+class Span:
+    name: str
+    depth: int
+    start: float
+    end: float = 0.0
+    db_calls: int = 0
+
+    @property
+    def ms(self) -> float:
+        return (self.end - self.start) * 1000
+
+
+def _db_calls() -> int:
+    # real query count when SQL profiling is on, otherwise pooled connection checkouts;
+    # both are per thread, so other sessions and closed storages do not skew a span
+    return profiling.query_count() if profiling.ENABLED else checkout_count()
+
+
+def start() -> None:
+    """Begin a new rerun: drop spans recorded by the previous one."""
+    _local.spans = []
+    _local.stack = []
+
+
+def finish() -> list[Span]:
+    spans = getattr(_local, "spans", [])
+    start()
+    return spans
+
+
+@contextmanager
+def span(name: str) -> Iterator[Span | None]:
+    """Time the enclosed block (and count its DB calls) as a child of the enclosing span."""
+    if not ENABLED:
+        yield None
+        return
+    if not hasattr(_local, "stack"):
+        start()
+    record = Span(name, len(_local.stack), time.perf_counter())
+    _local.spans.append(record)
+    _local.stack.append(record)
+    db_start = _db_calls()
+    try:
+        yield record
+    finally:
+        record.end = time.perf_counter()
+        record.db_calls = _db_calls() - db_start
+        _local.stack.pop()
+
+
+def traced(name: str | None = None) -> Callable[[F], F]:
+    def decorator(func: F) -> F:
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def chrome_trace(spans: list[Span]) -> dict:
+    """Spans as Chrome trace events (load in chrome://tracing or Perfetto)."""
+    origin = min((s.start for s in spans), default=0.0)
+    pid, tid = os.getpid(), threading.get_ident()
+    return {
+        "traceEvents": [
+            {
+                "name": s.name,
+                "ph": "X",
+                "ts": round((s.start - origin) * 1e6, 1),
+                "dur": round((s.end - s.start) * 1e6, 1),
+                "pid": pid,
+                "tid": tid,
+                "args": {"db_calls": s.db_calls},
+            }
+            for s in spans
+        ],
+        "displayTimeUnit": "ms",
+    }
+
+
+def export(spans: list[Span], path: str | None = None) -> None:
+    path = path or EXPORT_PATH
+    if not path or not spans:
+        return
+    target = Path(path).expanduser()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(json.dumps(chrome_trace(spans)), encoding="utf-8")
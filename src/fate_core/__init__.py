@@ -1 +1 @@
-from .db import DB_PATH, init_db
+from .db import DB_PATH, init_db, sync_read_cache
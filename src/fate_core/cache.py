@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import functools
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, TypeVar
+
+from .connection import connect
+from .profiles import active_db_path
+from .storage import _current_batch, after_commit, on_close
+
+F = TypeVar("F", bound=Callable)
+
+MAX_ENTRIES = 256
+
+_lock = threading.Lock()
+# (scope, table) -> generation; the scope is the active profile's DB ("" = default),
+# so each profile has its own entries and invalidations
+_generations: dict[tuple[str, str], int] = {}
+# scope -> epoch, moved by sync() when another connection committed to the scope's DB
+_epochs: dict[str, int] = {}
+# scope -> (connection watching PRAGMA data_version, last value seen, resolved DB path)
+_watchers: dict[str, tuple[sqlite3.Connection, int, Path]] = {}
+_stores: list[OrderedDict] = []
+
+
+def _scope() -> str:
+    return active_db_path() or ""
+
+
+def generation(tables: tuple[str, ...], scope: str | None = None) -> tuple[int, ...]:
+    scope = _scope() if scope is None else scope
+    return (_epochs.get(scope, 0), *(_generations.get((scope, table), 0) for table in tables))
+
+
+def _bump_now(scope: str, tables: tuple[str, ...]) -> None:
+    with _lock:
+        for table in tables:
+            _generations[(scope, table)] = _generations.get((scope, table), 0) + 1
+
+
+def bump(*tables: str, scope: str | None = None) -> None:
+    # inside a group commit this waits for the COMMIT (see storage.after_commit)
+    after_commit(functools.partial(_bump_now, _scope() if scope is None else scope, tables))
+
+
+def sync(db_path: str, scope: str | None = None) -> int:
+    """
+    Generations only move for writes made by this process. Call once per rerun/request:
+    if any other connection (the API, the CLI, another app process) committed to
+    `db_path` since the last call, every entry of the scope is dropped. Returns the
+    DB's PRAGMA data_version (0 before the file exists).
+    """
+    scope = _scope() if scope is None else scope
+    with _lock:
+        watcher = _watchers.get(scope)
+        if watcher is None:
+            try:
+                conn = connect(db_path, read_only=True, check_same_thread=False)
+                version = conn.execute("PRAGMA data_version").fetchone()[0]
+            except sqlite3.OperationalError:
+                return 0
+            _watchers[scope] = (conn, version, Path(db_path).expanduser().resolve())
+            return version
+        conn, seen, path = watcher
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != seen:
+            _epochs[scope] = _epochs.get(scope, 0) + 1
+            _watchers[scope] = (conn, version, path)
+        return version
+
+
+def _forget_watchers(path: Path) -> None:
+    # the storage of `path` was closed (evicted, or the file is being removed/replaced):
+    # close its watchers and drop the scope's entries, a new file starts a new version
+    with _lock:
+        for scope, (conn, _, watched) in list(_watchers.items()):
+            if watched == path:
+                conn.close()
+                del _watchers[scope]
+                _epochs[scope] = _epochs.get(scope, 0) + 1
+
+
+on_close(_forget_watchers)
+
+
+def clear() -> None:
+    with _lock:
+        for key in _generations:
+            _generations[key] += 1
+        for store in _stores:
+            store.clear()
+
+
+def _freeze(value):
+    if isinstance(value, tuple):
+        return value
+    if isinstance(value, (list, set, frozenset)) or hasattr(value, "__next__"):
+        return tuple(value)
+    return value
+
+
+def cached(*tables: str) -> Callable[[F], F]:
+    """
+    Memoize a read function for the life of the process (so across Streamlit reruns).
+    The key is the arguments plus the generation of every table the read touches;
+    any mutator decorated with invalidates() on one of those tables makes old entries
+    unreachable. Results are shared between callers: treat them as read-only.
+    Calls made inside a write job bypass the cache.
+    """
+
+    def decorator(func: F) -> F:
+        store: OrderedDict = OrderedDict()
+        _stores.append(store)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_batch() is not None:
+                # inside a write job: earlier jobs of the batch have written but not yet
+                # bumped (that waits for COMMIT), so an entry could be stale; read through
+                return func(*args, **kwargs)
+            args = tuple(_freeze(arg) for arg in args)
+            kwargs = {key: _freeze(value) for key, value in kwargs.items()}
+            scope = _scope()
+            try:
+                key = (scope, args, tuple(sorted(kwargs.items())), generation(tables, scope))
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+            with _lock:
+                if key in store:
+                    store.move_to_end(key)
+                    return store[key]
+            result = func(*args, **kwargs)
+            with _lock:
+                store[key] = result
+                if len(store) > MAX_ENTRIES:
+                    store.popitem(last=False)
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def invalidates(*tables: str) -> Callable[[F], F]:
+    """Bump the generation of `tables` once the decorated mutator has run (and committed)."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                bump(*tables)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
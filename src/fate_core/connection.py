@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+from . import profiling
+
+# Applied to every connection (fate_core and gml). journal_mode=WAL is persistent in
+# the file, so readers never block the writer and the app and CLI can share a DB.
+PRAGMAS = {
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -16000,  # KiB, i.e. ~16 MB page cache
+    "mmap_size": 268435456,
+    "busy_timeout": 5000,
+}
+
+
+def connect(
+    db_path: str | Path,
+    read_only: bool = False,
+    foreign_keys: bool = False,
+    check_same_thread: bool = True,
+) -> sqlite3.Connection:
+    """
+    Open a configured connection. read_only=True opens a `mode=ro` URI connection for
+    pure readers (stats, exports, dashboard); the file must already exist.
+    """
+    path = Path(db_path).expanduser().resolve()
+    factory = profiling.connection_factory()
+    if read_only:
+        conn = sqlite3.connect(
+            f"{path.as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=check_same_thread,
+            factory=factory,
+        )
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path), check_same_thread=check_same_thread, factory=factory)
+        conn.execute("PRAGMA journal_mode = WAL")
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    if foreign_keys:
+        conn.execute("PRAGMA foreign_keys = ON")
+    conn.row_factory = sqlite3.Row
+    return conn
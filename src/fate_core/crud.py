@@ -1,23 +1,38 @@
 from __future__ import annotations
 
-from typing import Iterable
+from typing import Iterable, Iterator
 
-from .db import db_connection
+from . import settings
+from .cache import cached, invalidates
+from .db import NEXT_QUEST_SQL, db_connection, queued_write, refresh_line_progress
+from .records import Record, fetch_record, fetch_records, iter_records
 
 
-def list_habits(active_only: bool = False) -> list[dict]:
+@cached("habits")
+def list_habits(active_only: bool = False) -> list[Record]:
     clause = "WHERE active = 1" if active_only else ""
-    with db_connection() as conn:
-        rows = conn.execute(
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
             f"""
             SELECT * FROM habits
             {clause}
             ORDER BY sort_order ASC, id ASC
             """
-        ).fetchall()
-    return [dict(row) for row in rows]
+        )
+        return fetch_records(cur)
+
+
+def iter_habits(active_only: bool = False) -> Iterator[Record]:
+    """Uncached, streaming variant of list_habits; holds a read connection until exhausted."""
+    clause = "WHERE active = 1" if active_only else ""
+    with db_connection(read_only=True) as conn:
+        yield from iter_records(
+            conn.execute(f"SELECT * FROM habits {clause} ORDER BY sort_order ASC, id ASC")
+        )
 
 
+@invalidates("habits")
+@queued_write
 def upsert_habit(
     name: str,
     group: str,
@@ -51,11 +66,15 @@ def upsert_habit(
         return habit_id
 
 
+@invalidates("habits")
+@queued_write
 def set_habit_active(habit_id: int, active: int) -> None:
     with db_connection() as conn:
         conn.execute("UPDATE habits SET active = ? WHERE id = ?", (active, habit_id))
 
 
+@invalidates("habit_logs")
+@queued_write
 def upsert_habit_log(date: str, habit_id: int, status: str, minutes: int | None, note: str | None) -> None:
     with db_connection() as conn:
         conn.execute(
@@ -69,38 +88,42 @@ def upsert_habit_log(date: str, habit_id: int, status: str, minutes: int | None,
         )
 
 
-def get_habit_logs(date: str, habit_ids: Iterable[int]) -> dict[int, dict]:
+@cached("habit_logs")
+def get_habit_logs(date: str, habit_ids: Iterable[int]) -> dict[int, Record]:
     habit_ids = list(habit_ids)
     if not habit_ids:
         return {}
     placeholders = ",".join("?" for _ in habit_ids)
-    with db_connection() as conn:
-        rows = conn.execute(
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
             f"""
             SELECT * FROM habit_logs
             WHERE date = ? AND habit_id IN ({placeholders})
             """,
             (date, *habit_ids),
-        ).fetchall()
-    return {row["habit_id"]: dict(row) for row in rows}
+        )
+        return {row["habit_id"]: row for row in fetch_records(cur)}
 
 
-def list_habit_schedules(habit_ids: Iterable[int]) -> dict[int, dict]:
+@cached("habit_schedules")
+def list_habit_schedules(habit_ids: Iterable[int]) -> dict[int, Record]:
     habit_ids = list(habit_ids)
     if not habit_ids:
         return {}
     placeholders = ",".join("?" for _ in habit_ids)
-    with db_connection() as conn:
-        rows = conn.execute(
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
             f"""
             SELECT * FROM habit_schedules
             WHERE habit_id IN ({placeholders})
             """,
             tuple(habit_ids),
-        ).fetchall()
-    return {row["habit_id"]: dict(row) for row in rows}
+        )
+        return {row["habit_id"]: row for row in fetch_records(cur)}
 
 
+@invalidates("habit_schedules")
+@queued_write
 def upsert_habit_schedule(
     habit_id: int,
     schedule_type: str,
@@ -108,43 +131,26 @@ def upsert_habit_schedule(
     interval_days: int | None,
     anchor_date: str | None,
     cooldown_days: int | None,
-    next_due_date: str | None = None,
 ) -> None:
     with db_connection() as conn:
         conn.execute(
             """
             INSERT INTO habit_schedules
-                (habit_id, schedule_type, weekly_days, interval_days, anchor_date, cooldown_days, next_due_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+                (habit_id, schedule_type, weekly_days, interval_days, anchor_date, cooldown_days)
+            VALUES (?, ?, ?, ?, ?, ?)
             ON CONFLICT(habit_id) DO UPDATE SET
                 schedule_type = excluded.schedule_type,
                 weekly_days = excluded.weekly_days,
                 interval_days = excluded.interval_days,
                 anchor_date = excluded.anchor_date,
-                cooldown_days = excluded.cooldown_days,
-                next_due_date = excluded.next_due_date
+                cooldown_days = excluded.cooldown_days
             """,
-            (
-                habit_id,
-                schedule_type,
-                weekly_days,
-                interval_days,
-                anchor_date,
-                cooldown_days,
-                next_due_date,
-            ),
+            (habit_id, schedule_type, weekly_days, interval_days, anchor_date, cooldown_days),
         )
 
 
-def set_habit_next_due_date(habit_id: int, next_due_date: str | None) -> None:
-    with db_connection() as conn:
-        conn.execute(
-            "UPDATE habit_schedules SET next_due_date = ? WHERE habit_id = ?",
-            (next_due_date, habit_id),
-        )
-
-
-def list_lines(active_only: bool = False, line_type: str | None = None) -> list[dict]:
+@cached("lines")
+def list_lines(active_only: bool = False, line_type: str | None = None) -> list[Record]:
     clauses = []
     params: list = []
     if active_only:
@@ -153,18 +159,20 @@ def list_lines(active_only: bool = False, line_type: str | None = None) -> list[
         clauses.append("type = ?")
         params.append(line_type)
     where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
-    with db_connection() as conn:
-        rows = conn.execute(
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
             f"""
             SELECT * FROM lines
             {where}
             ORDER BY sort_order ASC, id ASC
             """,
             tuple(params),
-        ).fetchall()
-    return [dict(row) for row in rows]
+        )
+        return fetch_records(cur)
 
 
+@invalidates("lines", "line_progress")
+@queued_write
 def upsert_line(
     name: str,
     line_type: str,
@@ -182,6 +190,7 @@ def upsert_line(
                 """,
                 (name, line_type, ultimate_goal, active, sort_order),
             )
+            refresh_line_progress(conn, [cur.lastrowid])
             return int(cur.lastrowid)
         conn.execute(
             """
@@ -194,15 +203,18 @@ def upsert_line(
         return line_id
 
 
+@invalidates("lines")
+@queued_write
 def set_line_active(line_id: int, active: int) -> None:
     with db_connection() as conn:
         conn.execute("UPDATE lines SET active = ? WHERE id = ?", (active, line_id))
 
 
-def list_quests(line_id: int, active_only: bool = False) -> list[dict]:
+@cached("quests")
+def list_quests(line_id: int, active_only: bool = False) -> list[Record]:
     clause = "AND active = 1" if active_only else ""
-    with db_connection() as conn:
-        rows = conn.execute(
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
             f"""
             SELECT * FROM quests
             WHERE line_id = ?
@@ -210,10 +222,122 @@ def list_quests(line_id: int, active_only: bool = False) -> list[dict]:
             ORDER BY order_idx ASC, id ASC
             """,
             (line_id,),
-        ).fetchall()
-    return [dict(row) for row in rows]
+        )
+        return fetch_records(cur)
+
+
+def iter_quests(line_id: int | None = None, active_only: bool = False) -> Iterator[Record]:
+    """Uncached, streaming variant of list_quests; line_id=None streams every line."""
+    clauses, params = [], []
+    if line_id is not None:
+        clauses.append("line_id = ?")
+        params.append(line_id)
+    if active_only:
+        clauses.append("active = 1")
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with db_connection(read_only=True) as conn:
+        yield from iter_records(
+            conn.execute(
+                f"SELECT * FROM quests {where} ORDER BY line_id ASC, order_idx ASC, id ASC",
+                params,
+            )
+        )
+
+
+QUEST_PAGE_SIZE = 50
+
+
+def _chapter_clause(chapter: str | None) -> tuple[str, tuple]:
+    # None = all chapters, "" = uncategorized (NULL or empty chapter)
+    if chapter is None:
+        return "", ()
+    if chapter == "":
+        return "AND (q.chapter IS NULL OR q.chapter = '')", ()
+    return "AND q.chapter = ?", (chapter,)
+
+
+@cached("quests", "quest_completions")
+def list_quest_chapters(line_id: int) -> list[Record]:
+    """One row per chapter (in quest order) with counts and weighted progress of active quests."""
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
+            """
+            SELECT COALESCE(q.chapter, '') AS chapter,
+                   COUNT(*) AS quests,
+                   COALESCE(SUM(CASE WHEN q.active = 1 THEN q.difficulty END), 0) AS total_weight,
+                   COALESCE(SUM(
+                       CASE WHEN q.active = 1 AND EXISTS (
+                           SELECT 1 FROM quest_completions qc WHERE qc.quest_id = q.id
+                       ) THEN q.difficulty END
+                   ), 0) AS completed_weight
+            FROM quests q
+            WHERE q.line_id = ?
+            GROUP BY COALESCE(q.chapter, '')
+            ORDER BY MIN(q.order_idx) ASC, MIN(q.id) ASC
+            """,
+            (line_id,),
+        )
+        return fetch_records(cur)
 
 
+@cached("quests")
+def list_quests_page(
+    line_id: int,
+    chapter: str | None = None,
+    after: tuple[int, int] | None = None,
+    limit: int = QUEST_PAGE_SIZE,
+    active_only: bool = False,
+) -> list[Record]:
+    """
+    Keyset page of a line's quests ordered by (order_idx, id).
+    Pass the (order_idx, id) of the last row as `after` to get the next page.
+    """
+    chapter_sql, params = _chapter_clause(chapter)
+    clauses = [chapter_sql]
+    if active_only:
+        clauses.append("AND q.active = 1")
+    if after is not None:
+        clauses.append("AND (q.order_idx, q.id) > (?, ?)")
+        params += (int(after[0]), int(after[1]))
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
+            f"""
+            SELECT q.*
+            FROM quests q
+            WHERE q.line_id = ?
+            {' '.join(clauses)}
+            ORDER BY q.order_idx ASC, q.id ASC
+            LIMIT ?
+            """,
+            (line_id, *params, int(limit)),
+        )
+        return fetch_records(cur)
+
+
+@cached("quests")
+def list_quest_titles(line_id: int) -> list[Record]:
+    """(id, order_idx, title) of every quest in a line, for pickers that span pages."""
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
+            """
+            SELECT id, order_idx, title FROM quests
+            WHERE line_id = ?
+            ORDER BY order_idx ASC, id ASC
+            """,
+            (line_id,),
+        )
+        return fetch_records(cur)
+
+
+@cached("quests")
+def get_quest(quest_id: int) -> Record | None:
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute("SELECT * FROM quests WHERE id = ?", (quest_id,))
+        return fetch_record(cur)
+
+
+@invalidates("quests", "line_progress")
+@queued_write
 def upsert_quest(
     line_id: int,
     chapter: str | None,
@@ -234,6 +358,7 @@ def upsert_quest(
                 """,
                 (line_id, chapter, order_idx, title, dod, difficulty, is_boss, active),
             )
+            refresh_line_progress(conn, [line_id])
             return int(cur.lastrowid)
         conn.execute(
             """
@@ -243,14 +368,64 @@ def upsert_quest(
             """,
             (chapter, order_idx, title, dod, difficulty, is_boss, active, quest_id),
         )
+        refresh_line_progress(conn, [line_id])
         return quest_id
 
 
+@invalidates("quests", "line_progress")
+@queued_write
 def set_quest_active(quest_id: int, active: int) -> None:
     with db_connection() as conn:
         conn.execute("UPDATE quests SET active = ? WHERE id = ?", (active, quest_id))
+        row = conn.execute("SELECT line_id FROM quests WHERE id = ?", (quest_id,)).fetchone()
+        if row:
+            refresh_line_progress(conn, [row["line_id"]])
+
+
+def _apply_quest_completion(conn, quest_id: int) -> None:
+    """Fold a new completion into the cached line_progress row without rescanning the line."""
+    quest = conn.execute(
+        "SELECT line_id, difficulty, active FROM quests WHERE id = ?",
+        (quest_id,),
+    ).fetchone()
+    if quest is None:
+        return
+    n = conn.execute(
+        "SELECT COUNT(*) AS c FROM quest_completions WHERE quest_id = ?",
+        (quest_id,),
+    ).fetchone()["c"]
+    if n != 1 or not quest["active"]:
+        # repeat completions and inactive quests do not move progress
+        return
+    cur = conn.execute(
+        """
+        UPDATE line_progress
+        SET completed = completed + 1,
+            completed_weight = completed_weight + ?,
+            next_quest_id = CASE
+                WHEN next_quest_id = ? THEN (""" + NEXT_QUEST_SQL.format(line_id="?") + """)
+                ELSE next_quest_id
+            END
+        WHERE line_id = ?
+        """,
+        (quest["difficulty"], quest_id, quest["line_id"], quest["line_id"]),
+    )
+    if cur.rowcount == 0:
+        refresh_line_progress(conn, [quest["line_id"]])
+
+
+@cached("line_progress")
+def get_line_progress(line_id: int) -> Record | None:
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
+            "SELECT * FROM line_progress WHERE line_id = ?",
+            (line_id,),
+        )
+        return fetch_record(cur)
 
 
+@invalidates("quest_completions", "line_progress")
+@queued_write
 def create_quest_completion(
     date: str,
     quest_id: int,
@@ -270,42 +445,143 @@ def create_quest_completion(
             """,
             (date, quest_id, minutes, evidence_type, evidence_text, evidence_ref),
         )
+        _apply_quest_completion(conn, quest_id)
         return int(cur.lastrowid)
 
 
-def list_quest_completions(date: str | None = None) -> list[dict]:
-    where = "WHERE date = ?" if date else ""
-    params = (date,) if date else ()
-    with db_connection() as conn:
-        rows = conn.execute(
-            f"SELECT * FROM quest_completions {where} ORDER BY created_at DESC",
+def _completion_filters(
+    date: str | None,
+    line_id: int | None,
+    quest_id: int | None,
+    start_date: str | None,
+    end_date: str | None,
+    before: tuple[str, int] | None,
+) -> tuple[str, tuple]:
+    clauses: list[str] = []
+    params: list = []
+    if date:
+        clauses.append("date = ?")
+        params.append(date)
+    if start_date:
+        clauses.append("date >= ?")
+        params.append(start_date)
+    if end_date:
+        clauses.append("date <= ?")
+        params.append(end_date)
+    if quest_id is not None:
+        clauses.append("quest_id = ?")
+        params.append(quest_id)
+    if line_id is not None:
+        clauses.append("quest_id IN (SELECT id FROM quests WHERE line_id = ?)")
+        params.append(line_id)
+    if before is not None:
+        clauses.append("(created_at, id) < (?, ?)")
+        params.extend((before[0], int(before[1])))
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, tuple(params)
+
+
+COMPLETION_PAGE_SIZE = 50
+
+
+@cached("quest_completions", "quests")
+def list_quest_completions(
+    date: str | None = None,
+    before: tuple[str, int] | None = None,
+    limit: int | None = None,
+    line_id: int | None = None,
+    quest_id: int | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> list[Record]:
+    """
+    Completions newest first, ordered by (created_at, id). For keyset paging pass
+    the (created_at, id) of the last row of a page as `before` for the next one.
+    """
+    where, params = _completion_filters(date, line_id, quest_id, start_date, end_date, before)
+    limit_sql = "LIMIT ?" if limit is not None else ""
+    if limit is not None:
+        params += (int(limit),)
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
+            f"""
+            SELECT * FROM quest_completions
+            {where}
+            ORDER BY created_at DESC, id DESC
+            {limit_sql}
+            """,
             params,
-        ).fetchall()
-    return [dict(row) for row in rows]
+        )
+        return fetch_records(cur)
 
 
-def list_evidence_types(active_only: bool = True) -> list[dict]:
+def iter_quest_completions(
+    line_id: int | None = None,
+    quest_id: int | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    page_size: int = COMPLETION_PAGE_SIZE,
+) -> Iterator[Record]:
+    """
+    Streaming variant of list_quest_completions for exports: walks the (created_at, id)
+    keyset one page at a time, so no connection is held between pages.
+    """
+    read_page = list_quest_completions.__wrapped__  # export pages would only crowd the cache
+    before = None
+    while True:
+        page = read_page(
+            before=before,
+            limit=page_size,
+            line_id=line_id,
+            quest_id=quest_id,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        yield from page
+        if len(page) < page_size:
+            return
+        before = (page[-1]["created_at"], page[-1]["id"])
+
+
+@cached("habits", "lines", "quest_completions")
+def count_totals() -> Record:
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
+            """
+            SELECT (SELECT COUNT(*) FROM habits) AS habits,
+                   (SELECT COUNT(*) FROM lines) AS lines,
+                   (SELECT COUNT(*) FROM quest_completions) AS quest_completions
+            """
+        )
+        return fetch_record(cur)
+
+
+@cached("evidence_types")
+def list_evidence_types(active_only: bool = True) -> list[Record]:
     clause = "WHERE active = 1" if active_only else ""
-    with db_connection() as conn:
-        rows = conn.execute(
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
             f"""
             SELECT * FROM evidence_types
             {clause}
             ORDER BY sort_order ASC, id ASC
             """
-        ).fetchall()
-    return [dict(row) for row in rows]
+        )
+        return fetch_records(cur)
 
 
-def get_evidence_type_by_name(name: str) -> dict | None:
-    with db_connection() as conn:
-        row = conn.execute(
+@cached("evidence_types")
+def get_evidence_type_by_name(name: str) -> Record | None:
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
             "SELECT * FROM evidence_types WHERE LOWER(name) = LOWER(?)",
             (name,),
-        ).fetchone()
-    return dict(row) if row else None
+        )
+        return fetch_record(cur)
 
 
+@invalidates("evidence_types")
+@queued_write
 def upsert_evidence_type(
     name: str,
     active: int,
@@ -333,11 +609,15 @@ def upsert_evidence_type(
         return evidence_type_id
 
 
+@invalidates("evidence_types")
+@queued_write
 def set_evidence_type_active(evidence_type_id: int, active: int) -> None:
     with db_connection() as conn:
         conn.execute("UPDATE evidence_types SET active = ? WHERE id = ?", (active, evidence_type_id))
 
 
+@invalidates("reviews_weekly")
+@queued_write
 def upsert_review_weekly(week_start: str, effective: str, friction: str, next_change: str) -> None:
     with db_connection() as conn:
         conn.execute(
@@ -353,28 +633,26 @@ def upsert_review_weekly(week_start: str, effective: str, friction: str, next_ch
         )
 
 
-def get_review_weekly(week_start: str) -> dict | None:
-    with db_connection() as conn:
-        row = conn.execute(
+@cached("reviews_weekly")
+def get_review_weekly(week_start: str) -> Record | None:
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
             "SELECT * FROM reviews_weekly WHERE week_start = ?",
             (week_start,),
-        ).fetchone()
-    return dict(row) if row else None
+        )
+        return fetch_record(cur)
 
 
-def set_setting(key: str, value: str) -> None:
-    with db_connection() as conn:
-        conn.execute(
-            """
-            INSERT INTO settings (key, value)
-            VALUES (?, ?)
-            ON CONFLICT(key) DO UPDATE SET value = excluded.value
-            """,
-            (key, value),
-        )
+def set_setting(key: str, value: str, defer: bool = False) -> None:
+    settings.current_store().set(key, value, defer=defer)
 
 
 def get_setting(key: str) -> str | None:
-    with db_connection() as conn:
-        row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
-    return row["value"] if row else None
+    return settings.current_store().get(key)
+
+
+def flush_settings(force: bool = False) -> None:
+    if force:
+        settings.current_store().flush()
+    else:
+        settings.current_store().flush_if_due()
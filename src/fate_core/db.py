@@ -1,189 +1,578 @@
+import functools
 import os
 import sqlite3
 from contextlib import contextmanager
+from pathlib import Path
 
-DB_PATH = os.path.join("data", "fate_v1.db")
+from . import cache, profiles, search
+from .connection import connect
+from .storage import get_storage
+
+# FATE_APP_DB may point at the same file as gml's FATE_DB; table names don't overlap.
+DB_PATH = os.environ.get("FATE_APP_DB") or os.path.join("data", "fate_v1.db")
+
+
+def current_db_path() -> str:
+    """DB of the active profile (see profiles.activate), else DB_PATH."""
+    return profiles.active_db_path() or DB_PATH
+
+
+def set_db_path(path: str | os.PathLike) -> str:
+    """Make `path` (resolved, so a later chdir can't move it) this process's default DB."""
+    global DB_PATH
+    DB_PATH = str(Path(path).expanduser().resolve())
+    return DB_PATH
+
+
+def sync_read_cache() -> int:
+    """Drop read-cache entries of the current DB made stale by other processes' commits (see cache.sync)."""
+    return cache.sync(current_db_path())
 
 
 def ensure_data_dir() -> None:
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    os.makedirs(os.path.dirname(os.path.abspath(current_db_path())), exist_ok=True)
 
 
-def get_connection() -> sqlite3.Connection:
+def get_connection(read_only: bool = False) -> sqlite3.Connection:
     ensure_data_dir()
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return connect(current_db_path(), read_only=read_only)
 
 
 @contextmanager
-def db_connection():
-    conn = get_connection()
-    try:
+def db_connection(read_only: bool = False, path: str | None = None):
+    # borrowed from the shared pool of the current DB; committed (or rolled back) on exit
+    with get_storage(path or current_db_path()).connection(read_only=read_only) as conn:
         yield conn
-        conn.commit()
-    finally:
-        conn.close()
 
 
-def init_db() -> None:
-    ensure_data_dir()
-    with db_connection() as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS habits (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                "group" TEXT NOT NULL,
-                min_desc TEXT,
-                normal_desc TEXT,
-                min_xp INTEGER DEFAULT 1,
-                normal_xp INTEGER DEFAULT 2,
-                active INTEGER DEFAULT 1,
-                sort_order INTEGER DEFAULT 0,
-                created_at TEXT DEFAULT (datetime('now'))
-            )
-            """
+def queued_write(func):
+    """
+    Run the decorated mutator on the current DB's writer thread, grouped with concurrent
+    writes into one commit (see storage.WriteQueue). Its db_connection() blocks
+    share the batch transaction. Stack it under @invalidates.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return get_storage(current_db_path()).write(lambda conn: func(*args, **kwargs))
+
+    return wrapper
+
+
+# first active, uncompleted quest of a line; {line_id} is "?" or a correlated column
+NEXT_QUEST_SQL = """
+    SELECT q.id
+    FROM quests q
+    WHERE q.line_id = {line_id} AND q.active = 1
+      AND NOT EXISTS (SELECT 1 FROM quest_completions qc WHERE qc.quest_id = q.id)
+    ORDER BY q.order_idx ASC, q.id ASC
+    LIMIT 1
+"""
+
+
+def refresh_line_progress(conn: sqlite3.Connection, line_ids: list[int]) -> None:
+    """Recompute the cached line_progress rows for the given lines from quests/completions."""
+    if not line_ids:
+        return
+    placeholders = ",".join("?" for _ in line_ids)
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO line_progress
+            (line_id, completed, total, completed_weight, total_weight, next_quest_id)
+        SELECT l.id,
+               COALESCE(SUM(q.done), 0),
+               COUNT(q.id),
+               COALESCE(SUM(q.done * q.difficulty), 0),
+               COALESCE(SUM(q.difficulty), 0),
+               ({NEXT_QUEST_SQL.format(line_id="l.id")})
+        FROM lines l
+        LEFT JOIN (
+            SELECT aq.id, aq.line_id, aq.difficulty,
+                   EXISTS (SELECT 1 FROM quest_completions qc WHERE qc.quest_id = aq.id) AS done
+            FROM quests aq
+            WHERE aq.active = 1
+        ) q ON q.line_id = l.id
+        WHERE l.id IN ({placeholders})
+        GROUP BY l.id
+        """,
+        tuple(line_ids),
+    )
+
+
+def _migration_1_base(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS habits (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            "group" TEXT NOT NULL,
+            min_desc TEXT,
+            normal_desc TEXT,
+            min_xp INTEGER DEFAULT 1,
+            normal_xp INTEGER DEFAULT 2,
+            active INTEGER DEFAULT 1,
+            sort_order INTEGER DEFAULT 0,
+            created_at TEXT DEFAULT (datetime('now'))
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS habit_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                habit_id INTEGER NOT NULL,
-                status TEXT NOT NULL,
-                minutes INTEGER,
-                note TEXT,
-                created_at TEXT DEFAULT (datetime('now')),
-                UNIQUE(date, habit_id),
-                FOREIGN KEY (habit_id) REFERENCES habits(id)
-            )
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS habit_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            habit_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            minutes INTEGER,
+            note TEXT,
+            created_at TEXT DEFAULT (datetime('now')),
+            UNIQUE(date, habit_id),
+            FOREIGN KEY (habit_id) REFERENCES habits(id)
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS habit_schedules (
-                habit_id INTEGER PRIMARY KEY,
-                schedule_type TEXT NOT NULL DEFAULT 'always',
-                weekly_days TEXT,
-                interval_days INTEGER,
-                anchor_date TEXT,
-                cooldown_days INTEGER,
-                next_due_date TEXT,
-                created_at TEXT DEFAULT (datetime('now')),
-                FOREIGN KEY (habit_id) REFERENCES habits(id)
-            )
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS habit_schedules (
+            habit_id INTEGER PRIMARY KEY,
+            schedule_type TEXT NOT NULL DEFAULT 'always',
+            weekly_days TEXT,
+            interval_days INTEGER,
+            anchor_date TEXT,
+            cooldown_days INTEGER,
+            next_due_date TEXT,
+            created_at TEXT DEFAULT (datetime('now')),
+            FOREIGN KEY (habit_id) REFERENCES habits(id)
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS lines (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                ultimate_goal TEXT,
-                active INTEGER DEFAULT 1,
-                sort_order INTEGER DEFAULT 0,
-                created_at TEXT DEFAULT (datetime('now'))
-            )
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lines (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL,
+            ultimate_goal TEXT,
+            active INTEGER DEFAULT 1,
+            sort_order INTEGER DEFAULT 0,
+            created_at TEXT DEFAULT (datetime('now'))
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS quests (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                line_id INTEGER NOT NULL,
-                chapter TEXT,
-                order_idx INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                dod TEXT,
-                difficulty INTEGER NOT NULL,
-                is_boss INTEGER DEFAULT 0,
-                active INTEGER DEFAULT 1,
-                created_at TEXT DEFAULT (datetime('now')),
-                FOREIGN KEY (line_id) REFERENCES lines(id)
-            )
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS quests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            line_id INTEGER NOT NULL,
+            chapter TEXT,
+            order_idx INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            dod TEXT,
+            difficulty INTEGER NOT NULL,
+            is_boss INTEGER DEFAULT 0,
+            active INTEGER DEFAULT 1,
+            created_at TEXT DEFAULT (datetime('now')),
+            FOREIGN KEY (line_id) REFERENCES lines(id)
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS quest_completions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                quest_id INTEGER NOT NULL,
-                minutes INTEGER,
-                evidence_type TEXT,
-                evidence_text TEXT NOT NULL,
-                evidence_ref TEXT NOT NULL,
-                created_at TEXT DEFAULT (datetime('now')),
-                FOREIGN KEY (quest_id) REFERENCES quests(id)
-            )
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS quest_completions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            quest_id INTEGER NOT NULL,
+            minutes INTEGER,
+            evidence_type TEXT,
+            evidence_text TEXT NOT NULL,
+            evidence_ref TEXT NOT NULL,
+            created_at TEXT DEFAULT (datetime('now')),
+            FOREIGN KEY (quest_id) REFERENCES quests(id)
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS evidence_types (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                active INTEGER DEFAULT 1,
-                sort_order INTEGER DEFAULT 0,
-                created_at TEXT DEFAULT (datetime('now'))
-            )
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS evidence_types (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            active INTEGER DEFAULT 1,
+            sort_order INTEGER DEFAULT 0,
+            created_at TEXT DEFAULT (datetime('now'))
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS reviews_weekly (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                week_start TEXT NOT NULL UNIQUE,
-                effective TEXT,
-                friction TEXT,
-                next_change TEXT,
-                created_at TEXT DEFAULT (datetime('now'))
-            )
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS reviews_weekly (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            week_start TEXT NOT NULL UNIQUE,
+            effective TEXT,
+            friction TEXT,
+            next_change TEXT,
+            created_at TEXT DEFAULT (datetime('now'))
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS ui_labels (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL
-            )
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ui_labels (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT
-            )
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
         )
-        columns = conn.execute("PRAGMA table_info(habit_schedules)").fetchall()
-        column_names = {row["name"] for row in columns}
-        if "next_due_date" not in column_names:
-            conn.execute("ALTER TABLE habit_schedules ADD COLUMN next_due_date TEXT")
-        conn.execute(
-            """
-            INSERT INTO habit_schedules (habit_id, schedule_type)
-            SELECT h.id, 'always'
-            FROM habits h
-            WHERE h.id NOT IN (SELECT habit_id FROM habit_schedules)
+        """
+    )
+    columns = conn.execute("PRAGMA table_info(habit_schedules)").fetchall()
+    column_names = {row["name"] for row in columns}
+    if "next_due_date" not in column_names:
+        conn.execute("ALTER TABLE habit_schedules ADD COLUMN next_due_date TEXT")
+    conn.execute(
+        """
+        INSERT INTO habit_schedules (habit_id, schedule_type)
+        SELECT h.id, 'always'
+        FROM habits h
+        WHERE h.id NOT IN (SELECT habit_id FROM habit_schedules)
+        """
+    )
+    count = conn.execute("SELECT COUNT(*) AS c FROM evidence_types").fetchone()["c"]
+    if count == 0:
+        defaults = [
+            ("commit", 1, 0),
+            ("file", 1, 1),
+            ("issue", 1, 2),
+            ("note", 1, 3),
+            ("other", 1, 4),
+        ]
+        conn.executemany(
             """
+            INSERT INTO evidence_types (name, active, sort_order)
+            VALUES (?, ?, ?)
+            """,
+            defaults,
+        )
+
+
+def _migration_2_line_progress(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS line_progress (
+            line_id INTEGER PRIMARY KEY,
+            completed INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            completed_weight INTEGER NOT NULL DEFAULT 0,
+            total_weight INTEGER NOT NULL DEFAULT 0,
+            next_quest_id INTEGER,
+            FOREIGN KEY (line_id) REFERENCES lines(id)
         )
-        count = conn.execute("SELECT COUNT(*) AS c FROM evidence_types").fetchone()["c"]
-        if count == 0:
-            defaults = [
-                ("commit", 1, 0),
-                ("file", 1, 1),
-                ("issue", 1, 2),
-                ("note", 1, 3),
-                ("other", 1, 4),
-            ]
-            conn.executemany(
-                """
-                INSERT INTO evidence_types (name, active, sort_order)
-                VALUES (?, ?, ?)
-                """,
-                defaults,
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_quests_line_order
+        ON quests(line_id, active, order_idx, id)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_quest_completions_quest
+        ON quest_completions(quest_id)
+        """
+    )
+    missing = conn.execute(
+        "SELECT id FROM lines WHERE id NOT IN (SELECT line_id FROM line_progress)"
+    ).fetchall()
+    if missing:
+        refresh_line_progress(conn, [row["id"] for row in missing])
+
+
+def _migration_3_quest_chapters(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_quests_line_chapter_order
+        ON quests(line_id, chapter, order_idx, id)
+        """
+    )
+
+
+def _migration_4_completion_history(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_quest_completions_created
+        ON quest_completions(created_at, id)
+        """
+    )
+
+
+def _migration_5_search(conn: sqlite3.Connection) -> None:
+    for kind in ("completion", "habit_note", "review"):
+        search.install_source(conn, kind)
+
+
+# Derived schedule columns, kept current by triggers so every writer (app, API,
+# direct SQL) stays consistent: weekly_mask has bit d set for weekday d (Mon=0),
+# and interval habits are due when (day_number - anchor_day) % period == 0.
+# (next_due_date is a legacy column: cooldowns are read from habit_logs.)
+_DAYS_CSV = "(',' || replace(COALESCE(weekly_days, ''), ' ', '') || ',')"
+SCHEDULE_DERIVED_SQL = f"""
+    weekly_mask = {" | ".join(f"(CASE WHEN instr({_DAYS_CSV}, ',{d},') > 0 THEN {1 << d} ELSE 0 END)" for d in range(7))},
+    period = CASE WHEN interval_days > 0 THEN interval_days + 1 END,
+    anchor_day = CAST(julianday(substr(COALESCE(
+        NULLIF(anchor_date, ''),
+        (SELECT h.created_at FROM habits h WHERE h.id = habit_schedules.habit_id)
+    ), 1, 10)) AS INTEGER)
+"""
+
+# A habit's active flag and schedule as of each day. Rows are written by triggers on
+# habits/habit_schedules, effective from the local date of the change (same-day edits
+# collapse into one row), so editing a schedule never rewrites earlier days. Rows
+# back-filled by migration 7 start at HISTORY_START: the schedule in force before
+# history was kept is taken to be the current one.
+HISTORY_START = "0001-01-01"
+_TODAY = "date('now', 'localtime')"
+
+
+def _due_condition(day: str) -> str:
+    """SQL: history row `v` is in force on `day` (an SQL date expression) and its habit is due."""
+    day_number = f"CAST(julianday({day}) AS INTEGER)"
+    weekday = f"((CAST(strftime('%w', {day}) AS INTEGER) + 6) % 7)"
+    # cooldown: due unless done within the cooldown_days - 1 days before, read from habit_logs
+    # through idx_habit_logs_habit_date (the same rule as COOLDOWN_DUE_SQL)
+    return f"""
+        v.active = 1
+        AND v.valid_from <= {day} AND (v.valid_to IS NULL OR v.valid_to > {day})
+        AND CASE v.schedule_type
+            WHEN 'weekly' THEN (v.weekly_mask >> {weekday}) & 1
+            WHEN 'interval' THEN {day_number} >= v.anchor_day AND ({day_number} - v.anchor_day) % v.period = 0
+            WHEN 'cooldown' THEN COALESCE(v.cooldown_days, 0) <= 0 OR NOT EXISTS (
+                SELECT 1 FROM habit_logs cl
+                WHERE cl.habit_id = v.habit_id AND cl.status IN ('min', 'normal')
+                  AND cl.date < {day} AND cl.date > date({day}, printf('-%d days', v.cooldown_days))
             )
+            ELSE 1
+        END
+    """
+
+
+# Habits due on a day under the schedules in force that day; params {"day": "YYYY-MM-DD"}.
+DUE_HABITS_SQL = f"""
+    SELECT h.*
+    FROM habits h
+    JOIN habit_schedule_history v ON v.habit_id = h.id
+    WHERE {_due_condition(":day")}
+    ORDER BY h.id
+"""
+
+# When each cooldown habit done before :day is next due: its last min/normal log before
+# :day plus the cooldown_days in force that day. A habit is due on :day when this is <= :day
+# or it has no row, matching _due_condition.
+COOLDOWN_DUE_SQL = """
+    SELECT v.habit_id, date(MAX(l.date), printf('+%d days', v.cooldown_days)) AS next_due
+    FROM habit_schedule_history v
+    JOIN habit_logs l
+      ON l.habit_id = v.habit_id AND l.status IN ('min', 'normal') AND l.date < :day
+    WHERE v.schedule_type = 'cooldown' AND v.cooldown_days > 0
+      AND v.valid_from <= :day AND (v.valid_to IS NULL OR v.valid_to > :day)
+    GROUP BY v.habit_id
+"""
+
+# Perfect-day flag for each day of a JSON array; params {"days": json}. A day is perfect
+# when at least one habit is due and every due habit has a min/normal log.
+PERFECT_DAYS_SQL = f"""
+    WITH days(day) AS (SELECT value FROM json_each(:days))
+    SELECT days.day AS date,
+           COUNT(v.habit_id) > 0 AND COUNT(v.habit_id) = COUNT(l.habit_id) AS perfect
+    FROM days
+    LEFT JOIN habit_schedule_history v ON {_due_condition("days.day")}
+    LEFT JOIN habit_logs l
+      ON l.date = days.day AND l.habit_id = v.habit_id AND l.status IN ('min', 'normal')
+    GROUP BY days.day
+"""
+
+
+def _record_schedule_version(habit_id: str) -> str:
+    """Trigger body: close the habit's open history row today and open one with its current state."""
+    return f"""
+        DELETE FROM habit_schedule_history WHERE habit_id = {habit_id} AND valid_from >= {_TODAY};
+        UPDATE habit_schedule_history SET valid_to = {_TODAY}
+        WHERE habit_id = {habit_id} AND (valid_to IS NULL OR valid_to > {_TODAY});
+        INSERT INTO habit_schedule_history
+            (habit_id, valid_from, active, schedule_type, weekly_mask, period, anchor_day, cooldown_days)
+        SELECT h.id, {_TODAY}, COALESCE(h.active, 0), s.schedule_type, s.weekly_mask, s.period, s.anchor_day, s.cooldown_days
+        FROM habits h
+        LEFT JOIN habit_schedules s ON s.habit_id = h.id
+        WHERE h.id = {habit_id};
+        DELETE FROM perfect_days WHERE date >= {_TODAY};
+    """
+
+
+def _forget_perfect_days(day: str, habit_id: str) -> str:
+    """Trigger body: drop stored perfect days a log change can affect (cooldowns reach ahead)."""
+    return f"""
+        DELETE FROM perfect_days
+        WHERE date = {day}
+           OR (date > {day} AND date < date({day}, printf('+%d days', (
+                SELECT MAX(cooldown_days) FROM habit_schedule_history
+                WHERE habit_id = {habit_id} AND schedule_type = 'cooldown'
+           ))));
+    """
+
+
+def _create_derive_triggers(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS habit_schedules_derive_ai
+        AFTER INSERT ON habit_schedules
+        BEGIN
+            UPDATE habit_schedules SET {SCHEDULE_DERIVED_SQL} WHERE habit_id = NEW.habit_id;
+        END
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS habit_schedules_derive_au
+        AFTER UPDATE OF schedule_type, weekly_days, interval_days, anchor_date
+        ON habit_schedules
+        BEGIN
+            UPDATE habit_schedules SET {SCHEDULE_DERIVED_SQL} WHERE habit_id = NEW.habit_id;
+        END
+        """
+    )
+
+
+def _migration_6_due_index(conn: sqlite3.Connection) -> None:
+    column_names = {row["name"] for row in conn.execute("PRAGMA table_info(habit_schedules)").fetchall()}
+    for column in ("weekly_mask", "period", "anchor_day"):
+        if column not in column_names:
+            conn.execute(f"ALTER TABLE habit_schedules ADD COLUMN {column} INTEGER")
+    _create_derive_triggers(conn)
+    conn.execute(f"UPDATE habit_schedules SET {SCHEDULE_DERIVED_SQL}")
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_habit_schedules_due
+        ON habit_schedules(schedule_type, next_due_date)
+        """
+    )
+
+
+def _migration_7_schedule_history(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS habit_schedule_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            habit_id INTEGER NOT NULL,
+            valid_from TEXT NOT NULL,
+            valid_to TEXT,
+            active INTEGER NOT NULL,
+            schedule_type TEXT,
+            weekly_mask INTEGER,
+            period INTEGER,
+            anchor_day INTEGER,
+            cooldown_days INTEGER,
+            UNIQUE(habit_id, valid_from),
+            FOREIGN KEY (habit_id) REFERENCES habits(id)
+        )
+        """
+    )
+    # derived, never edited: evaluated perfect days, dropped by the triggers below
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS perfect_days (
+            date TEXT PRIMARY KEY,
+            perfect INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_habit_logs_habit_date
+        ON habit_logs(habit_id, date)
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT INTO habit_schedule_history
+            (habit_id, valid_from, active, schedule_type, weekly_mask, period, anchor_day, cooldown_days)
+        SELECT h.id, '{HISTORY_START}', COALESCE(h.active, 0), s.schedule_type, s.weekly_mask, s.period,
+               s.anchor_day, s.cooldown_days
+        FROM habits h
+        LEFT JOIN habit_schedules s ON s.habit_id = h.id
+        WHERE h.id NOT IN (SELECT habit_id FROM habit_schedule_history)
+        """
+    )
+    changed = " OR ".join(
+        f"OLD.{column} IS NOT NEW.{column}"
+        for column in ("schedule_type", "weekly_mask", "period", "anchor_day", "cooldown_days")
+    )
+    # next_due_date is legacy (unused) and not part of a version
+    triggers = {
+        "habits_history_ai": ("AFTER INSERT ON habits", _record_schedule_version("NEW.id")),
+        "habits_history_au": (
+            "AFTER UPDATE OF active ON habits WHEN OLD.active IS NOT NEW.active",
+            _record_schedule_version("NEW.id"),
+        ),
+        "habit_schedules_history_ai": ("AFTER INSERT ON habit_schedules", _record_schedule_version("NEW.habit_id")),
+        "habit_schedules_history_au": (
+            f"AFTER UPDATE ON habit_schedules WHEN {changed}",
+            _record_schedule_version("NEW.habit_id"),
+        ),
+        "habit_schedules_history_ad": ("AFTER DELETE ON habit_schedules", _record_schedule_version("OLD.habit_id")),
+        "habit_logs_perfect_days_ai": ("AFTER INSERT ON habit_logs", _forget_perfect_days("NEW.date", "NEW.habit_id")),
+        "habit_logs_perfect_days_au": (
+            "AFTER UPDATE ON habit_logs",
+            _forget_perfect_days("OLD.date", "OLD.habit_id") + _forget_perfect_days("NEW.date", "NEW.habit_id"),
+        ),
+        "habit_logs_perfect_days_ad": ("AFTER DELETE ON habit_logs", _forget_perfect_days("OLD.date", "OLD.habit_id")),
+    }
+    for name, (event, body) in triggers.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+
+
+def _migration_8_quest_completion_history(conn: sqlite3.Connection) -> None:
+    # per-quest history pages: filter on quest_id, walk (created_at, id) without a sort
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_quest_completions_quest_created
+        ON quest_completions(quest_id, created_at, id)
+        """
+    )
+
+
+def _migration_9_drop_due_index(conn: sqlite3.Connection) -> None:
+    # due habits are read from habit_schedule_history and habit_logs (see _due_condition);
+    # nothing reads habit_schedules.next_due_date any more
+    conn.execute("DROP INDEX IF EXISTS idx_habit_schedules_due")
+
+
+def _migration_10_drop_next_due_derivation(conn: sqlite3.Connection) -> None:
+    # the derive triggers normalised next_due_date, which nothing writes or reads now
+    conn.execute("DROP TRIGGER IF EXISTS habit_schedules_derive_ai")
+    conn.execute("DROP TRIGGER IF EXISTS habit_schedules_derive_au")
+    _create_derive_triggers(conn)
+
+
+MIGRATIONS = [
+    (1, _migration_1_base),
+    (2, _migration_2_line_progress),
+    (3, _migration_3_quest_chapters),
+    (4, _migration_4_completion_history),
+    (5, _migration_5_search),
+    (6, _migration_6_due_index),
+    (7, _migration_7_schedule_history),
+    (8, _migration_8_quest_completion_history),
+    (9, _migration_9_drop_due_index),
+    (10, _migration_10_drop_next_due_derivation),
+]
+
+
+def init_db() -> None:
+    ensure_data_dir()
+    get_storage(current_db_path()).migrate("fate_core", MIGRATIONS)
+    cache.clear()
@@ -1,8 +1,10 @@
+from .cache import cached, invalidates
 from .db import db_connection
 
 
+@cached("ui_labels")
 def get_label(key: str) -> str | None:
-    with db_connection() as conn:
+    with db_connection(read_only=True) as conn:
         row = conn.execute("SELECT value FROM ui_labels WHERE key = ?", (key,)).fetchone()
     return row["value"] if row else None
 
@@ -12,6 +14,7 @@ def L(key: str, default_value: str) -> str:
     return value if value is not None and value != "" else default_value
 
 
+@invalidates("ui_labels")
 def upsert_ui_label(key: str, value: str) -> None:
     with db_connection() as conn:
         conn.execute(
@@ -24,11 +27,12 @@ def upsert_ui_label(key: str, value: str) -> None:
         )
 
 
+@cached("ui_labels")
 def list_ui_labels(keys: list[str]) -> dict[str, str]:
     if not keys:
         return {}
     placeholders = ",".join("?" for _ in keys)
-    with db_connection() as conn:
+    with db_connection(read_only=True) as conn:
         rows = conn.execute(
             f"SELECT key, value FROM ui_labels WHERE key IN ({placeholders})",
             tuple(keys),
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import os
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Iterator
+
+# A profile is a named DB file (family members, test sandboxes) shared by the app and
+# the CLI; their table names don't overlap. "default" keeps the FATE_APP_DB / FATE_DB
+# paths. The registry is a small JSON file: {"profiles": {"name": "/path/to.db"}}.
+DEFAULT = "default"
+_NAME_RE = re.compile(r"^[A-Za-z0-9_-]{1,40}$")
+
+# DB path of the profile active in this context (a Streamlit session's script thread,
+# a CLI process); None = default. Writer-queue jobs run in a copy of the submitter's.
+_active: ContextVar[str | None] = ContextVar("fate_profile_db", default=None)
+
+
+def registry_path() -> Path:
+    """
+    Priority:
+    1) env FATE_PROFILES
+    2) ~/.fate/profiles.json
+    """
+    p = os.environ.get("FATE_PROFILES")
+    if p:
+        return Path(p).expanduser()
+    return Path("~/.fate/profiles.json").expanduser()
+
+
+def load() -> dict[str, str]:
+    """Registered profiles: name -> DB path (without "default")."""
+    path = registry_path()
+    if not path.exists():
+        return {}
+    import json
+
+    data = json.loads(path.read_text(encoding="utf-8") or "{}")
+    return {str(name): str(db) for name, db in (data.get("profiles") or {}).items()}
+
+
+def names() -> list[str]:
+    return [DEFAULT, *sorted(load())]
+
+
+def register(name: str, db_path: str | Path | None = None) -> Path:
+    """Add or move a profile; the DB defaults to ~/.fate/profiles/<name>.db."""
+    if not _NAME_RE.match(name) or name == DEFAULT:
+        raise ValueError(f"Invalid profile name: {name!r} (letters, digits, - and _; not {DEFAULT!r})")
+    target = Path(db_path or f"~/.fate/profiles/{name}.db").expanduser().resolve()
+    profiles = load()
+    profiles[name] = str(target)
+    path = registry_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    import json
+
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"profiles": profiles}, indent=2) + "\n", encoding="utf-8")
+    tmp.replace(path)
+    return target
+
+
+def db_path(name: str | None) -> Path | None:
+    """The profile's DB file; None for the default profile. Unknown names raise KeyError."""
+    if not name or name == DEFAULT:
+        return None
+    profiles = load()
+    if name not in profiles:
+        raise KeyError(f"Unknown profile: {name!r} (known: {', '.join(names())})")
+    return Path(profiles[name]).expanduser()
+
+
+def env_profile() -> str:
+    return os.environ.get("FATE_PROFILE") or DEFAULT
+
+
+def activate(name: str | None) -> None:
+    """Point fate_core (DB, read cache, settings) at `name` for the current context."""
+    path = db_path(name)
+    _active.set(str(path.resolve()) if path is not None else None)
+
+
+def active_db_path() -> str | None:
+    return _active.get()
+
+
+@contextmanager
+def using(name: str | None) -> Iterator[None]:
+    with using_db(db_path(name)):
+        yield
+
+
+@contextmanager
+def using_db(path: str | Path | None) -> Iterator[None]:
+    """`using` for a DB file that isn't registered as a profile (benchmarks, scratch copies)."""
+    token = _active.set(str(Path(path).expanduser().resolve()) if path is not None else None)
+    try:
+        yield
+    finally:
+        _active.reset(token)
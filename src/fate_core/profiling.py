@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import atexit
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+# json/logging are imported where used: this module loads on every CLI start.
+
+# Opt-in: FATE_PROFILE_SQL=1 makes every connection (fate_core and gml) a ProfilingConnection.
+ENABLED = os.environ.get("FATE_PROFILE_SQL", "").lower() in ("1", "true", "yes")
+SLOW_MS = float(os.environ.get("FATE_SLOW_SQL_MS", "50"))
+TRACE_PATH = os.environ.get("FATE_SQL_TRACE")  # append one JSON line per rerun / process
+MAX_ENTRIES = 5000
+
+_lock = threading.Lock()
+_entries: deque = deque(maxlen=MAX_ENTRIES)
+_counts = threading.local()  # .queries: recorded on this thread
+
+# frames from these files are plumbing; the caller is the first frame outside them
+_INTERNAL = tuple(
+    os.path.join("fate_core", name)
+    for name in ("profiling.py", "records.py", "storage.py", "connection.py")
+) + ("contextlib.py",)
+
+
+class QueryStat:
+    __slots__ = ("sql", "duration_ms", "rows", "caller", "started")
+
+    def __init__(self, sql: str, duration_ms: float, rows: int, caller: str, started: float) -> None:
+        self.sql = sql
+        self.duration_ms = duration_ms
+        self.rows = rows
+        self.caller = caller
+        self.started = started
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _normalize(sql: str) -> str:
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def _caller() -> str:
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename.endswith(_INTERNAL):
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+
+
+def _record(stat: QueryStat) -> None:
+    with _lock:
+        _entries.append(stat)
+    _counts.queries = getattr(_counts, "queries", 0) + 1
+    if stat.duration_ms >= SLOW_MS:
+        import logging
+
+        logging.getLogger("fate_core.sql").warning(
+            "slow query %.1f ms (%d rows) from %s: %s",
+            stat.duration_ms,
+            stat.rows,
+            stat.caller,
+            stat.sql[:500],
+        )
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Cursor that times execute plus fetches and counts rows; recorded once exhausted."""
+
+    _stat: QueryStat | None = None
+
+    def _begin(self, sql: str) -> None:
+        self._finish()
+        self._stat = QueryStat(_normalize(sql), 0.0, 0, _caller(), time.time())
+
+    def _finish(self) -> None:
+        if self._stat is not None:
+            stat, self._stat = self._stat, None
+            _record(stat)
+
+    def _timed(self, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            if self._stat is not None:
+                self._stat.duration_ms += (time.perf_counter() - start) * 1000
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql)
+        self._timed(super().execute, sql, parameters)
+        if self.description is None:
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._begin(sql)
+        self._timed(super().executemany, sql, seq_of_parameters)
+        self._finish()
+        return self
+
+    def executescript(self, sql_script):
+        self._begin(sql_script)
+        self._timed(super().executescript, sql_script)
+        self._finish()
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            row = self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+        if self._stat is not None:
+            self._stat.rows += 1
+        return row
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        elif self._stat is not None:
+            self._stat.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, size if size is not None else self.arraysize)
+        if self._stat is not None:
+            self._stat.rows += len(rows)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        if self._stat is not None:
+            self._stat.rows += len(rows)
+        self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """sqlite3 connection whose shortcut execute*() methods go through ProfilingCursor."""
+
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def connection_factory() -> type[sqlite3.Connection]:
+    return ProfilingConnection if ENABLED else sqlite3.Connection
+
+
+def query_count() -> int:
+    """Queries recorded on the calling thread so far (0 unless profiling is enabled)."""
+    return getattr(_counts, "queries", 0)
+
+
+def take() -> list[QueryStat]:
+    """Return and clear the queries recorded so far (call once per rerun / command)."""
+    with _lock:
+        entries = list(_entries)
+        _entries.clear()
+    return entries
+
+
+def aggregate(entries: list[QueryStat]) -> list[dict]:
+    """Per distinct SQL: calls, total/max ms, rows and the callers; slowest total first."""
+    groups: dict[str, dict] = {}
+    for stat in entries:
+        group = groups.setdefault(
+            stat.sql,
+            {"sql": stat.sql, "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "callers": set()},
+        )
+        group["calls"] += 1
+        group["total_ms"] += stat.duration_ms
+        group["max_ms"] = max(group["max_ms"], stat.duration_ms)
+        group["rows"] += stat.rows
+        group["callers"].add(stat.caller)
+    result = []
+    for group in sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True):
+        group["total_ms"] = round(group["total_ms"], 3)
+        group["max_ms"] = round(group["max_ms"], 3)
+        group["callers"] = sorted(group["callers"])
+        result.append(group)
+    return result
+
+
+def write_trace(entries: list[QueryStat], label: str, path: str | None = None) -> None:
+    """Append one JSON line (label, queries, aggregates) to the trace file, if configured."""
+    path = path or TRACE_PATH
+    if not path or not entries:
+        return
+    import json
+
+    record = {
+        "label": label,
+        "ts": time.time(),
+        "total_ms": round(sum(stat.duration_ms for stat in entries), 3),
+        "queries": [stat.to_dict() for stat in entries],
+        "aggregate": aggregate(entries),
+    }
+    target = Path(path).expanduser()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with target.open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _flush_at_exit() -> None:
+    write_trace(take(), label=" ".join(sys.argv) or "process")
+
+
+if ENABLED and TRACE_PATH:
+    atexit.register(_flush_at_exit)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Iterator
+
+ITER_BATCH = 500  # rows per fetchmany() in iter_records
+
+
+class Record(tuple):
+    """
+    A row as a plain tuple plus by-name access: rec["name"], rec.name, rec.get("x"),
+    "name" in rec, rec.keys()/values()/items() and dict(rec). No per-row dict, and
+    immutable, so cached results can be shared safely. Equal only to a Record with the
+    same fields and values. json.dumps sees a tuple (a list): go through to_json().
+    """
+
+    __slots__ = ()
+    _fields: tuple[str, ...] = ()
+    _index: dict[str, int] = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def __getattr__(self, name: str):
+        try:
+            return tuple.__getitem__(self, self._index[name])
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def get(self, key: str, default=None):
+        idx = self._index.get(key)
+        return default if idx is None else tuple.__getitem__(self, idx)
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def __eq__(self, other) -> bool:
+        # not NotImplemented: tuple's reflected __eq__ would compare values only
+        return isinstance(other, Record) and self._fields == other._fields and tuple.__eq__(self, other)
+
+    def __ne__(self, other) -> bool:
+        return not self.__eq__(other)
+
+    def __hash__(self) -> int:
+        return hash((self._fields, tuple(self)))
+
+    def keys(self) -> tuple[str, ...]:
+        return self._fields
+
+    def values(self) -> tuple:
+        return tuple(self)
+
+    def items(self) -> list[tuple[str, object]]:
+        return list(zip(self._fields, self))
+
+    def to_dict(self) -> dict:
+        return dict(zip(self._fields, self))
+
+    def __repr__(self) -> str:
+        return f"Record({', '.join(f'{k}={v!r}' for k, v in zip(self._fields, self))})"
+
+
+_types: dict[tuple[str, ...], type[Record]] = {}
+
+
+def record_type(description) -> type[Record]:
+    fields = tuple(column[0] for column in description)
+    cls = _types.get(fields)
+    if cls is None:
+        cls = type("Record", (Record,), {
+            "__slots__": (),
+            "_fields": fields,
+            "_index": {name: idx for idx, name in enumerate(fields)},
+        })
+        _types[fields] = cls
+    return cls
+
+
+def fetch_records(cur: sqlite3.Cursor) -> list[Record]:
+    if cur.description is None:
+        return []
+    cls = record_type(cur.description)
+    cur.row_factory = None
+    return list(map(cls, cur))
+
+
+def fetch_record(cur: sqlite3.Cursor) -> Record | None:
+    if cur.description is None:
+        return None
+    cls = record_type(cur.description)
+    cur.row_factory = None
+    row = cur.fetchone()
+    return cls(row) if row is not None else None
+
+
+def iter_records(cur: sqlite3.Cursor, size: int = ITER_BATCH) -> Iterator[Record]:
+    """Stream a cursor as Records, `size` rows per fetchmany(), without building a list."""
+    if cur.description is None:
+        return
+    cls = record_type(cur.description)
+    cur.row_factory = None
+    while True:
+        rows = cur.fetchmany(size)
+        if not rows:
+            return
+        yield from map(cls, rows)
+
+
+def to_json(value):
+    """Records -> objects, dict keys -> str, sets/tuples -> lists, for json.dumps."""
+    if isinstance(value, Record):
+        return {key: to_json(item) for key, item in value.items()}
+    if isinstance(value, dict):
+        return {str(key): to_json(item) for key, item in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted(to_json(item) for item in value)
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    return value
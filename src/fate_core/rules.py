@@ -1,133 +1,119 @@
 from __future__ import annotations
 
+import json
+from array import array
+from dataclasses import dataclass
 from datetime import date as date_cls, timedelta
 
-from .db import db_connection
+from . import crud
+from .cache import cached
+from .db import COOLDOWN_DUE_SQL, DUE_HABITS_SQL, PERFECT_DAYS_SQL, current_db_path, db_connection
+from .records import Record, fetch_record, fetch_records
+from .storage import get_storage
 
 SKILL_XP_BASE = 10
+STREAK_CHUNK = 32  # days evaluated per step of compute_streak's walk back (doubling)
+MAX_FORECAST_DAYS = 366
+# julianday(d) = d.toordinal() + 1721424.5; habit_schedules.anchor_day is its integer part
+_JULIAN_DAY_OFFSET = 1721424
 
 
-def _parse_weekly_days(raw: str | None) -> set[int]:
-    if not raw:
-        return set()
-    parts = [part.strip() for part in raw.split(",") if part.strip()]
-    days: set[int] = set()
-    for part in parts:
-        try:
-            day_idx = int(part)
-        except ValueError:
-            continue
-        if 0 <= day_idx <= 6:
-            days.add(day_idx)
-    return days
-
-
-def _date_only(value: str | None) -> str | None:
-    if not value:
-        return None
-    return value[:10]
-
-
-def _is_habit_scheduled(
-    habit: dict,
-    schedule: dict | None,
-    day_date: date_cls,
-) -> bool:
-    schedule_type = (schedule or {}).get("schedule_type") or "always"
-    if schedule_type == "always":
-        return True
-    if schedule_type == "weekly":
-        days = _parse_weekly_days((schedule or {}).get("weekly_days"))
-        if not days:
-            return False
-        return day_date.weekday() in days
-    if schedule_type == "interval":
-        interval_days = int((schedule or {}).get("interval_days") or 0)
-        if interval_days <= 0:
-            return False
-        anchor_raw = (schedule or {}).get("anchor_date") or habit.get("created_at")
-        anchor_date_str = _date_only(anchor_raw)
-        if not anchor_date_str:
-            return False
-        anchor_date = date_cls.fromisoformat(anchor_date_str)
-        delta_days = (day_date - anchor_date).days
-        period = interval_days + 1
-        return delta_days >= 0 and delta_days % period == 0
-    if schedule_type == "cooldown":
-        cooldown_days = int((schedule or {}).get("cooldown_days") or 0)
-        if cooldown_days <= 0:
-            return True
-        next_due_date = _date_only((schedule or {}).get("next_due_date"))
-        if not next_due_date:
-            return True
-        due_date = date_cls.fromisoformat(next_due_date)
-        return day_date >= due_date
-    return True
-
-
-def list_scheduled_habits(day: str) -> list[dict]:
-    day_date = date_cls.fromisoformat(day)
-    with db_connection() as conn:
-        habits = conn.execute(
-            "SELECT * FROM habits WHERE active = 1",
-        ).fetchall()
-        if not habits:
-            return []
-        habit_ids = [row["id"] for row in habits]
-        placeholders = ",".join("?" for _ in habit_ids)
-        schedule_rows = conn.execute(
-            f"""
-            SELECT * FROM habit_schedules
-            WHERE habit_id IN ({placeholders})
-            """,
-            tuple(habit_ids),
-        ).fetchall()
-    schedule_map = {row["habit_id"]: dict(row) for row in schedule_rows}
-    scheduled = []
-    for habit_row in habits:
-        habit = dict(habit_row)
-        schedule = schedule_map.get(habit["id"])
-        if _is_habit_scheduled(habit, schedule, day_date):
-            scheduled.append(habit)
-    return scheduled
+@cached("habits", "habit_schedules", "habit_logs")
+def list_scheduled_habits(day: str) -> list[Record]:
+    """Habits due on `day` under the schedule and active flag in force that day (see db.DUE_HABITS_SQL)."""
+    with db_connection(read_only=True) as conn:
+        return fetch_records(conn.execute(DUE_HABITS_SQL, {"day": day}))
+
+
+HABIT_STATUSES = ("none", "min", "normal")
+
+
+def log_habit_status(
+    day: str,
+    habit_id: int,
+    status: str,
+    minutes: int | None = None,
+    note: str | None = None,
+) -> None:
+    """Save a habit's status for `day` (a done cooldown habit rests until cooldown_due_dates says)."""
+    if status not in HABIT_STATUSES:
+        raise ValueError(f"Unknown habit status: {status}")
+    crud.upsert_habit_log(day, habit_id, status, minutes, note)
+
+
+@cached("habits", "habit_schedules", "habit_logs")
+def cooldown_due_dates(day: str) -> dict[int, str]:
+    """
+    Next due date, as of `day`, of each cooldown habit done before it: the last min/normal
+    log plus cooldown_days. Habits without an entry are due. Shared by list_scheduled_habits,
+    forecast and the Today page (see db.COOLDOWN_DUE_SQL).
+    """
+    with db_connection(read_only=True) as conn:
+        rows = conn.execute(COOLDOWN_DUE_SQL, {"day": day}).fetchall()
+    return {row["habit_id"]: row["next_due"] for row in rows}
+
+
+def _store_perfect_days(days: list[str]) -> None:
+    """
+    Best effort, not awaited: queue a job that re-evaluates `days` in the write transaction
+    and stores them, so no log or schedule change can land between evaluating and storing.
+    A failure (e.g. a read-only DB) only means the days are evaluated again next time.
+    """
+    payload = {"days": json.dumps(days)}
+    get_storage(current_db_path()).submit(
+        lambda conn: conn.execute(f"INSERT OR REPLACE INTO perfect_days (date, perfect) {PERFECT_DAYS_SQL}", payload)
+    )
+
 
+def perfect_days(days: list[str]) -> dict[str, bool]:
+    """
+    Perfect-day flag per day. Evaluated days are stored in perfect_days and reused until a
+    log or schedule change that affects them (triggers drop them); missing days are
+    evaluated on the read connection in one query and stored in the background.
+    """
+    if not days:
+        return {}
+    with db_connection(read_only=True) as conn:
+        flags = {
+            row["date"]: bool(row["perfect"])
+            for row in conn.execute(
+                "SELECT date, perfect FROM perfect_days WHERE date IN (SELECT value FROM json_each(?))",
+                (json.dumps(days),),
+            ).fetchall()
+        }
+        missing = [day for day in days if day not in flags]
+        if missing:
+            for row in conn.execute(PERFECT_DAYS_SQL, {"days": json.dumps(missing)}).fetchall():
+                flags[row["date"]] = bool(row["perfect"])
+    if missing:
+        _store_perfect_days(missing)
+    return flags
 
+
+@cached("habits", "habit_schedules", "habit_logs")
 def compute_perfect_day(day: str) -> bool:
-    habits = list_scheduled_habits(day)
-    if not habits:
-        return False
-    habit_ids = [habit["id"] for habit in habits]
-    placeholders = ",".join("?" for _ in habit_ids)
-    with db_connection() as conn:
-        rows = conn.execute(
-            f"""
-            SELECT habit_id, status FROM habit_logs
-            WHERE date = ? AND habit_id IN ({placeholders})
-            """,
-            (day, *habit_ids),
-        ).fetchall()
-    status_by_habit = {row["habit_id"]: row["status"] for row in rows}
-    for habit_id in habit_ids:
-        status = status_by_habit.get(habit_id)
-        if status not in ("min", "normal"):
-            return False
-    return True
+    return perfect_days([day])[day]
 
 
+@cached("habits", "habit_schedules", "habit_logs")
 def compute_streak(today: str) -> int:
     current = date_cls.fromisoformat(today)
     streak = 0
+    chunk = STREAK_CHUNK
     while True:
-        if compute_perfect_day(current.isoformat()):
+        days = [(current - timedelta(days=offset)).isoformat() for offset in range(chunk)]
+        flags = perfect_days(days)
+        for day in days:
+            if not flags[day]:
+                return streak
             streak += 1
-            current -= timedelta(days=1)
-        else:
-            break
-    return streak
+        current -= timedelta(days=chunk)
+        chunk *= 2
 
 
+@cached("habits", "habit_logs")
 def compute_effort_xp(day: str) -> dict:
-    with db_connection() as conn:
+    with db_connection(read_only=True) as conn:
         rows = conn.execute(
             """
             SELECT h."group" AS group_name,
@@ -150,8 +136,9 @@ def compute_effort_xp(day: str) -> dict:
     return totals
 
 
+@cached("lines", "quests", "quest_completions")
 def compute_skill_xp(day: str) -> dict:
-    with db_connection() as conn:
+    with db_connection(read_only=True) as conn:
         rows = conn.execute(
             """
             SELECT l.id AS line_id,
@@ -175,49 +162,170 @@ def compute_skill_xp(day: str) -> dict:
     return {"by_line": totals, "total": total_xp}
 
 
-def get_next_quest(line_id: int) -> dict | None:
-    with db_connection() as conn:
-        row = conn.execute(
+@cached("line_progress", "quests")
+def get_next_quest(line_id: int) -> Record | None:
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
             """
             SELECT q.*
-            FROM quests q
-            LEFT JOIN quest_completions qc ON qc.quest_id = q.id
-            WHERE q.line_id = ? AND q.active = 1 AND qc.id IS NULL
-            ORDER BY q.order_idx ASC, q.id ASC
-            LIMIT 1
+            FROM line_progress lp
+            JOIN quests q ON q.id = lp.next_quest_id
+            WHERE lp.line_id = ?
             """,
             (line_id,),
-        ).fetchone()
-    return dict(row) if row else None
+        )
+        return fetch_record(cur)
 
 
 def line_progress(line_id: int) -> tuple[int, int]:
-    with db_connection() as conn:
-        total_row = conn.execute(
-            """
-            SELECT COUNT(*) AS total
-            FROM quests
-            WHERE line_id = ? AND active = 1
-            """,
-            (line_id,),
-        ).fetchone()
-        completed_row = conn.execute(
+    progress = crud.get_line_progress(line_id)
+    if not progress:
+        return 0, 0
+    return int(progress["completed"]), int(progress["total"])
+
+
+def line_weighted_progress(line_id: int) -> tuple[int, int]:
+    progress = crud.get_line_progress(line_id)
+    if not progress:
+        return 0, 0
+    return int(progress["completed_weight"]), int(progress["total_weight"])
+
+
+@cached("lines", "line_progress", "quests", "quest_completions")
+def lines_overview(active_only: bool = True) -> list[Record]:
+    """Progress, next quest and last completion for every line in one query."""
+    clause = "WHERE l.active = 1" if active_only else ""
+    with db_connection(read_only=True) as conn:
+        cur = conn.execute(
+            f"""
+            SELECT l.id AS line_id,
+                   l.name AS line_name,
+                   l.type AS line_type,
+                   COALESCE(lp.completed, 0) AS completed,
+                   COALESCE(lp.total, 0) AS total,
+                   COALESCE(lp.completed_weight, 0) AS completed_weight,
+                   COALESCE(lp.total_weight, 0) AS total_weight,
+                   nq.id AS next_quest_id,
+                   nq.title AS next_quest_title,
+                   lc.last_date AS last_completion_date
+            FROM lines l
+            LEFT JOIN line_progress lp ON lp.line_id = l.id
+            LEFT JOIN quests nq ON nq.id = lp.next_quest_id
+            LEFT JOIN (
+                SELECT q.line_id AS line_id, MAX(qc.date) AS last_date
+                FROM quest_completions qc
+                JOIN quests q ON q.id = qc.quest_id
+                GROUP BY q.line_id
+            ) lc ON lc.line_id = l.id
+            {clause}
+            ORDER BY l.sort_order ASC, l.id ASC
             """
-            SELECT COUNT(DISTINCT q.id) AS completed
-            FROM quests q
-            JOIN quest_completions qc ON qc.quest_id = q.id
-            WHERE q.line_id = ? AND q.active = 1
-            """,
-            (line_id,),
-        ).fetchone()
-    return int(completed_row["completed"]), int(total_row["total"])
+        )
+        return fetch_records(cur)
 
 
+@cached("habits", "habit_schedules", "habit_logs")
 def count_perfect_days_last_n(today: str, days: int) -> int:
     current = date_cls.fromisoformat(today)
-    count = 0
-    for _ in range(days):
-        if compute_perfect_day(current.isoformat()):
-            count += 1
-        current -= timedelta(days=1)
-    return count
+    flags = perfect_days([(current - timedelta(days=offset)).isoformat() for offset in range(days)])
+    return sum(flags.values())
+
+
+def _tile(pattern: int, width: int, days: int) -> int:
+    """Repeat a `width`-bit pattern until it covers `days` bits (doubling, not per day)."""
+    while width < days:
+        pattern |= pattern << width
+        width *= 2
+    return pattern & ((1 << days) - 1)
+
+
+def _progression(first: int, step: int, days: int) -> int:
+    """Bits first, first + step, ... below `days`."""
+    if first >= days:
+        return 0
+    return _tile(1, step, days - first) << first
+
+
+@dataclass(frozen=True)
+class Forecast:
+    """
+    Due days per active habit from `start`: masks[i] is a bitset over the days of
+    habit_ids[i] (bit k = due on start + k). Cooldown habits are projected as done
+    on each due day, so they recur every cooldown_days from cooldown_due_dates(start).
+    """
+
+    start: str
+    days: int
+    habit_ids: tuple[int, ...]
+    masks: tuple[int, ...]
+
+    def date(self, offset: int) -> str:
+        return (date_cls.fromisoformat(self.start) + timedelta(days=offset)).isoformat()
+
+    def due_offsets(self, index: int) -> list[int]:
+        mask = self.masks[index]
+        offsets = []
+        while mask:
+            low = mask & -mask
+            offsets.append(low.bit_length() - 1)
+            mask ^= low
+        return offsets
+
+    def due_on(self, offset: int) -> list[int]:
+        return [habit_id for habit_id, mask in zip(self.habit_ids, self.masks) if mask >> offset & 1]
+
+    def counts(self) -> array:
+        """Habits due per day."""
+        if not self.masks or not self.days:
+            return array("H", bytes(2 * self.days))
+        # one bit string per habit, summed column-wise; bit 0 is the last character
+        rows = [format(mask, f"0{self.days}b") for mask in self.masks]
+        return array("H", [column.count("1") for column in zip(*rows)])[::-1]
+
+
+@cached("habits", "habit_schedules", "habit_logs")
+def forecast(start: str, days: int) -> Forecast:
+    """Expand every active habit's schedule over [start, start + days) in one query."""
+    days = max(0, min(int(days), MAX_FORECAST_DAYS))
+    start_date = date_cls.fromisoformat(start)
+    start_day = start_date.toordinal() + _JULIAN_DAY_OFFSET
+    with db_connection(read_only=True) as conn:
+        rows = conn.execute(
+            """
+            SELECT h.id, s.schedule_type, s.weekly_mask, s.period, s.anchor_day,
+                   s.cooldown_days
+            FROM habits h
+            LEFT JOIN habit_schedules s ON s.habit_id = h.id
+            WHERE h.active = 1
+            ORDER BY h.id
+            """
+        ).fetchall()
+    every_day = (1 << days) - 1
+    start_weekday = start_date.weekday()
+    habit_ids, masks = [], []
+    cooldown_due = cooldown_due_dates(start)
+    for habit_id, schedule_type, weekly_mask, period, anchor_day, cooldown_days in rows:
+        if schedule_type == "weekly":
+            week = weekly_mask or 0
+            # rotate so bit 0 is the start's weekday, then tile the week
+            week = ((week >> start_weekday) | (week << (7 - start_weekday))) & 0x7F
+            mask = _tile(week, 7, days) if week and days else 0
+        elif schedule_type == "interval":
+            if not period or anchor_day is None:
+                mask = 0
+            else:
+                first = max(anchor_day - start_day, (anchor_day - start_day) % period)
+                mask = _progression(first, period, days)
+        elif schedule_type == "cooldown":
+            cooldown = int(cooldown_days or 0)
+            if cooldown <= 0:
+                mask = every_day
+            else:
+                next_due = cooldown_due.get(habit_id)
+                due = date_cls.fromisoformat(next_due).toordinal() if next_due else start_date.toordinal()
+                mask = _progression(max(0, due - start_date.toordinal()), cooldown, days)
+        else:
+            mask = every_day
+        habit_ids.append(habit_id)
+        masks.append(mask)
+    return Forecast(start, days, tuple(habit_ids), tuple(masks))
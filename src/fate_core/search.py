@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+from .records import Record, fetch_records
+from .storage import get_storage
+
+# kind -> (rowid code, table, date expr, body expr); "{r}" is NEW/OLD in triggers.
+# Index rowids are ref_id * 8 + code, so triggers update by rowid instead of scanning.
+SOURCES = {
+    "completion": (
+        1,
+        "quest_completions",
+        "{r}.date",
+        "COALESCE({r}.evidence_text, '') || ' ' || COALESCE({r}.evidence_ref, '')",
+    ),
+    "habit_note": (2, "habit_logs", "{r}.date", "COALESCE({r}.note, '')"),
+    "review": (
+        3,
+        "reviews_weekly",
+        "{r}.week_start",
+        "COALESCE({r}.effective, '') || ' ' || COALESCE({r}.friction, '') || ' '"
+        " || COALESCE({r}.next_change, '')",
+    ),
+    "gml_log": (4, "logs", "{r}.date", "COALESCE({r}.notes, '')"),
+}
+
+MIN_TRIGRAM = 3
+DEFAULT_LIMIT = 50
+HIGHLIGHT = "**"  # snippet() wraps matched text in this marker
+
+
+def _tokenizer() -> str:
+    # trigram handles CJK text and substrings; older SQLite falls back to word tokens
+    return "trigram" if sqlite3.sqlite_version_info >= (3, 34, 0) else "unicode61"
+
+
+def install_source(conn: sqlite3.Connection, kind: str) -> None:
+    """Create the shared search_index (once) plus sync triggers and a backfill for one source."""
+    code, table, date_expr, body_expr = SOURCES[kind]
+    conn.execute(
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            body, kind UNINDEXED, ref_id UNINDEXED, date UNINDEXED,
+            tokenize = '{_tokenizer()}'
+        )
+        """
+    )
+    new_body = body_expr.format(r="NEW")
+    insert_new = f"""
+        INSERT INTO search_index (rowid, body, kind, ref_id, date)
+        SELECT NEW.id * 8 + {code}, {new_body}, '{kind}', NEW.id, {date_expr.format(r="NEW")}
+        WHERE TRIM({new_body}) != '';
+    """
+    conn.executescript(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS search_{kind}_ai AFTER INSERT ON {table}
+        BEGIN {insert_new} END;
+        CREATE TRIGGER IF NOT EXISTS search_{kind}_au AFTER UPDATE ON {table}
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + {code};
+            {insert_new}
+        END;
+        CREATE TRIGGER IF NOT EXISTS search_{kind}_ad AFTER DELETE ON {table}
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + {code};
+        END;
+        """
+    )
+    body = body_expr.format(r=table)
+    conn.execute(f"DELETE FROM search_index WHERE kind = '{kind}'")
+    conn.execute(
+        f"""
+        INSERT INTO search_index (rowid, body, kind, ref_id, date)
+        SELECT id * 8 + {code}, {body}, '{kind}', id, {date_expr.format(r=table)}
+        FROM {table}
+        WHERE TRIM({body}) != ''
+        """
+    )
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _query_parts(query: str, trigram: bool) -> tuple[str | None, list[str]]:
+    """Split user input into an FTS5 MATCH expression and LIKE patterns for short terms."""
+    terms = query.split()
+    if trigram:
+        match_terms = [_quote(t) for t in terms if len(t) >= MIN_TRIGRAM]
+        like_terms = [f"%{t}%" for t in terms if len(t) < MIN_TRIGRAM]
+    else:
+        match_terms = [_quote(t) + "*" for t in terms]
+        like_terms = []
+    return (" AND ".join(match_terms) or None), like_terms
+
+
+def _search_db(path: Path, query: str, kinds: tuple[str, ...] | None, limit: int) -> list[Record]:
+    with get_storage(path).connection(read_only=True) as conn:
+        row = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'search_index'"
+        ).fetchone()
+        if row is None:
+            return []
+        match, likes = _query_parts(query, "trigram" in row["sql"])
+        if match is None and not likes:
+            return []
+        clauses: list[str] = []
+        params: list = []
+        if match is not None:
+            clauses.append("search_index MATCH ?")
+            params.append(match)
+        for pattern in likes:
+            # "|| ''" keeps FTS5 from routing short patterns through the trigram index,
+            # which misses multi-byte matches shorter than three characters
+            clauses.append("body || '' LIKE ?")
+            params.append(pattern)
+        if kinds:
+            clauses.append(f"kind IN ({','.join('?' for _ in kinds)})")
+            params.extend(kinds)
+        rank = "bm25(search_index)" if match is not None else "0.0"
+        cur = conn.execute(
+            f"""
+            SELECT kind, ref_id, date,
+                   snippet(search_index, 0, ?, ?, '…', 12) AS snippet,
+                   {rank} AS rank
+            FROM search_index
+            WHERE {' AND '.join(clauses)}
+            ORDER BY rank ASC, date DESC
+            LIMIT ?
+            """,
+            (HIGHLIGHT, HIGHLIGHT, *params, int(limit)),
+        )
+        return fetch_records(cur)
+
+
+def _search_paths() -> list[Path]:
+    from . import db, profiles
+
+    paths = [Path(db.current_db_path()).expanduser().resolve()]
+    if profiles.active_db_path():
+        return paths  # a profile's app and CLI tables live in one file
+    try:
+        from gml.db import default_db_path
+    except ImportError:
+        return paths
+    gml_path = default_db_path().resolve()
+    if gml_path not in paths and gml_path.exists():
+        paths.append(gml_path)
+    return paths
+
+
+def search(
+    query: str,
+    limit: int = DEFAULT_LIMIT,
+    kinds: tuple[str, ...] | None = None,
+) -> list[Record]:
+    """
+    Ranked full-text search over evidence, habit notes, weekly reviews and gml log notes
+    (the app DB plus the gml DB when it is a separate file). Best matches first.
+    """
+    query = query.strip()
+    if not query:
+        return []
+    # bm25 depends on each file's corpus statistics, so scores are not comparable
+    # across databases: interleave sources by normalised position in their own ranking.
+    ranked: list[tuple[float, int, Record]] = []
+    for source, path in enumerate(_search_paths()):
+        if path.exists():
+            rows = _search_db(path, query, kinds, limit)
+            ranked.extend((pos / len(rows), source, row) for pos, row in enumerate(rows))
+    ranked.sort(key=lambda item: item[:2])
+    return [row for _, _, row in ranked[:limit]]
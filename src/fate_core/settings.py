@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import atexit
+import threading
+import time
+
+from . import cache
+from .db import current_db_path, db_connection
+from .profiles import active_db_path
+from .storage import get_storage
+
+DEBOUNCE_SECONDS = 2.0
+
+
+class SettingsStore:
+    """
+    In-memory copy of the settings table. Reads only touch the DB to reload it after
+    another process changed settings (seen through cache.sync / db.sync_read_cache);
+    set() skips values that did not change, and deferred sets are coalesced and written
+    in one transaction by a timer DEBOUNCE_SECONDS after the first one (or on flush).
+    """
+
+    def __init__(self, debounce_seconds: float = DEBOUNCE_SECONDS, db_path: str | None = None) -> None:
+        self.debounce_seconds = debounce_seconds
+        self.db_path = db_path  # a profile's DB; None = the default DB
+        self._lock = threading.RLock()
+        self._values: dict[str, str | None] | None = None
+        self._pending: dict[str, str] = {}
+        self._pending_since: float | None = None
+        self._timer: threading.Timer | None = None
+        self._generation: tuple[int, ...] | None = None  # of "settings" when loaded
+
+    def _load(self) -> dict[str, str | None]:
+        generation = cache.generation(("settings",), self.db_path or "")
+        if self._values is None or generation != self._generation:
+            with db_connection(read_only=True, path=self.db_path) as conn:
+                rows = conn.execute("SELECT key, value FROM settings").fetchall()
+            values = {row["key"]: row["value"] for row in rows}
+            values.update(self._pending)  # not yet written: ours are newer
+            self._values = values
+            self._generation = generation
+        return self._values
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            return self._load().get(key)
+
+    def set(self, key: str, value: str, defer: bool = False) -> None:
+        with self._lock:
+            values = self._load()
+            if key in values and values[key] == value:
+                return
+            values[key] = value
+            self._pending[key] = value
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+            if not defer:
+                self.flush()
+            elif self._timer is None:
+                # written even if no later call comes (the atexit flush misses a killed process)
+                self._timer = threading.Timer(self.debounce_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush_if_due(self) -> None:
+        with self._lock:
+            if self._pending_since is None:
+                return
+            if time.monotonic() - self._pending_since >= self.debounce_seconds:
+                self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            rows = list(self._pending.items())
+            # through the write queue like every other writer (one transaction per flush)
+            get_storage(self.db_path or current_db_path()).write(
+                lambda conn: conn.executemany(
+                    """
+                    INSERT INTO settings (key, value)
+                    VALUES (?, ?)
+                    ON CONFLICT(key) DO UPDATE SET value = excluded.value
+                    """,
+                    rows,
+                )
+            )
+            self._pending.clear()
+            self._pending_since = None
+            cache.bump("settings", scope=self.db_path or "")
+            self._generation = cache.generation(("settings",), self.db_path or "")
+
+    def reload(self) -> None:
+        """Drop the in-memory copy (pending writes are flushed first)."""
+        with self._lock:
+            self.flush()
+            self._values = None
+
+
+_stores: dict[str, SettingsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def current_store() -> SettingsStore:
+    """The settings of the active profile (one store per DB)."""
+    db_path = active_db_path()
+    with _stores_lock:
+        store = _stores.get(db_path or "")
+        if store is None:
+            store = _stores[db_path or ""] = SettingsStore(db_path=db_path)
+        return store
+
+
+def flush_all() -> None:
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        store.flush()
+
+
+atexit.register(flush_all)
@@ -0,0 +1,487 @@
+from __future__ import annotations
+
+import contextvars
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator, Sequence
+
+from .connection import connect
+
+POOL_SIZE = 4
+MAX_OPEN_STORAGES = 8  # LRU of per-file engines (one per profile in use)
+
+# group commit: a batch closes after MAX_BATCH jobs or GROUP_WINDOW_S after its first job
+MAX_BATCH = 64
+GROUP_WINDOW_S = 0.002
+BUSY_RETRIES = 6
+BUSY_BACKOFF_S = 0.01  # doubled per retry
+
+# (version, apply(conn)) per namespace; versions are applied once, in order.
+Migration = tuple[int, Callable[[sqlite3.Connection], None]]
+WriteJob = Callable[[sqlite3.Connection], Any]
+
+# .batch: the _Batch the writer thread is running, if any; .checkouts: see checkout_count()
+_local = threading.local()
+
+
+class _Batch:
+    def __init__(self, storage: "Storage", conn: sqlite3.Connection) -> None:
+        self.storage = storage
+        self.conn = conn
+        self.callbacks: list[Callable[[], None]] = []
+        self.depth = 0  # nested connection() savepoints
+
+
+def _current_batch(storage: "Storage | None" = None) -> _Batch | None:
+    batch = getattr(_local, "batch", None)
+    if batch is None or (storage is not None and batch.storage is not storage):
+        return None
+    return batch
+
+
+def after_commit(callback: Callable[[], None]) -> None:
+    """
+    Run `callback` once the current write batch has ended (now, outside one). Cache
+    invalidation goes through here so no reader sees a new generation before the
+    data it stands for is committed.
+    """
+    batch = _current_batch()
+    if batch is None:
+        callback()
+    else:
+        batch.callbacks.append(callback)
+
+
+def _is_busy(exc: BaseException) -> bool:
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    message = str(exc).lower()
+    return "locked" in message or "busy" in message
+
+
+class WriteQueue:
+    """
+    The single writer of one DB file in this process. Jobs (callables taking the
+    connection) from any thread or asyncio task are queued; a writer thread runs
+    whatever is pending as one transaction, each job in its own savepoint, and
+    commits once. A busy database rolls the batch back and retries it with backoff.
+    """
+
+    def __init__(self, storage: "Storage") -> None:
+        self.storage = storage
+        self._jobs: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "jobs": 0,
+            "batches": 0,
+            "max_batch": 0,
+            "max_depth": 0,
+            "busy_retries": 0,
+            "failed_batches": 0,
+            "commit_ms_total": 0.0,
+            "commit_ms_max": 0.0,
+        }
+
+    def submit(self, job: WriteJob) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if self._thread is None:
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f"fate-writer:{self.storage.path.name}",
+                    daemon=True,
+                )
+                thread.start()  # RuntimeError at interpreter shutdown (e.g. an atexit flush)
+                self._thread = thread
+            # the job sees the submitter's context vars (e.g. the active profile)
+            self._jobs.put((job, contextvars.copy_context(), future))
+            self._stats["max_depth"] = max(self._stats["max_depth"], self._jobs.qsize())
+        return future
+
+    def stop(self) -> None:
+        """Finish the queued jobs, then end the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._jobs.put(None)
+            if thread is not threading.current_thread():
+                thread.join()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        batches = stats["batches"] or 1
+        stats["depth"] = self._jobs.qsize()
+        stats["avg_batch"] = round(stats["jobs"] / batches, 2)
+        stats["avg_commit_ms"] = round(stats.pop("commit_ms_total") / batches, 3)
+        stats["commit_ms_max"] = round(stats["commit_ms_max"], 3)
+        return stats
+
+    def _take_batch(self) -> list | None:
+        first = self._jobs.get()
+        if first is None:
+            return None
+        items = [first]
+        deadline = time.monotonic() + GROUP_WINDOW_S
+        while len(items) < MAX_BATCH:
+            try:
+                item = self._jobs.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                self._jobs.put(None)  # stop after this batch
+                break
+            items.append(item)
+        return items
+
+    def _run(self) -> None:
+        conn = connect(
+            self.storage.path,
+            foreign_keys=self.storage.enforce_foreign_keys(),
+            check_same_thread=False,
+        )
+        conn.isolation_level = None  # transactions are managed explicitly below
+        try:
+            while True:
+                items = self._take_batch()
+                if items is None:
+                    return
+                self._run_batch(conn, items)
+        finally:
+            conn.close()
+
+    def _run_batch(self, conn: sqlite3.Connection, items: list) -> None:
+        batch = _Batch(self.storage, conn)
+        _local.batch = batch
+        outcomes: list = []
+        try:
+            for attempt in range(BUSY_RETRIES + 1):
+                try:
+                    start = time.perf_counter()
+                    conn.execute("BEGIN IMMEDIATE")
+                    outcomes = [self._run_job(conn, job, ctx) for job, ctx, _ in items]
+                    conn.execute("COMMIT")
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    break
+                except sqlite3.OperationalError as exc:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                    if not _is_busy(exc) or attempt == BUSY_RETRIES:
+                        with self._lock:
+                            self._stats["failed_batches"] += 1
+                        for _, _, future in items:
+                            future.set_exception(exc)
+                        return
+                    with self._lock:
+                        self._stats["busy_retries"] += 1
+                    time.sleep(BUSY_BACKOFF_S * (2 ** attempt))
+            with self._lock:
+                self._stats["jobs"] += len(items)
+                self._stats["batches"] += 1
+                self._stats["max_batch"] = max(self._stats["max_batch"], len(items))
+                self._stats["commit_ms_total"] += elapsed_ms
+                self._stats["commit_ms_max"] = max(self._stats["commit_ms_max"], elapsed_ms)
+            for (_, _, future), (ok, value) in zip(items, outcomes):
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+        finally:
+            _local.batch = None
+            # also after a failed batch: over-invalidating is harmless, a missed bump is not
+            for callback in batch.callbacks:
+                callback()
+
+    def _run_job(
+        self,
+        conn: sqlite3.Connection,
+        job: WriteJob,
+        ctx: contextvars.Context,
+    ) -> tuple[bool, Any]:
+        conn.execute("SAVEPOINT job")
+        try:
+            value = ctx.run(job, conn)
+        except Exception as exc:
+            if _is_busy(exc):
+                raise  # retry the whole batch
+            conn.execute("ROLLBACK TO job")
+            conn.execute("RELEASE job")
+            return False, exc
+        conn.execute("RELEASE job")
+        return True, value
+
+
+class Storage:
+    """
+    One SQLite file shared by fate_core and gml: a small pool of configured
+    connections per access mode and a namespaced migration runner.
+    Connections are reused across calls (and threads, one borrower at a time),
+    so their statement caches survive between reads.
+    """
+
+    def __init__(self, path: Path, pool_size: int = POOL_SIZE) -> None:
+        self.path = path
+        self._pools = {
+            False: queue.LifoQueue(maxsize=pool_size),
+            True: queue.LifoQueue(maxsize=pool_size),
+        }
+        self._lock = threading.Lock()
+        self._migrated: set[str] = set()
+        self._writes: WriteQueue | None = None
+        self._foreign_keys: bool | None = None
+        self._foreign_keys_lock = threading.Lock()  # checked from inside migrate()'s lock
+
+    def enforce_foreign_keys(self) -> bool:
+        """
+        Whether connections enforce foreign keys: yes unless the file already holds
+        orphan rows (fate_core ran without enforcement before the shared engine), which
+        would make every later write touching them fail. Checked once per process.
+        """
+        if self._foreign_keys is None:
+            with self._foreign_keys_lock:
+                if self._foreign_keys is None:
+                    self._foreign_keys = self._check_foreign_keys()
+        return self._foreign_keys
+
+    def _check_foreign_keys(self) -> bool:
+        if not self.path.exists():
+            return True
+        conn = connect(self.path, read_only=True)
+        try:
+            orphans = conn.execute(
+                'SELECT "table", COUNT(*) AS n FROM pragma_foreign_key_check GROUP BY "table"'
+            ).fetchall()
+        finally:
+            conn.close()
+        if not orphans:
+            return True
+        logging.getLogger("fate_core.storage").warning(
+            "%s has rows with dangling foreign keys (%s); foreign keys are not enforced "
+            "until they are removed",
+            self.path,
+            ", ".join(f"{row['table']}: {row['n']}" for row in orphans),
+        )
+        return False
+
+    def _acquire(self, read_only: bool) -> sqlite3.Connection:
+        try:
+            return self._pools[read_only].get_nowait()
+        except queue.Empty:
+            return connect(
+                self.path,
+                read_only=read_only,
+                foreign_keys=self.enforce_foreign_keys(),
+                check_same_thread=False,
+            )
+
+    def _release(self, conn: sqlite3.Connection, read_only: bool) -> None:
+        try:
+            self._pools[read_only].put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def connection(self, read_only: bool = False) -> Iterator[sqlite3.Connection]:
+        batch = _current_batch(self)
+        if batch is not None:
+            # inside a write job: share the batch transaction (so reads see its writes)
+            with self._nested(batch) as conn:
+                yield conn
+            return
+        conn = self._acquire(read_only)
+        _local.checkouts = getattr(_local, "checkouts", 0) + 1
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._release(conn, read_only)
+
+    @contextmanager
+    def _nested(self, batch: _Batch) -> Iterator[sqlite3.Connection]:
+        name = f"nested_{batch.depth}"
+        batch.depth += 1
+        batch.conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield batch.conn
+        except BaseException:
+            batch.conn.execute(f"ROLLBACK TO {name}")
+            raise
+        finally:
+            batch.conn.execute(f"RELEASE {name}")
+            batch.depth -= 1
+
+    def _write_queue(self) -> WriteQueue:
+        with self._lock:
+            if self._writes is None:
+                self._writes = WriteQueue(self)
+            return self._writes
+
+    def submit(self, job: WriteJob) -> Future:
+        """Queue `job(conn)` for the writer thread; the future resolves after its batch commits."""
+        return self._write_queue().submit(job)
+
+    def write(self, job: WriteJob) -> Any:
+        """Run `job(conn)` in the next group commit and return its result (blocking)."""
+        batch = _current_batch(self)
+        if batch is not None:
+            with self._nested(batch) as conn:  # already on the writer thread
+                return job(conn)
+        try:
+            future = self.submit(job)
+        except RuntimeError:
+            # no new writer thread once the interpreter is shutting down: write directly
+            with self.connection() as conn:
+                return job(conn)
+        return future.result()
+
+    async def write_async(self, job: WriteJob) -> Any:
+        import asyncio
+
+        return await asyncio.wrap_future(self.submit(job))
+
+    def write_metrics(self) -> dict:
+        """Queue depth, batch sizes, commit times and busy retries of the writer."""
+        if self._writes is None:
+            return {}
+        return self._writes.metrics()
+
+    def migrate(self, namespace: str, migrations: Sequence[Migration]) -> None:
+        """Apply pending migrations of `namespace`; a no-op after the first call per process."""
+        if namespace in self._migrated:
+            return
+        with self._lock:
+            if namespace in self._migrated:
+                return
+            if self._is_current(namespace, migrations):
+                self._migrated.add(namespace)
+                return
+            with self.connection() as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS schema_migrations (
+                        namespace TEXT NOT NULL,
+                        version INTEGER NOT NULL,
+                        applied_at TEXT NOT NULL,
+                        PRIMARY KEY (namespace, version)
+                    )
+                    """
+                )
+                rows = conn.execute(
+                    "SELECT version FROM schema_migrations WHERE namespace = ?",
+                    (namespace,),
+                ).fetchall()
+                applied = {row["version"] for row in rows}
+                for version, apply in sorted(migrations, key=lambda m: m[0]):
+                    if version in applied:
+                        continue
+                    apply(conn)
+                    conn.execute(
+                        """
+                        INSERT OR IGNORE INTO schema_migrations (namespace, version, applied_at)
+                        VALUES (?, ?, ?)
+                        """,
+                        (namespace, version, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+                    )
+                    conn.commit()
+            self._migrated.add(namespace)
+
+    def _is_current(self, namespace: str, migrations: Sequence[Migration]) -> bool:
+        """Read-only check that every migration is applied; no write lock, no DDL."""
+        if not self.path.exists():
+            return False
+        with self.connection(read_only=True) as conn:
+            if conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations'"
+            ).fetchone() is None:
+                return False
+            rows = conn.execute(
+                "SELECT version FROM schema_migrations WHERE namespace = ?",
+                (namespace,),
+            ).fetchall()
+        return {version for version, _ in migrations} <= {row["version"] for row in rows}
+
+    def backup_to(self, dest: Path) -> None:
+        """Consistent copy via the SQLite backup API (a file copy would miss the WAL)."""
+        with self.connection(read_only=True) as src:
+            dst = sqlite3.connect(str(dest))
+            try:
+                src.backup(dst)
+            finally:
+                dst.close()
+
+    def close(self) -> None:
+        if self._writes is not None:
+            self._writes.stop()
+            self._writes = None
+        for pool in self._pools.values():
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
+        self._migrated.clear()
+        self._foreign_keys = None  # the file may be replaced before the next use
+        for hook in _close_hooks:
+            hook(self.path)
+
+
+_storages: OrderedDict[Path, Storage] = OrderedDict()
+_close_hooks: list[Callable[[Path], None]] = []
+
+
+def on_close(hook: Callable[[Path], None]) -> None:
+    """Call `hook(path)` whenever a Storage is closed (close_storage or LRU eviction)."""
+    _close_hooks.append(hook)
+
+_storages_lock = threading.Lock()
+
+
+def get_storage(path: str | Path) -> Storage:
+    """
+    The process-wide Storage for `path` (one per resolved file). The least recently
+    used engine beyond MAX_OPEN_STORAGES is closed, so switching between a few
+    profiles keeps their warm connections.
+    """
+    resolved = Path(path).expanduser().resolve()
+    evicted = None
+    with _storages_lock:
+        storage = _storages.get(resolved)
+        if storage is None:
+            storage = Storage(resolved)
+            _storages[resolved] = storage
+            if len(_storages) > MAX_OPEN_STORAGES:
+                _, evicted = _storages.popitem(last=False)
+        else:
+            _storages.move_to_end(resolved)
+    if evicted is not None:
+        evicted.close()
+    return storage
+
+
+def checkout_count() -> int:
+    """
+    Connections borrowed by the calling thread so far, across all storages (a cheap
+    DB-call counter). Per thread and never reset, so deltas survive close_storage/eviction.
+    """
+    return getattr(_local, "checkouts", 0)
+
+
+def close_storage(path: str | Path) -> None:
+    """Close pooled connections to `path`, e.g. before the file is replaced."""
+    resolved = Path(path).expanduser().resolve()
+    with _storages_lock:
+        storage = _storages.pop(resolved, None)
+    if storage is not None:
+        storage.close()
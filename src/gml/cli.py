@@ -11,29 +11,30 @@ Behavior aligned with your current Excel CLI:
 Data lives locally:
 - default DB: ~/.fate/fate.db
 - env override: FATE_DB=/path/to/fate.db
+- profiles: --profile NAME / FATE_PROFILE=NAME (see `fate profile list`)
 """
 
 from __future__ import annotations
 
 import argparse
 import datetime as dt
+import importlib
 import os
 import sys
 from pathlib import Path
+from typing import Callable, Optional, Tuple
 
 from gml import db
-from gml.export_xlsx import export_xlsx
-from gml.export_csv import export_csv_bundle
+
+# Exporters (openpyxl in particular) are imported inside their subcommands so that
+# `stats`, `task` and the daily logger start without them.
 
 def today_str() -> str:
     return dt.date.today().isoformat()
 
 
 def default_db_path_str() -> str:
-    p = os.environ.get("FATE_DB")
-    if p:
-        return str(Path(p).expanduser())
-    return str(Path("~/.fate/fate.db").expanduser())
+    return str(db.default_db_path())
 
 
 def cmd_init(argv: list[str]) -> None:
@@ -49,7 +50,7 @@ def cmd_init(argv: list[str]) -> None:
     if db_path.exists() and args.force:
         # backup then overwrite
         db.backup_before_write(db_path)
-        db_path.unlink()
+        db.remove_db(db_path)
 
     # idempotent init (safe if exists)
     db.init_db(db_path)
@@ -106,9 +107,6 @@ def cmd_task_add(argv: list[str]) -> None:
     )
     print(f"✅ Added task: {args.id.strip().upper()} [{args.domain.strip().upper()}] {args.name.strip()}")
 
-def _daily_pass(counts: dict) -> bool:
-    return (counts.get("BODY", 0) >= 1 and counts.get("MAIN", 0) >= 1 and counts.get("HOME", 0) >= 1)
-
 def cmd_stats(argv: list[str]) -> None:
     ap = argparse.ArgumentParser(prog="fate stats", description="Show stats for today or recent days.")
     ap.add_argument("scope", nargs="?", default="today", choices=["today", "week"])
@@ -125,7 +123,7 @@ def cmd_stats(argv: list[str]) -> None:
     if args.scope == "today":
         d = end.isoformat()
         counts, mins, xp = db.counts_for_date(db_path, d)
-        passed = _daily_pass(counts)
+        passed = db.daily_pass(counts)
 
         print(f"\nFate Stats — {d}")
         print(f"  BODY={counts['BODY']}  MAIN={counts['MAIN']}  HOME={counts['HOME']}  EXP={counts['EXP']}")
@@ -143,7 +141,7 @@ def cmd_stats(argv: list[str]) -> None:
     for i in range(n):
         day = (end - dt.timedelta(days=(n - 1 - i))).isoformat()
         counts, mins, xp = db.counts_for_date(db_path, day)
-        passed = _daily_pass(counts)
+        passed = db.daily_pass(counts)
         rows.append((day, passed, mins, xp, counts))
         pass_days += 1 if passed else 0
         total_mins += mins
@@ -154,7 +152,7 @@ def cmd_stats(argv: list[str]) -> None:
     for i in range(0, 365):  # cap
         day = (end - dt.timedelta(days=i)).isoformat()
         counts, _, _ = db.counts_for_date(db_path, day)
-        if _daily_pass(counts):
+        if db.daily_pass(counts):
             streak += 1
         else:
             break
@@ -176,6 +174,8 @@ def cmd_export_xlsx(argv: list[str]) -> None:
     ap.add_argument("--overwrite", action="store_true", help="Overwrite if output exists.")
     args = ap.parse_args(argv)
 
+    from gml.export_xlsx import export_xlsx
+
     db_path = Path(args.db).expanduser().resolve()
 
     if args.out:
@@ -200,6 +200,8 @@ def cmd_export_csv(argv: list[str]) -> None:
     ap.add_argument("--overwrite", action="store_true", help="Overwrite output files if they exist.")
     args = ap.parse_args(argv)
 
+    from gml.export_csv import export_csv_bundle
+
     db_path = Path(args.db).expanduser().resolve()
 
     if args.out_dir:
@@ -221,6 +223,34 @@ def cmd_export_csv(argv: list[str]) -> None:
     print(f"   - {out / 'log.csv'}")
     print(f"   - {out / 'chests.csv'}")
 
+def cmd_profile_list(argv: list[str]) -> None:
+    from fate_core import profiles
+
+    ap = argparse.ArgumentParser(prog="fate profile list", description="List profiles and their DB files.")
+    ap.parse_args(argv)
+    active = profiles.env_profile()
+    registered = profiles.load()
+    for name in profiles.names():
+        mark = "*" if name == active else " "
+        path = registered.get(name) or os.environ.get("FATE_DB") or "~/.fate/fate.db"
+        print(f"{mark} {name:16s} {path}")
+    print(f"\nRegistry: {profiles.registry_path()}")
+
+
+def cmd_profile_add(argv: list[str]) -> None:
+    from fate_core import profiles
+
+    ap = argparse.ArgumentParser(prog="fate profile add", description="Register a profile (a separate DB file).")
+    ap.add_argument("name")
+    ap.add_argument("--db", type=str, default=None, help="DB path (default: ~/.fate/profiles/<name>.db)")
+    args = ap.parse_args(argv)
+    try:
+        target = profiles.register(args.name, args.db)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from None
+    print(f"✅ Profile {args.name}: {target}")
+    print(f"Use: fate --profile {args.name} init --seed")
+
 def interactive_daily(db_path: Path, date_str: str, reveal: bool) -> None:
     tasks = db.list_tasks(db_path)
     if not tasks:
@@ -257,7 +287,7 @@ def interactive_daily(db_path: Path, date_str: str, reveal: bool) -> None:
             print("  ✓ logged")
 
     counts, total_minutes, total_xp = db.counts_for_date(db_path, date_str)
-    daily_pass = (counts["BODY"] >= 1 and counts["MAIN"] >= 1 and counts["HOME"] >= 1)
+    daily_pass = db.daily_pass(counts)
 
     print("\nToday summary:")
     print(f"  BODY={counts['BODY']}  MAIN={counts['MAIN']}  HOME={counts['HOME']}  EXP={counts['EXP']}  minutes={total_minutes}  xp={total_xp}")
@@ -270,40 +300,118 @@ def interactive_daily(db_path: Path, date_str: str, reveal: bool) -> None:
     print(f"\nDB: {db_path}\n")
 
 
-def main():
-    # subcommands
-    if len(sys.argv) >= 2 and sys.argv[1] == "init":
-        cmd_init(sys.argv[2:])
-        return
-    if len(sys.argv) >= 2 and sys.argv[1] == "stats":
-        cmd_stats(sys.argv[2:])
-        return
-    if len(sys.argv) >= 3 and sys.argv[1] == "task" and sys.argv[2] == "list":
-        cmd_task_list(sys.argv[3:])
-        return
-    if len(sys.argv) >= 3 and sys.argv[1] == "task" and sys.argv[2] == "add":
-        cmd_task_add(sys.argv[3:])
-        return
-    if len(sys.argv) >= 3 and sys.argv[1] == "export" and sys.argv[2] == "xlsx":
-        cmd_export_xlsx(sys.argv[3:])
-        return
-    if len(sys.argv) >= 3 and sys.argv[1] == "export" and sys.argv[2] == "csv":
-        cmd_export_csv(sys.argv[3:])
-        return
-
-    # default command (aligned with your current interface)
-    ap = argparse.ArgumentParser()
+# argv prefix -> ("module:function", summary). build_parser() turns these into argparse
+# subparsers; a handler is imported only when its command runs and parses its own options.
+COMMANDS: dict[tuple[str, ...], tuple[str, str]] = {
+    ("init",): ("gml.cli:cmd_init", "initialize the local SQLite DB"),
+    ("stats",): ("gml.cli:cmd_stats", "show stats for today or recent days"),
+    ("task", "list"): ("gml.cli:cmd_task_list", "list active tasks"),
+    ("task", "add"): ("gml.cli:cmd_task_add", "add a task"),
+    ("export", "xlsx"): ("gml.cli:cmd_export_xlsx", "export to an XLSX workbook"),
+    ("export", "csv"): ("gml.cli:cmd_export_csv", "export to CSV files"),
+    ("profile", "list"): ("gml.cli:cmd_profile_list", "list profiles"),
+    ("profile", "add"): ("gml.cli:cmd_profile_add", "register a profile DB"),
+    ("serve",): ("gml.server:cmd_serve", "serve commands from a warm background process"),
+}
+
+COMMAND_GROUPS = {
+    "task": "manage tasks",
+    "export": "export the DB",
+    "profile": "manage named profile DBs",
+}
+
+
+def _load(target: str) -> Callable[[list[str]], None]:
+    module_name, func_name = target.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def resolve_command(argv: list[str]) -> Optional[Tuple[Callable[[list[str]], None], list[str]]]:
+    """Longest registered prefix of argv -> (handler, remaining args); None for the default command."""
+    for prefix in sorted(COMMANDS, key=len, reverse=True):
+        if tuple(argv[: len(prefix)]) == prefix:
+            return _load(COMMANDS[prefix][0]), argv[len(prefix):]
+    return None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Top-level parser: the interactive default command's options plus one subparser per
+    registered command. Command subparsers take no options of their own (add_help=False),
+    so everything after the command name, --help included, reaches the handler's parser.
+    """
+    ap = argparse.ArgumentParser(
+        prog="fate",
+        allow_abbrev=False,
+        epilog="Run `fate <command> --help` for command options.",
+    )
     # keep a compatibility alias: --file works as --db (so your muscle memory won't break)
-    ap.add_argument("--db", type=str, default=default_db_path_str())
+    ap.add_argument("--db", type=str, default=None, help="DB path (default: the active profile, FATE_DB or ~/.fate/fate.db)")
     ap.add_argument("--file", type=str, default=None, help="(deprecated) alias of --db")
-    ap.add_argument("--date", type=str, default=today_str())
+    ap.add_argument("--date", type=str, default=None, help="day to log (default: today)")
     ap.add_argument("--reveal", action="store_true", help="also reveal (open) today's chest if Daily Pass")
-    args = ap.parse_args()
+    ap.set_defaults(command=None)
+    commands = ap.add_subparsers(title="commands", metavar="COMMAND")
+    groups: dict[str, argparse._SubParsersAction] = {}
+    for prefix, (_, summary) in COMMANDS.items():
+        parent = commands
+        if len(prefix) > 1:
+            parent = groups.get(prefix[0])
+            if parent is None:
+                group = commands.add_parser(prefix[0], help=COMMAND_GROUPS.get(prefix[0]))
+                parent = groups[prefix[0]] = group.add_subparsers(metavar="COMMAND", required=True)
+        leaf = parent.add_parser(prefix[-1], help=summary, add_help=False)
+        leaf.set_defaults(command=prefix)
+    return ap
+
+
+def forwardable(argv: list[str]) -> bool:
+    """Registered, non-interactive commands can run inside `fate serve`."""
+    return any(
+        prefix != ("serve",) and tuple(argv[: len(prefix)]) == prefix
+        for prefix in COMMANDS
+    )
 
-    db_path = Path((args.file or args.db)).expanduser().resolve()
+
+def _take_profile(argv: list[str]) -> list[str]:
+    """Strip a leading `--profile NAME` and export it as FATE_PROFILE (also for `fate serve`)."""
+    if argv[:1] == ["--profile"] and len(argv) >= 2:
+        os.environ["FATE_PROFILE"], argv = argv[1], argv[2:]
+    elif argv[:1] and argv[0].startswith("--profile="):
+        os.environ["FATE_PROFILE"], argv = argv[0].split("=", 1)[1], argv[1:]
+    return argv
+
+
+def main():
+    argv = _take_profile(sys.argv[1:])
+    try:
+        db.default_db_path()
+    except KeyError as exc:
+        raise SystemExit(f"{exc.args[0]}\nAdd it with: fate profile add NAME") from None
+
+    if forwardable(argv):
+        from gml import client
+
+        code = client.forward(argv)
+        if code is not None:
+            sys.exit(code)
+        # no server listening: run locally
+
+    ap = build_parser()
+    args, rest = ap.parse_known_args(argv)
+    if args.command is not None:
+        if tuple(argv[: len(args.command)]) != args.command:
+            ap.error("options before COMMAND belong to the interactive default command")
+        _load(COMMANDS[args.command][0])(rest)
+        return
+    if rest:
+        ap.error(f"unrecognized arguments: {' '.join(rest)}")
+
+    # default command (aligned with your current interface)
+    db_path = Path((args.file or args.db or default_db_path_str())).expanduser().resolve()
     db.init_db(db_path)
 
-    interactive_daily(db_path, args.date, reveal=args.reveal)
+    interactive_daily(db_path, args.date or today_str(), reveal=args.reveal)
 
 
 if __name__ == "__main__":
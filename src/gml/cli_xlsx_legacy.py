@@ -7,13 +7,21 @@ What this does:
 - Compute today's Daily Pass gate: BODY>=1 and MAIN>=1 and HOME>=1
 - If pass: mark today's Chest_Queue row as Eligible=1 and (optionally) Revealed=1 with timestamp
 
+Journal mode (--journal or FATE_JOURNAL=1):
+- New log rows / chest marks are fsync'd into <file>.journal.ndjson instead of re-saving the workbook
+- `compact` merges the journal into the workbook in one load/save (formatting is kept)
+- A normal (non-journal) run compacts any pending journal first
+
 Usage:
   python gml_cli.py --file GML_v0_1.xlsx
+  python gml_cli.py --file GML_v0_1.xlsx --journal
+  python gml_cli.py compact --file GML_v0_1.xlsx
 """
 
 from __future__ import annotations
 import argparse
 import datetime as dt
+import json
 from pathlib import Path
 import os
 import sys
@@ -25,10 +33,10 @@ import openpyxl
 def today_str() -> str:
     return dt.date.today().isoformat()
 
-def load_wb(path: Path) -> openpyxl.Workbook:
+def load_wb(path: Path, read_only: bool = False) -> openpyxl.Workbook:
     if not path.exists():
         raise FileNotFoundError(f"Excel file not found: {path}")
-    return openpyxl.load_workbook(path)
+    return openpyxl.load_workbook(path, read_only=read_only)
 
 def read_tasks(wb: openpyxl.Workbook):
     ws = wb["TASKS"]
@@ -46,11 +54,12 @@ def read_tasks(wb: openpyxl.Workbook):
         })
     return tasks
 
-def append_log(wb: openpyxl.Workbook, date: str, task_id: str, category: str, minutes: int, notes: str=""):
+def append_log(wb: openpyxl.Workbook, date: str, task_id: str, category: str, minutes: int, notes: str="",
+               ts: str | None = None):
     ws = wb["Daily_Log"]
     # Find next row (append)
     next_row = ws.max_row + 1
-    ts = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    ts = ts or dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     entry_id = next_row - 1  # simple incremental id (header=1)
     ws.cell(next_row, 1, entry_id)
     ws.cell(next_row, 2, date)
@@ -62,7 +71,7 @@ def append_log(wb: openpyxl.Workbook, date: str, task_id: str, category: str, mi
     ws.cell(next_row, 8, "")  # evidence link optional
     ws.cell(next_row, 9, ts)
 
-def counts_for_date(wb: openpyxl.Workbook, date: str):
+def counts_for_date(wb: openpyxl.Workbook, date: str, pending: list[dict] | None = None):
     ws = wb["Daily_Log"]
     # Columns: B Date, D Category
     counts = {"BODY":0,"MAIN":0,"HOME":0,"EXP":0}
@@ -79,9 +88,16 @@ def counts_for_date(wb: openpyxl.Workbook, date: str):
             total_minutes += int(row[4] or 0)
         except Exception:
             pass
+    # journal entries not yet compacted into the workbook
+    for e in pending or []:
+        if e.get("op") != "log" or e.get("date") != date:
+            continue
+        if e.get("category") in counts:
+            counts[e["category"]] += 1
+        total_minutes += int(e.get("minutes") or 0)
     return counts, total_minutes
 
-def mark_chest(wb: openpyxl.Workbook, date: str, reveal: bool):
+def mark_chest(wb: openpyxl.Workbook, date: str, reveal: bool, ts: str | None = None):
     ws = wb["Chest_Queue"]
     # find matching date in col A
     for r in range(2, ws.max_row+1):
@@ -89,10 +105,108 @@ def mark_chest(wb: openpyxl.Workbook, date: str, reveal: bool):
             ws.cell(r,2).value = 1  # eligible
             if reveal:
                 ws.cell(r,5).value = 1
-                ws.cell(r,6).value = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                ws.cell(r,6).value = ts or dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             return True
     return False
 
+def journal_path(xlsx_path: Path) -> Path:
+    return xlsx_path.with_name(xlsx_path.name + ".journal.ndjson")
+
+
+def journal_append(xlsx_path: Path, entry: dict) -> None:
+    """
+    Append one entry to the journal and fsync it (the only write a logged task costs).
+    """
+    line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+    fd = os.open(journal_path(xlsx_path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        os.write(fd, line)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _read_ndjson(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    entries = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # torn last line from a crash mid-append: ignore it
+                continue
+    return entries
+
+
+def read_journal(xlsx_path: Path) -> list[dict]:
+    # include a journal left behind by an interrupted compaction (it was never merged)
+    stale = xlsx_path.with_name(journal_path(xlsx_path).name + ".compacting")
+    return _read_ndjson(stale) + _read_ndjson(journal_path(xlsx_path))
+
+
+def compact_journal(xlsx_path: Path) -> int:
+    """
+    Merge the journal into the workbook in one load/save (a regular workbook, so headers,
+    column widths, freeze panes and validation survive), then drop the journal.
+    Returns the number of merged entries.
+    """
+    xlsx_path = xlsx_path.expanduser().resolve()
+    jpath = journal_path(xlsx_path)
+    stale = jpath.with_name(jpath.name + ".compacting")
+    if jpath.exists():
+        if stale.exists():
+            # previous compaction died before the swap: keep both batches, in order
+            with stale.open("ab") as dst, jpath.open("rb") as src:
+                dst.write(src.read())
+            jpath.unlink()
+        else:
+            # new appends go to a fresh journal while we merge this one
+            os.replace(jpath, stale)
+    entries = _read_ndjson(stale)
+    if not entries:
+        stale.unlink(missing_ok=True)
+        return 0
+
+    logs = [e for e in entries if e.get("op") == "log"]
+    chests: dict[str, dict] = {}
+    for e in entries:
+        if e.get("op") != "chest":
+            continue
+        prev = chests.get(e["date"])
+        if prev is None or e.get("reveal"):
+            chests[e["date"]] = e
+
+    wb = load_wb(xlsx_path)
+    for e in logs:
+        append_log(wb, e["date"], e["task_id"], e["category"], e["minutes"], e["notes"], ts=e["ts"])
+    missing = [d for d, e in chests.items() if not mark_chest(wb, d, bool(e.get("reveal")), ts=e.get("ts"))]
+
+    for d in missing:
+        print(f"  ! Chest: could not find {d} in Chest_Queue (dropped)")
+
+    backup_before_save(xlsx_path)
+    tmp = xlsx_path.with_name(xlsx_path.name + ".tmp")
+    wb.save(str(tmp))
+    os.replace(tmp, xlsx_path)
+    stale.unlink()
+    return len(entries)
+
+
+def cmd_compact(argv: list[str]) -> None:
+    ap = argparse.ArgumentParser(prog="fate compact", description="Merge the append-only journal into the xlsx.")
+    ap.add_argument("--file", type=str, default=default_xlsx_path())
+    args = ap.parse_args(argv)
+
+    path = Path(args.file).expanduser().resolve()
+    n = compact_journal(path)
+    print(f"✅ Compacted {n} journal entries into: {path}" if n else "Nothing to compact.")
+
+
 def default_xlsx_path() -> str:
     # 1) explicit env override
     p = os.environ.get("FATE_FILE")
@@ -165,6 +279,10 @@ def cmd_init(argv: list[str]) -> None:
         raise SystemExit(f"File already exists: {path}\nUse --force to overwrite.")
 
     create_template_xlsx(path, days=args.days)
+    # a stale journal belongs to the old workbook
+    jpath = journal_path(path.resolve())
+    jpath.unlink(missing_ok=True)
+    jpath.with_name(jpath.name + ".compacting").unlink(missing_ok=True)
     print(f"✅ Created template: {path}")
     print("Tip: you can set env var FATE_FILE to point to your data file.")
 
@@ -178,19 +296,37 @@ def backup_before_save(xlsx_path: Path) -> None:
     backup_path = backup_dir / f"{xlsx_path.stem}_{ts}{xlsx_path.suffix}"
     shutil.copy2(xlsx_path, backup_path)
 
+def chest_row_exists(wb: openpyxl.Workbook, date: str) -> bool:
+    for row in wb["Chest_Queue"].iter_rows(min_row=2, max_col=1, values_only=True):
+        if row and str(row[0]).strip() == date:
+            return True
+    return False
+
 def main():
     # subcommand: fate init ...
     if len(sys.argv) >= 2 and sys.argv[1] == "init":
         cmd_init(sys.argv[2:])
         return
+    if len(sys.argv) >= 2 and sys.argv[1] == "compact":
+        cmd_compact(sys.argv[2:])
+        return
     ap = argparse.ArgumentParser()
     ap.add_argument("--file", type=str, default=default_xlsx_path())
     ap.add_argument("--date", type=str, default=today_str())
     ap.add_argument("--reveal", action="store_true", help="also reveal (open) today's chest if Daily Pass")
+    ap.add_argument("--journal", action="store_true", default=os.environ.get("FATE_JOURNAL") == "1",
+                    help="append to <file>.journal.ndjson instead of re-saving the xlsx (merge with `compact`)")
     args = ap.parse_args()
 
     path = Path(args.file).expanduser().resolve()
-    wb = load_wb(path)
+    if args.journal:
+        # read-only streaming load; pending journal entries are counted alongside the sheet
+        wb = load_wb(path, read_only=True)
+        pending = read_journal(path)
+    else:
+        compact_journal(path)
+        wb = load_wb(path)
+        pending = None
     tasks = read_tasks(wb)
 
     # Quick menu
@@ -210,15 +346,44 @@ def main():
             mins_raw = input(f"  Minutes for {tid} (default {match['Default_Minutes']}): ").strip()
             minutes = int(mins_raw) if mins_raw else int(match["Default_Minutes"] or 0)
             notes = input("  Notes (optional): ").strip()
-            append_log(wb, args.date, tid, match["Category"], minutes, notes)
+            if args.journal:
+                entry = {
+                    "op": "log",
+                    "date": args.date,
+                    "task_id": tid,
+                    "category": match["Category"],
+                    "minutes": minutes,
+                    "notes": notes,
+                    "ts": dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                }
+                journal_append(path, entry)
+                pending.append(entry)
+            else:
+                append_log(wb, args.date, tid, match["Category"], minutes, notes)
             print("  ✓ logged")
-    counts, total_minutes = counts_for_date(wb, args.date)
+    counts, total_minutes = counts_for_date(wb, args.date, pending)
     daily_pass = (counts["BODY"]>=1 and counts["MAIN"]>=1 and counts["HOME"]>=1)
 
     print("\nToday summary:")
     print(f"  BODY={counts['BODY']}  MAIN={counts['MAIN']}  HOME={counts['HOME']}  EXP={counts['EXP']}  minutes={total_minutes}")
     print(f"  Daily Pass: {'YES' if daily_pass else 'NO'} (needs BODY>=1 & MAIN>=1 & HOME>=1)")
 
+    if args.journal:
+        if daily_pass:
+            if chest_row_exists(wb, args.date):
+                journal_append(path, {
+                    "op": "chest",
+                    "date": args.date,
+                    "reveal": bool(args.reveal),
+                    "ts": dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                })
+                print("  Chest: eligible marked" + (" + revealed" if args.reveal else "") + " (journaled)")
+            else:
+                print("  Chest: could not find today's row in Chest_Queue")
+        wb.close()
+        print(f"\nJournal: {journal_path(path)}\n")
+        return
+
     if daily_pass:
         ok = mark_chest(wb, args.date, reveal=args.reveal)
         if ok:
@@ -0,0 +1,87 @@
+"""
+Thin client for `fate serve`: forwards argv (plus the DB/profile env and cwd) over the Unix
+socket and replays the captured output. Kept import-light on purpose.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Optional
+
+FORWARDED_ENV = ("FATE_DB", "FATE_PROFILE", "FATE_PROFILES")
+TIMEOUT_S = 60.0
+
+
+def socket_path() -> Path:
+    """
+    Priority:
+    1) env FATE_SOCKET
+    2) ~/.fate/fate-cli.sock
+    """
+    p = os.environ.get("FATE_SOCKET")
+    if p:
+        return Path(p).expanduser()
+    return Path("~/.fate/fate-cli.sock").expanduser()
+
+
+class ServerError(Exception):
+    """The request reached the server but no usable reply came back; it may have run."""
+
+
+def request(sock_path: Path, payload: dict) -> Optional[dict]:
+    """
+    One request/response round trip. None when no server is listening (nothing was
+    sent); ServerError when the connection fails after the request was sent.
+    """
+    if not hasattr(socket, "AF_UNIX") or not sock_path.exists():
+        return None
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(TIMEOUT_S)
+        try:
+            sock.connect(str(sock_path))
+        except OSError:
+            return None  # missing or stale socket (ENOENT, ECONNREFUSED): nothing ran
+        chunks = []
+        try:
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        except OSError as exc:  # includes socket.timeout
+            raise ServerError(f"connection to {sock_path} failed: {exc}") from exc
+    try:
+        return json.loads(b"".join(chunks))
+    except ValueError as exc:
+        raise ServerError(f"no valid reply from {sock_path}") from exc
+
+
+def forward(argv: list[str]) -> Optional[int]:
+    """
+    Run argv on the server and print its output; None means no server, run locally
+    instead. Once the request is sent it is never re-run locally: a lost reply is an error.
+    """
+    if os.environ.get("FATE_NO_SERVER") == "1":
+        return None
+    try:
+        reply = request(
+            socket_path(),
+            {
+                "argv": argv,
+                "env": {key: os.environ.get(key) for key in FORWARDED_ENV},
+                "cwd": os.getcwd(),
+            },
+        )
+    except ServerError as exc:
+        sys.stderr.write(f"fate-cli: {exc}; the command may or may not have run on the server\n")
+        return 1
+    if reply is None:
+        return None
+    sys.stdout.write(reply.get("stdout", ""))
+    sys.stderr.write(reply.get("stderr", ""))
+    return int(reply.get("code", 0))
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import functools
 import os
 import sqlite3
-import shutil
+from contextlib import AbstractContextManager
 from datetime import datetime, date, timedelta
 from pathlib import Path
 from typing import Dict, Tuple, Optional
 
+from fate_core import profiles, search
+from fate_core.connection import connect as open_connection
+from fate_core.storage import close_storage, get_storage
+
 DOMAINS = ("BODY", "MAIN", "HOME", "EXP")
 
 
@@ -17,23 +22,49 @@ def now_ts() -> str:
 def default_db_path() -> Path:
     """
     Priority:
-    1) env FATE_DB
-    2) ~/.fate/fate.db
+    1) profile from --profile / env FATE_PROFILE (see fate_core.profiles)
+    2) env FATE_DB
+    3) ~/.fate/fate.db
     """
+    profile_path = profiles.db_path(profiles.env_profile())
+    if profile_path is not None:
+        return profile_path
     p = os.environ.get("FATE_DB")
     if p:
         return Path(p).expanduser()
     return Path("~/.fate/fate.db").expanduser()
 
 
-def connect(db_path: Optional[Path] = None) -> sqlite3.Connection:
+def connect(db_path: Optional[Path] = None, read_only: bool = False) -> sqlite3.Connection:
+    """
+    WAL + tuned pragmas (see fate_core.connection); read_only=True for pure readers
+    (stats, exports) so they never take a write lock.
+    """
     db_path = (db_path or default_db_path()).expanduser().resolve()
-    db_path.parent.mkdir(parents=True, exist_ok=True)
+    return open_connection(db_path, read_only=read_only, foreign_keys=True)
+
+
+def connection(db_path: Optional[Path] = None, read_only: bool = False) -> AbstractContextManager[sqlite3.Connection]:
+    """
+    Pooled connection from the shared storage engine (fate_core.storage);
+    commits on exit. Prefer this over connect() so repeated calls reuse connections.
+    """
+    return get_storage(db_path or default_db_path()).connection(read_only=read_only)
+
 
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+def queued_write(func):
+    """
+    Run the decorated writer (first argument: db_path) on that DB's write queue, so CLI
+    writes are serialized and group-committed with the app's (see fate_core.storage).
+    Its connection() blocks share the batch transaction.
+    """
+
+    @functools.wraps(func)
+    def wrapper(db_path, *args, **kwargs):
+        storage = get_storage(db_path or default_db_path())
+        return storage.write(lambda conn: func(db_path, *args, **kwargs))
+
+    return wrapper
 
 
 SCHEMA = """
@@ -71,18 +102,80 @@ CREATE TABLE IF NOT EXISTS chests (
 """
 
 
+def _migration_1_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript(SCHEMA)
+
+
+def _migration_2_search(conn: sqlite3.Connection) -> None:
+    # notes become searchable through fate_core.search
+    search.install_source(conn, "gml_log")
+
+
+MIGRATIONS = [
+    (1, _migration_1_schema),
+    (2, _migration_2_search),
+]
+
+
+class _ReadCache:
+    """
+    Task list and per-date rollups of one DB, kept while the file is unchanged.
+    PRAGMA data_version on a dedicated read-only connection changes whenever any
+    other connection (this process, the app, another CLI) commits.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.watch = connect(db_path, read_only=True)
+        self.version: Optional[int] = None
+        self.tasks: Optional[list] = None
+        self.counts: Dict[str, Tuple[Dict[str, int], int, int]] = {}
+
+    def fresh(self) -> "_ReadCache":
+        version = self.watch.execute("PRAGMA data_version").fetchone()[0]
+        if version != self.version:
+            self.version = version
+            self.tasks = None
+            self.counts.clear()
+        return self
+
+
+_read_caches: Optional[Dict[Path, _ReadCache]] = None  # None = caching off (one-shot CLI)
+
+
+def enable_read_cache() -> None:
+    """Memoize list_tasks/counts_for_date per DB; for long-lived processes (fate serve)."""
+    global _read_caches
+    if _read_caches is None:
+        _read_caches = {}
+
+
+def _read_cache(db_path: Path) -> Optional[_ReadCache]:
+    if _read_caches is None:
+        return None
+    key = db_path.expanduser().resolve()
+    cache = _read_caches.get(key)
+    if cache is None:
+        if not key.exists():
+            return None
+        cache = _read_caches[key] = _ReadCache(key)
+    return cache.fresh()
+
+
+def _drop_read_cache(db_path: Path) -> None:
+    if _read_caches:
+        cache = _read_caches.pop(db_path.expanduser().resolve(), None)
+        if cache is not None:
+            cache.watch.close()
+
+
 def init_db(db_path: Path) -> None:
-    conn = connect(db_path)
-    try:
-        conn.executescript(SCHEMA)
-        conn.commit()
-    finally:
-        conn.close()
+    get_storage(db_path).migrate("gml", MIGRATIONS)
 
 
 def backup_before_write(db_path: Path) -> None:
     """
     Safety: before we write anything, copy the db to ~/.fate/backups/
+    (through the backup API, so commits still in the WAL are included)
     """
     db_path = db_path.expanduser().resolve()
     if not db_path.exists():
@@ -91,12 +184,25 @@ def backup_before_write(db_path: Path) -> None:
     backup_dir.mkdir(parents=True, exist_ok=True)
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_path = backup_dir / f"{db_path.stem}_{ts}{db_path.suffix}"
-    shutil.copy2(db_path, backup_path)
+    get_storage(db_path).backup_to(backup_path)
+
+
+def remove_db(db_path: Path) -> None:
+    """Close pooled connections and delete the DB file with its -wal/-shm siblings."""
+    db_path = db_path.expanduser().resolve()
+    _drop_read_cache(db_path)
+    close_storage(db_path)
+    for p in (db_path, Path(f"{db_path}-wal"), Path(f"{db_path}-shm")):
+        p.unlink(missing_ok=True)
+
+
+def daily_pass(counts: Dict[str, int]) -> bool:
+    return counts.get("BODY", 0) >= 1 and counts.get("MAIN", 0) >= 1 and counts.get("HOME", 0) >= 1
 
 
+@queued_write
 def seed_tasks_if_empty(db_path: Path) -> None:
-    conn = connect(db_path)
-    try:
+    with connection(db_path) as conn:
         n = conn.execute("SELECT COUNT(*) AS c FROM tasks;").fetchone()["c"]
         if n:
             return
@@ -111,40 +217,37 @@ def seed_tasks_if_empty(db_path: Path) -> None:
             "VALUES(?,?,?,?,?,?,1,?)",
             [(tid, name, dom, cad, mins, xp, now_ts()) for tid, name, dom, cad, mins, xp in rows],
         )
-        conn.commit()
-    finally:
-        conn.close()
 
 
 def list_tasks(db_path: Path):
-    conn = connect(db_path)
-    try:
-        return conn.execute(
+    cache = _read_cache(db_path)
+    if cache is not None and cache.tasks is not None:
+        return cache.tasks
+    with connection(db_path, read_only=True) as conn:
+        tasks = conn.execute(
             "SELECT id, name, domain, cadence, default_minutes, default_xp "
             "FROM tasks WHERE active=1 ORDER BY domain, id;"
         ).fetchall()
-    finally:
-        conn.close()
+    if cache is not None:
+        cache.tasks = tasks
+    return tasks
 
 
+@queued_write
 def add_task(db_path: Path, tid: str, name: str, domain: str, cadence: str, default_minutes: int, default_xp: int) -> None:
     if domain not in DOMAINS:
         raise ValueError(f"domain must be one of {DOMAINS}")
-    conn = connect(db_path)
-    try:
+    with connection(db_path) as conn:
         conn.execute(
             "INSERT INTO tasks(id,name,domain,cadence,default_minutes,default_xp,active,created_at) "
             "VALUES(?,?,?,?,?,?,1,?)",
             (tid, name, domain, cadence, int(default_minutes), int(default_xp), now_ts()),
         )
-        conn.commit()
-    finally:
-        conn.close()
 
 
+@queued_write
 def insert_log(db_path: Path, date_str: str, task_id: str, minutes: int, notes: str) -> None:
-    conn = connect(db_path)
-    try:
+    with connection(db_path) as conn:
         row = conn.execute(
             "SELECT default_xp FROM tasks WHERE id=? AND active=1;",
             (task_id,),
@@ -156,14 +259,14 @@ def insert_log(db_path: Path, date_str: str, task_id: str, minutes: int, notes:
             "INSERT INTO logs(ts,date,task_id,minutes,xp,notes) VALUES(?,?,?,?,?,?)",
             (now_ts(), date_str, task_id, int(minutes), xp, notes or ""),
         )
-        conn.commit()
-    finally:
-        conn.close()
 
 
 def counts_for_date(db_path: Path, date_str: str) -> Tuple[Dict[str, int], int, int]:
-    conn = connect(db_path)
-    try:
+    cache = _read_cache(db_path)
+    if cache is not None and date_str in cache.counts:
+        counts, total_mins, total_xp = cache.counts[date_str]
+        return dict(counts), total_mins, total_xp
+    with connection(db_path, read_only=True) as conn:
         rows = conn.execute(
             """
             SELECT t.domain AS domain,
@@ -178,26 +281,23 @@ def counts_for_date(db_path: Path, date_str: str) -> Tuple[Dict[str, int], int,
             (date_str,),
         ).fetchall()
 
-        counts = {d: 0 for d in DOMAINS}
-        total_mins = 0
-        total_xp = 0
-        for r in rows:
-            d = str(r["domain"])
-            counts[d] = int(r["n"])
-            total_mins += int(r["mins"])
-            total_xp += int(r["xp"])
-        return counts, total_mins, total_xp
-    finally:
-        conn.close()
+    counts = {d: 0 for d in DOMAINS}
+    total_mins = 0
+    total_xp = 0
+    for r in rows:
+        d = str(r["domain"])
+        counts[d] = int(r["n"])
+        total_mins += int(r["mins"])
+        total_xp += int(r["xp"])
+    if cache is not None:
+        cache.counts[date_str] = (dict(counts), total_mins, total_xp)
+    return counts, total_mins, total_xp
 
 
+@queued_write
 def mark_chest(db_path: Path, date_str: str, reveal: bool) -> None:
-    conn = connect(db_path)
-    try:
+    with connection(db_path) as conn:
         conn.execute("INSERT OR IGNORE INTO chests(date, eligible, revealed) VALUES(?,0,0);", (date_str,))
         conn.execute("UPDATE chests SET eligible=1 WHERE date=?;", (date_str,))
         if reveal:
             conn.execute("UPDATE chests SET revealed=1, revealed_ts=? WHERE date=?;", (now_ts(), date_str))
-        conn.commit()
-    finally:
-        conn.close()
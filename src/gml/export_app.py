@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from fate_core import crud
+from fate_core import db as core_db
+
+# (name, columns, rows(since, until)) per app table; rows stream from fate_core.crud
+Section = tuple[str, list[str], Callable[[Optional[str], Optional[str]], Iterator[list]]]
+
+HABIT_COLUMNS = ["id", "name", "group", "min_desc", "normal_desc", "min_xp", "normal_xp", "active", "sort_order"]
+QUEST_COLUMNS = ["id", "line_id", "chapter", "order_idx", "title", "dod", "difficulty", "is_boss", "active"]
+COMPLETION_COLUMNS = [
+    "id", "date", "quest_id", "minutes", "evidence_type", "evidence_text", "evidence_ref", "created_at",
+]
+
+
+def _rows(records, columns: list[str]) -> Iterator[list]:
+    for record in records:
+        yield [record[column] for column in columns]
+
+
+SECTIONS: list[Section] = [
+    ("habits", HABIT_COLUMNS, lambda since, until: _rows(crud.iter_habits(), HABIT_COLUMNS)),
+    ("quests", QUEST_COLUMNS, lambda since, until: _rows(crud.iter_quests(), QUEST_COLUMNS)),
+    (
+        "completions",
+        COMPLETION_COLUMNS,
+        lambda since, until: _rows(
+            crud.iter_quest_completions(start_date=since, end_date=until), COMPLETION_COLUMNS
+        ),
+    ),
+]
+
+
+def app_sections() -> list[Section]:
+    """The app tables to export, or none when the app DB (fate_core) has not been created."""
+    if not Path(core_db.current_db_path()).expanduser().exists():
+        return []
+    with core_db.db_connection(read_only=True) as conn:
+        present = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'habits'"
+        ).fetchone()
+    return SECTIONS if present else []
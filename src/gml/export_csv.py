@@ -4,7 +4,9 @@ import csv
 from pathlib import Path
 from typing import Optional
 
+from fate_core.records import iter_records
 from gml import db
+from gml.export_app import app_sections
 
 
 def export_csv_bundle(
@@ -21,7 +23,10 @@ def export_csv_bundle(
       - tasks.csv
       - log.csv   (aligned with your LOG sheet header)
       - chests.csv
+      - habits.csv / quests.csv / completions.csv (the app's tables, when its DB exists;
+        completions newest first)
 
+    Rows are streamed from the DB cursors into the files.
     since/until: filter by date (YYYY-MM-DD), inclusive.
     """
     db_path = db_path.expanduser().resolve()
@@ -39,9 +44,11 @@ def export_csv_bundle(
     ensure_not_exists(tasks_csv)
     ensure_not_exists(log_csv)
     ensure_not_exists(chests_csv)
+    sections = app_sections()
+    for name, _, _ in sections:
+        ensure_not_exists(out_dir / f"{name}.csv")
 
-    conn = db.connect(db_path)
-    try:
+    with db.connection(db_path, read_only=True) as conn:
         # TASKS
         tasks = conn.execute(
             """
@@ -49,7 +56,7 @@ def export_csv_bundle(
             FROM tasks
             ORDER BY domain, id
             """
-        ).fetchall()
+        )
 
         # LOG (joined)
         where = []
@@ -79,7 +86,7 @@ def export_csv_bundle(
             ORDER BY l.date, l.ts, l.id
             """,
             params,
-        ).fetchall()
+        )
 
         # CHESTS
         c_where = []
@@ -100,31 +107,34 @@ def export_csv_bundle(
             ORDER BY date
             """,
             c_params,
-        ).fetchall()
-
-    finally:
-        conn.close()
-
-    # Write tasks.csv
-    with tasks_csv.open("w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["id", "name", "domain", "cadence", "default_minutes", "default_xp", "active", "created_at"])
-        for r in tasks:
-            w.writerow([r["id"], r["name"], r["domain"], r["cadence"], r["default_minutes"], r["default_xp"], r["active"], r["created_at"]])
-
-    # Write log.csv (match your LOG sheet header)
-    with log_csv.open("w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["timestamp", "date", "task_id", "task_name", "domain", "minutes", "xp", "notes"])
-        for r in logs:
-            w.writerow([r["timestamp"], r["date"], r["task_id"], r["task_name"], r["domain"], r["minutes"], r["xp"], r["notes"]])
-
-    # Write chests.csv
-    with chests_csv.open("w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["date", "eligible", "revealed", "revealed_ts"])
-        for r in chests:
-            w.writerow([r["date"], r["eligible"], r["revealed"], r["revealed_ts"]])
+        )
+
+        # Write tasks.csv
+        with tasks_csv.open("w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["id", "name", "domain", "cadence", "default_minutes", "default_xp", "active", "created_at"])
+            for r in iter_records(tasks):
+                w.writerow([r["id"], r["name"], r["domain"], r["cadence"], r["default_minutes"], r["default_xp"], r["active"], r["created_at"]])
+
+        # Write log.csv (match your LOG sheet header)
+        with log_csv.open("w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["timestamp", "date", "task_id", "task_name", "domain", "minutes", "xp", "notes"])
+            for r in iter_records(logs):
+                w.writerow([r["timestamp"], r["date"], r["task_id"], r["task_name"], r["domain"], r["minutes"], r["xp"], r["notes"]])
+
+        # Write chests.csv
+        with chests_csv.open("w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["date", "eligible", "revealed", "revealed_ts"])
+            for r in iter_records(chests):
+                w.writerow([r["date"], r["eligible"], r["revealed"], r["revealed_ts"]])
+
+        for name, columns, rows in sections:
+            with (out_dir / f"{name}.csv").open("w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(columns)
+                w.writerows(rows(since, until))
 
     return out_dir
 
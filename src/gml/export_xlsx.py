@@ -7,7 +7,9 @@ import openpyxl
 from openpyxl.styles import Font
 from openpyxl.utils import get_column_letter
 
+from fate_core.records import iter_records
 from gml import db
+from gml.export_app import app_sections
 
 
 def _style_header(ws) -> None:
@@ -38,15 +40,15 @@ def export_xlsx(
     until: Optional[str] = None,
 ) -> Path:
     """
-    Export TASKS / LOG / CHESTS from SQLite into an .xlsx workbook.
+    Export TASKS / LOG / CHESTS (plus the app's HABITS / QUESTS / COMPLETIONS when its DB exists)
+    from SQLite into an .xlsx workbook; rows are streamed from the DB cursors.
     since/until: filter by date (YYYY-MM-DD), inclusive.
     """
     db_path = db_path.expanduser().resolve()
     out_path = out_path.expanduser().resolve()
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    conn = db.connect(db_path)
-    try:
+    with db.connection(db_path, read_only=True) as conn:
         # TASKS
         tasks = conn.execute(
             """
@@ -54,7 +56,7 @@ def export_xlsx(
             FROM tasks
             ORDER BY domain, id
             """
-        ).fetchall()
+        )
 
         # LOG (joined)
         where = []
@@ -84,7 +86,7 @@ def export_xlsx(
             ORDER BY l.date, l.ts, l.id
             """,
             params,
-        ).fetchall()
+        )
 
         # CHESTS
         c_where = []
@@ -105,37 +107,42 @@ def export_xlsx(
             ORDER BY date
             """,
             c_params,
-        ).fetchall()
-
-    finally:
-        conn.close()
-
-    wb = openpyxl.Workbook()
-
-    # TASKS sheet
-    ws = wb.active
-    ws.title = "TASKS"
-    ws.append(["id", "name", "domain", "cadence", "default_minutes", "default_xp", "active", "created_at"])
-    for r in tasks:
-        ws.append([r["id"], r["name"], r["domain"], r["cadence"], r["default_minutes"], r["default_xp"], r["active"], r["created_at"]])
-    _style_header(ws)
-    _autosize(ws)
-
-    # LOG sheet (align with your init_gml_xlsx.py header)
-    ws = wb.create_sheet("LOG")
-    ws.append(["timestamp", "date", "task_id", "task_name", "domain", "minutes", "xp", "notes"])
-    for r in logs:
-        ws.append([r["timestamp"], r["date"], r["task_id"], r["task_name"], r["domain"], r["minutes"], r["xp"], r["notes"]])
-    _style_header(ws)
-    _autosize(ws)
-
-    # CHESTS sheet
-    ws = wb.create_sheet("CHESTS")
-    ws.append(["date", "eligible", "revealed", "revealed_ts"])
-    for r in chests:
-        ws.append([r["date"], r["eligible"], r["revealed"], r["revealed_ts"]])
-    _style_header(ws)
-    _autosize(ws)
+        )
+
+        wb = openpyxl.Workbook()
+
+        # TASKS sheet
+        ws = wb.active
+        ws.title = "TASKS"
+        ws.append(["id", "name", "domain", "cadence", "default_minutes", "default_xp", "active", "created_at"])
+        for r in iter_records(tasks):
+            ws.append([r["id"], r["name"], r["domain"], r["cadence"], r["default_minutes"], r["default_xp"], r["active"], r["created_at"]])
+        _style_header(ws)
+        _autosize(ws)
+
+        # LOG sheet (align with your init_gml_xlsx.py header)
+        ws = wb.create_sheet("LOG")
+        ws.append(["timestamp", "date", "task_id", "task_name", "domain", "minutes", "xp", "notes"])
+        for r in iter_records(logs):
+            ws.append([r["timestamp"], r["date"], r["task_id"], r["task_name"], r["domain"], r["minutes"], r["xp"], r["notes"]])
+        _style_header(ws)
+        _autosize(ws)
+
+        # CHESTS sheet
+        ws = wb.create_sheet("CHESTS")
+        ws.append(["date", "eligible", "revealed", "revealed_ts"])
+        for r in iter_records(chests):
+            ws.append([r["date"], r["eligible"], r["revealed"], r["revealed_ts"]])
+        _style_header(ws)
+        _autosize(ws)
+
+        for name, columns, rows in app_sections():
+            ws = wb.create_sheet(name.upper())
+            ws.append(columns)
+            for row in rows(since, until):
+                ws.append(row)
+            _style_header(ws)
+            _autosize(ws)
 
     wb.save(str(out_path))
     return out_path
@@ -0,0 +1,146 @@
+"""
+`fate serve`: a long-running process on a local Unix socket that runs non-interactive
+fate-cli commands for thin clients (see gml.client), so each call skips interpreter
+start-up, imports and schema checks and reuses warm connections and cached rollups.
+
+Requests are handled one at a time: commands print to a redirected stdout and
+must not interleave.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import traceback
+from pathlib import Path
+
+from gml import client, db
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+        if request.get("op") == "stop":
+            self._reply({"code": 0, "stdout": "fate serve: stopping\n", "stderr": ""})
+            self.server.stopping = True
+            return
+        if request.get("op") == "ping":
+            self._reply({"code": 0, "stdout": "", "stderr": "", "pid": os.getpid()})
+            return
+        try:
+            reply = run_command(request.get("argv") or [], request.get("env") or {}, request.get("cwd"))
+        except Exception:
+            reply = {"code": 1, "stdout": "", "stderr": traceback.format_exc()}
+        self._reply(reply)
+
+    def _reply(self, payload: dict) -> None:
+        self.wfile.write(json.dumps(payload).encode("utf-8") + b"\n")
+
+
+class _Server(socketserver.UnixStreamServer):
+    stopping = False
+
+
+def run_command(argv: list[str], env: dict, cwd: str | None) -> dict:
+    """Run one registered command as the client would, with its env, cwd and captured output."""
+    from gml.cli import forwardable, resolve_command
+
+    if not forwardable(argv):
+        return {"code": 2, "stdout": "", "stderr": f"fate serve: not a forwardable command: {argv}\n"}
+    out, err = io.StringIO(), io.StringIO()
+    saved_env = {key: os.environ.get(key) for key in client.FORWARDED_ENV}
+    saved_cwd = os.getcwd()
+    code = 0
+    try:
+        for key in client.FORWARDED_ENV:
+            if env.get(key) is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = env[key]
+        if cwd:
+            try:
+                os.chdir(cwd)
+            except OSError as exc:
+                return {"code": 1, "stdout": "", "stderr": f"fate serve: cannot use cwd {cwd!r}: {exc}\n"}
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            handler, rest = resolve_command(argv)  # type: ignore[misc]
+            try:
+                handler(rest)
+            except SystemExit as exc:
+                if isinstance(exc.code, int) or exc.code is None:
+                    code = exc.code or 0
+                else:
+                    print(exc.code, file=sys.stderr)
+                    code = 1
+            except Exception:
+                traceback.print_exc()
+                code = 1
+    finally:
+        os.chdir(saved_cwd)
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    return {"code": code, "stdout": out.getvalue(), "stderr": err.getvalue()}
+
+
+def serve(sock_path: Path) -> None:
+    sock_path.parent.mkdir(parents=True, exist_ok=True)
+    if sock_path.exists():
+        try:
+            running = client.request(sock_path, {"op": "ping"}) is not None
+        except client.ServerError:
+            running = True  # accepted the connection, so something is listening
+        if running:
+            raise SystemExit(f"fate serve is already running on {sock_path}")
+        sock_path.unlink()  # stale socket from a crashed server
+    db.enable_read_cache()
+    old_umask = os.umask(0o077)  # socket only usable by this user
+    try:
+        server = _Server(str(sock_path), _Handler)
+    finally:
+        os.umask(old_umask)
+    print(f"fate serve: listening on {sock_path} (pid {os.getpid()})", flush=True)
+    try:
+        while not server.stopping:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        sock_path.unlink(missing_ok=True)
+
+
+def cmd_serve(argv: list[str]) -> None:
+    ap = argparse.ArgumentParser(
+        prog="fate serve",
+        description="Serve non-interactive fate-cli commands on a local Unix socket.",
+    )
+    ap.add_argument("--socket", type=str, default=str(client.socket_path()))
+    ap.add_argument("--stop", action="store_true", help="stop a running server")
+    ap.add_argument("--status", action="store_true", help="report whether a server is running")
+    args = ap.parse_args(argv)
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise SystemExit("fate serve needs Unix domain sockets.")
+    sock_path = Path(args.socket).expanduser().resolve()
+    if args.stop or args.status:
+        try:
+            reply = client.request(sock_path, {"op": "stop" if args.stop else "ping"})
+        except client.ServerError as exc:
+            raise SystemExit(f"fate serve: {exc}") from None
+        if reply is None:
+            raise SystemExit(f"fate serve: not running ({sock_path})")
+        print(reply.get("stdout") or f"fate serve: running (pid {reply.get('pid')})\n", end="")
+        return
+    serve(sock_path)
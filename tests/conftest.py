@@ -0,0 +1,16 @@
+import pytest
+
+from fate_core import cache, init_db
+from fate_core import db as core_db
+from fate_core.storage import close_storage
+
+
+@pytest.fixture
+def app_db(tmp_path, monkeypatch):
+    """A fresh, migrated fate_core DB as the current DB."""
+    path = str(tmp_path / "fate.db")
+    monkeypatch.setattr(core_db, "DB_PATH", path)
+    init_db()
+    yield path
+    cache.clear()
+    close_storage(path)
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+from fate_api.server import MAX_BATCH, Api
+from fate_core import crud
+from fate_core import db as core_db
+
+
+@pytest.fixture
+def api(app_db):
+    api = Api()
+    yield api
+    api.readers.shutdown()
+
+
+def _get(api: Api, target: str, etag: str = ""):
+    headers = {"if-none-match": etag} if etag else {}
+    return asyncio.run(api.dispatch("GET", target, headers, b""))
+
+
+def _post(api: Api, target: str, body: dict):
+    return asyncio.run(api.dispatch("POST", target, {}, json.dumps(body).encode()))
+
+
+def test_etag_answers_304_until_the_tables_change(api, app_db):
+    status, extra, _ = _get(api, "/habits")
+    assert status == 200
+    tag = extra["ETag"]
+    assert _get(api, "/habits", tag)[:2] == (304, {"ETag": tag, "Cache-Control": "no-cache"})
+    assert _get(api, "/habits?active_only=1", tag)[0] == 200  # params are part of the tag
+
+    _post(api, "/habits", {"name": "Walk", "group": "body"})
+    status, extra, body = _get(api, "/habits", tag)
+    assert status == 200 and extra["ETag"] != tag
+    assert [habit["name"] for habit in body] == ["Walk"]
+
+    # a commit by another process (the app, the CLI) moves the tag too
+    tag = extra["ETag"]
+    with sqlite3.connect(app_db) as conn:
+        conn.execute("UPDATE habits SET name = 'Run'")
+    status, _, body = _get(api, "/habits", tag)
+    assert status == 200 and body[0]["name"] == "Run"
+
+
+async def _http_get(reader, writer, target: str, etag: str) -> dict:
+    writer.write(f"GET {target} HTTP/1.1\r\nIf-None-Match: {etag}\r\n\r\n".encode())
+    status, *lines = (await reader.readuntil(b"\r\n\r\n")).decode().strip().split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines)
+    headers["status"] = status
+    headers["body"] = await reader.readexactly(int(headers["Content-Length"]))
+    return headers
+
+
+def test_304_over_http_has_no_body(api):
+    async def exchange():
+        server = await asyncio.start_server(api.handle, "127.0.0.1", 0)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            first = await _http_get(reader, writer, "/habits", "")
+            second = await _http_get(reader, writer, "/habits", first["ETag"])  # same keep-alive connection
+            writer.close()
+        return first, second
+
+    first, second = asyncio.run(exchange())
+    assert first["status"] == "HTTP/1.1 200 OK" and first["body"] == b"[]"
+    assert second["status"] == "HTTP/1.1 304 Not Modified" and second["body"] == b""
+    assert second["ETag"] == first["ETag"] and "Content-Type" not in second
+
+
+def test_batch_answers_in_order_in_one_write(api):
+    jobs = api.storage.write_metrics().get("jobs", 0)
+    status, _, body = _post(
+        api,
+        "/batch",
+        {
+            "requests": [
+                {"method": "POST", "path": "/habits", "params": {"name": "Walk", "group": "body"}},
+                {"method": "GET", "path": "/habits"},
+                "not an object",
+                {"method": "GET", "path": "/nope"},
+                {"method": "POST", "path": "/habits", "params": {"group": "body"}},
+            ]
+        },
+    )
+    assert status == 200
+    results = body["results"]
+    assert [result["status"] for result in results] == [200, 200, 400, 404, 400]
+    assert [habit["name"] for habit in results[1]["body"]] == ["Walk"]  # sees the earlier write
+    assert api.storage.write_metrics()["jobs"] == jobs + 1
+
+    # reads only: no write job
+    _post(api, "/batch", {"requests": [{"path": "/habits"}]})
+    assert api.storage.write_metrics()["jobs"] == jobs + 1
+
+
+def test_batch_rejects_bad_request_lists(api):
+    assert _post(api, "/batch", {"requests": {}})[0] == 400
+    too_many = [{"path": "/habits"}] * (MAX_BATCH + 1)
+    assert _post(api, "/batch", {"requests": too_many})[0] == 400
+
+
+def test_concurrent_writes_are_serialized(api):
+    line = crud.upsert_line("Line", "main", "goal", 1, 0)
+    for order in range(1, 6):
+        crud.upsert_quest(line, None, order, f"Quest {order}", "", 1, 0, 1)
+    body = json.dumps({"date": "2026-01-05", "line_id": line, "evidence_text": "done", "evidence_ref": "ref"})
+
+    async def complete_all():
+        return await asyncio.gather(
+            *(api.dispatch("POST", "/completions", {}, body.encode()) for _ in range(4))
+        )
+
+    replies = asyncio.run(complete_all())
+    assert [status for status, _, _ in replies] == [200] * 4
+    assert len({result["quest_id"] for _, _, result in replies}) == 4
+    assert _get(api, f"/quests/next?line_id={line}")[2]["order_idx"] == 5
+
+
+def test_db_path_is_resolved_against_the_start_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(core_db, "DB_PATH", core_db.DB_PATH)
+    monkeypatch.chdir(tmp_path)
+    assert core_db.set_db_path("data/fate.db") == str(tmp_path / "data" / "fate.db")
+    monkeypatch.chdir("/")
+    assert core_db.current_db_path() == str(tmp_path / "data" / "fate.db")
@@ -0,0 +1,16 @@
+import sqlite3
+
+import pytest
+
+from fate_core import cache
+from fate_core.storage import close_storage, get_storage
+
+
+def test_closing_storage_closes_its_watcher(app_db):
+    cache.sync(app_db, scope="w")
+    conn = cache._watchers["w"][0]
+    get_storage(app_db)
+    close_storage(app_db)
+    assert "w" not in cache._watchers
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
@@ -0,0 +1,19 @@
+import pytest
+
+from gml import cli
+
+
+def test_top_level_help_lists_every_command(capsys):
+    with pytest.raises(SystemExit):
+        cli.build_parser().parse_args(["--help"])
+    out = capsys.readouterr().out
+    for name in {prefix[0] for prefix in cli.COMMANDS}:
+        assert name in out
+
+
+def test_command_args_reach_the_handler_unparsed():
+    args, rest = cli.build_parser().parse_known_args(["task", "add", "--id", "X1", "--help"])
+    assert args.command == ("task", "add")
+    assert rest == ["--id", "X1", "--help"]
+    args, rest = cli.build_parser().parse_known_args(["--date", "2026-01-01"])
+    assert args.command is None and args.date == "2026-01-01" and rest == []
@@ -0,0 +1,59 @@
+import socket
+import threading
+
+import pytest
+
+from gml import client, server
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+
+
+@pytest.fixture
+def sock_path(tmp_path, monkeypatch):
+    path = tmp_path / "fate-cli.sock"
+    monkeypatch.setenv("FATE_SOCKET", str(path))
+    monkeypatch.delenv("FATE_NO_SERVER", raising=False)
+    return path
+
+
+def _listen_once(path, reply: bytes) -> threading.Thread:
+    """A server that reads one request line, sends `reply` and hangs up."""
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(path))
+    listener.listen(1)
+
+    def run():
+        conn, _ = listener.accept()
+        with conn, listener:
+            conn.makefile("rb").readline()
+            conn.sendall(reply)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_forward_runs_locally_only_without_a_server(sock_path):
+    assert client.forward(["stats"]) is None
+    sock_path.touch()  # stale socket file: connecting is refused, nothing was sent
+    assert client.forward(["stats"]) is None
+
+
+def test_forward_does_not_fall_back_after_sending(sock_path, capsys):
+    thread = _listen_once(sock_path, b"")  # server dies mid-command
+    assert client.forward(["stats"]) == 1
+    thread.join()
+    assert "may or may not have run" in capsys.readouterr().err
+
+
+def test_forward_replays_the_reply(sock_path, capsys):
+    thread = _listen_once(sock_path, b'{"code": 3, "stdout": "out\\n", "stderr": ""}\n')
+    assert client.forward(["stats"]) == 3
+    thread.join()
+    assert capsys.readouterr().out == "out\n"
+
+
+def test_run_command_reports_a_bad_cwd(tmp_path):
+    reply = server.run_command(["stats"], {}, str(tmp_path / "missing"))
+    assert reply["code"] == 1
+    assert "cannot use cwd" in reply["stderr"]
@@ -0,0 +1,36 @@
+from fate_core import crud
+from fate_core.db import db_connection
+from fate_core.records import fetch_records, iter_records
+
+
+def test_iter_records_streams_the_same_records(app_db):
+    line = crud.upsert_line("Line", "main", "goal", 1, 0)
+    for order in range(1, 8):
+        crud.upsert_quest(line, None, order, f"Quest {order}", "", 1, 0, 1)
+    sql = "SELECT * FROM quests ORDER BY id"
+    with db_connection(read_only=True) as conn:
+        expected = fetch_records(conn.execute(sql))
+        streamed = iter_records(conn.execute(sql), size=3)
+        assert next(streamed) == expected[0]
+        assert [expected[0], *streamed] == expected
+    assert list(crud.iter_quests(line)) == crud.list_quests(line)
+
+
+def test_iter_habits_matches_list_habits(app_db):
+    crud.upsert_habit("Walk", "health", "a", "b", 1, 2, 1, 1)
+    crud.upsert_habit("Read", "mind", "a", "b", 1, 2, 0, 0)
+    assert list(crud.iter_habits()) == crud.list_habits()
+    assert [habit["name"] for habit in crud.iter_habits(active_only=True)] == ["Walk"]
+
+
+def test_iter_quest_completions_walks_every_page(app_db):
+    line = crud.upsert_line("Line", "main", "goal", 1, 0)
+    quest = crud.upsert_quest(line, None, 1, "Quest", "", 1, 0, 1)
+    for day in range(1, 8):
+        crud.create_quest_completion(f"2026-01-{day:02d}", quest, 5, None, f"e{day}", "ref")
+    expected = crud.list_quest_completions()
+    assert list(crud.iter_quest_completions(page_size=3)) == expected
+    assert [row["date"] for row in crud.iter_quest_completions(start_date="2026-01-06", page_size=1)] == [
+        "2026-01-07",
+        "2026-01-06",
+    ]
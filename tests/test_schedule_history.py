@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+
+import pytest
+
+from fate_core import cache, crud, rules
+from fate_core.db import db_connection
+from fate_core.storage import get_storage
+
+TODAY = date.today()
+
+
+def _day(offset: int) -> str:
+    return (TODAY - timedelta(days=offset)).isoformat()
+
+
+def _sql(sql: str, *params) -> list:
+    with db_connection() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def _drain(app_db) -> None:
+    get_storage(app_db).write(lambda conn: None)  # wait for background perfect_days stores
+
+
+@pytest.fixture
+def habits(app_db):
+    """Two habits done on each of the last 10 days, with schedules in force for 30 days."""
+    walk = crud.upsert_habit("Walk", "health", "", "", 1, 2, 1, 0)
+    read = crud.upsert_habit("Read", "growth", "", "", 1, 2, 1, 1)
+    crud.upsert_habit_schedule(read, "always", None, None, None, None)
+    _sql("UPDATE habit_schedule_history SET valid_from = ?", _day(30))
+    cache.clear()
+    for offset in range(10):
+        rules.log_habit_status(_day(offset), walk, "normal")
+        rules.log_habit_status(_day(offset), read, "min")
+    return walk, read
+
+
+def test_schedule_edit_keeps_earlier_days(app_db, habits):
+    walk, read = habits
+    assert rules.compute_streak(_day(0)) == 10
+    _drain(app_db)
+    stored_before = _sql("SELECT date, perfect FROM perfect_days WHERE date < ? ORDER BY date", _day(0))
+
+    other_weekday = (TODAY.weekday() + 1) % 7
+    crud.upsert_habit_schedule(read, "weekly", str(other_weekday), None, None, None)
+
+    versions = _sql(
+        "SELECT valid_from, valid_to, schedule_type FROM habit_schedule_history WHERE habit_id = ? ORDER BY valid_from",
+        read,
+    )
+    assert [tuple(row) for row in versions] == [(_day(30), _day(0), "always"), (_day(0), None, "weekly")]
+    assert read in [habit["id"] for habit in rules.list_scheduled_habits(_day(1))]
+    assert read not in [habit["id"] for habit in rules.list_scheduled_habits(_day(0))]
+    assert rules.compute_streak(_day(0)) == 10
+    _drain(app_db)
+    assert _sql("SELECT date, perfect FROM perfect_days WHERE date < ? ORDER BY date", _day(0)) == stored_before
+
+    # an earlier day is still judged by the schedule in force on it
+    rules.log_habit_status(_day(3), read, "none")
+    assert rules.compute_streak(_day(0)) == 3
+
+
+def test_same_day_edits_collapse_into_one_version(app_db, habits):
+    _, read = habits
+    crud.upsert_habit_schedule(read, "weekly", "0", None, None, None)
+    crud.upsert_habit_schedule(read, "weekly", "0,3", None, None, None)
+    rows = _sql("SELECT valid_from, valid_to FROM habit_schedule_history WHERE habit_id = ?", read)
+    assert len(rows) == 2
+    current = _sql("SELECT weekly_mask FROM habit_schedule_history WHERE habit_id = ? AND valid_to IS NULL", read)
+    assert current[0]["weekly_mask"] == 0b1001
+
+
+def test_deactivation_applies_from_today_only(app_db, habits):
+    walk, _ = habits
+    crud.upsert_habit("Walk", "health", "", "", 1, 2, 0, 0, habit_id=walk)
+    rules.log_habit_status(_day(0), walk, "none")
+    assert walk not in [habit["id"] for habit in rules.list_scheduled_habits(_day(0))]
+    assert rules.compute_perfect_day(_day(0))
+    rules.log_habit_status(_day(1), walk, "none")
+    assert not rules.compute_perfect_day(_day(1))
+    assert rules.compute_streak(_day(0)) == 1
@@ -0,0 +1,73 @@
+import pytest
+
+from fate_api import routes
+from fate_api.server import Api
+from fate_core import cache, crud, init_db, rules
+from fate_core import db as core_db
+from fate_core.storage import close_storage, get_storage
+
+
+@pytest.fixture
+def line_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(core_db, "DB_PATH", str(tmp_path / "fate.db"))
+    init_db()
+    line = crud.upsert_line("Line", "main", "goal", 1, 0)
+    for order in range(1, 5):
+        crud.upsert_quest(line, None, order, f"Quest {order}", "", 1, 0, 1)
+    rules.get_next_quest(line)  # warm the read cache with quest 1
+    yield line
+    cache.clear()
+    close_storage(core_db.DB_PATH)
+
+
+def _complete(line: int) -> dict:
+    return routes.post_completion(
+        {"date": "2026-01-05", "line_id": line, "evidence_text": "done", "evidence_ref": "ref"}
+    )
+
+
+def test_concurrent_mainline_completions_take_distinct_quests(line_id):
+    storage = get_storage(core_db.current_db_path())
+    # submitted together so they share one group commit
+    futures = [storage.submit(lambda conn: _complete(line_id)) for _ in range(3)]
+    quest_ids = [future.result()["quest_id"] for future in futures]
+    assert len(set(quest_ids)) == 3
+    assert rules.get_next_quest(line_id)["order_idx"] == 4
+
+
+def test_batch_mainline_completions_take_distinct_quests(line_id):
+    api = Api()
+    item = {
+        "method": "POST",
+        "path": "/completions",
+        "params": {"date": "2026-01-05", "line_id": line_id, "evidence_text": "done", "evidence_ref": "ref"},
+    }
+    results = api.storage.write(lambda conn: api.run_batch([item, item]))
+    assert [result["status"] for result in results] == [200, 200]
+    assert results[0]["body"]["quest_id"] != results[1]["body"]["quest_id"]
+
+
+def test_cli_writes_go_through_the_write_queue(tmp_path):
+    from gml import db as gml_db
+
+    path = tmp_path / "gml.db"
+    gml_db.init_db(path)
+    try:
+        gml_db.seed_tasks_if_empty(path)
+        gml_db.insert_log(path, "2026-01-05", "B001", 20, "")
+        with pytest.raises(ValueError):
+            gml_db.insert_log(path, "2026-01-05", "NOPE", 5, "")  # rolled back, queue keeps going
+        gml_db.mark_chest(path, "2026-01-05", reveal=False)
+        assert get_storage(path).write_metrics()["jobs"] == 4
+        assert gml_db.counts_for_date(path, "2026-01-05")[0]["BODY"] == 1
+    finally:
+        close_storage(path)
+
+
+def test_settings_flush_goes_through_the_write_queue(app_db):
+    jobs = get_storage(app_db).write_metrics().get("jobs", 0)
+    crud.set_setting("focus_line_id", "3", defer=True)
+    crud.flush_settings(force=True)
+    assert get_storage(app_db).write_metrics()["jobs"] == jobs + 1
+    cache.clear()
+    assert crud.get_setting("focus_line_id") == "3"
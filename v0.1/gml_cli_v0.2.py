@@ -10,16 +10,21 @@ Sheets expected in xlsx:
 - CONFIG:  Key | Value | Note
 - STATE:   Key | Value | Note
 - Rewards: Week_Start | Week_End | Qualified | Streak_Weeks_After | Chest_Floor | Chest_Roll | Pity_b_no_a | Pity_a_no_s | Note
+
+Tuning: `python gml_cli_v0.2.py sim --pity-B-to-A 3,4,6 --pity-A-to-S 6,8` Monte-Carlos tier
+frequencies and pity-trigger rates per config (see cmd_sim).
 """
 
 from __future__ import annotations
 import argparse
 import datetime as dt
 import os
+import random
 import sys
 from dataclasses import dataclass
 from typing import Dict, List, Tuple, Optional
 
+import numpy as np
 from openpyxl import load_workbook
 from openpyxl.workbook.workbook import Workbook
 
@@ -59,10 +64,6 @@ def parse_hhmm(s: str) -> Optional[int]:
         return None
 
 
-def in_window(value_min: int, target_min: int, tol_min: int) -> bool:
-    return (target_min - tol_min) <= value_min <= (target_min + tol_min)
-
-
 def load_wb(path: str) -> Workbook:
     if not os.path.exists(path):
         raise FileNotFoundError(f"Excel file not found: {path}")
@@ -158,10 +159,45 @@ def append_log(wb: Workbook, date: dt.date, task_id: str, minutes: int, meta: st
     wb[S_LOG].append([date.isoformat(), task_id.upper(), int(minutes), meta])
 
 
-def iter_log(wb: Workbook) -> List[Tuple[dt.date, str, int, str]]:
+@dataclass
+class LogColumns:
+    """
+    Columnar Log, sorted by date so any week is one contiguous slice.
+    tmin holds the pre-parsed HH:MM of `t=HH:MM` meta in minutes (-1 if none).
+    """
+    ordinal: np.ndarray  # int64 date.toordinal()
+    task: np.ndarray     # int32 code into task_ids
+    minutes: np.ndarray  # int32
+    tmin: np.ndarray     # int16
+    task_ids: List[str]
+
+    def code(self, task_id: str) -> int:
+        try:
+            return self.task_ids.index(task_id)
+        except ValueError:
+            return -1
+
+    def week_slice(self, week_start: dt.date, week_end: dt.date) -> slice:
+        lo = int(np.searchsorted(self.ordinal, week_start.toordinal(), side="left"))
+        hi = int(np.searchsorted(self.ordinal, week_end.toordinal(), side="right"))
+        return slice(lo, hi)
+
+
+def meta_minutes(meta: str) -> Optional[int]:
+    tstr = meta
+    if "t=" in meta:
+        tstr = meta.split("t=", 1)[1].strip()
+    return parse_hhmm(tstr)
+
+
+def load_log_columns(wb: Workbook) -> LogColumns:
     ws = wb[S_LOG]
-    out: List[Tuple[dt.date, str, int, str]] = []
-    for row in ws.iter_rows(min_row=2, values_only=True):
+    codes: Dict[str, int] = {}
+    ordinal: List[int] = []
+    task: List[int] = []
+    minutes: List[int] = []
+    tmin: List[int] = []
+    for row in ws.iter_rows(min_row=2, max_col=4, values_only=True):
         if not row or not row[0] or not row[1]:
             continue
         try:
@@ -169,10 +205,21 @@ def iter_log(wb: Workbook) -> List[Tuple[dt.date, str, int, str]]:
         except Exception:
             continue
         tid = str(row[1]).strip().upper()
-        mins = int(row[2] or 0)
-        meta = "" if row[3] is None else str(row[3]).strip()
-        out.append((d, tid, mins, meta))
-    return out
+        meta = "" if len(row) < 4 or row[3] is None else str(row[3]).strip()
+        ordinal.append(d.toordinal())
+        task.append(codes.setdefault(tid, len(codes)))
+        minutes.append(int(row[2] or 0))
+        t = meta_minutes(meta) if meta else None
+        tmin.append(-1 if t is None else t)
+
+    order = np.argsort(np.asarray(ordinal, dtype=np.int64), kind="stable")
+    return LogColumns(
+        ordinal=np.asarray(ordinal, dtype=np.int64)[order],
+        task=np.asarray(task, dtype=np.int32)[order],
+        minutes=np.asarray(minutes, dtype=np.int32)[order],
+        tmin=np.asarray(tmin, dtype=np.int16)[order],
+        task_ids=list(codes),
+    )
 
 
 # ===== Weekly window: last full week ending on last Sunday strictly before today =====
@@ -204,13 +251,25 @@ def chest_floor_from_streak(streak: int, streak_map: List[Tuple[int, str]]) -> s
     return floor
 
 
+# Tier order + per-floor cumulative distribution: P(tier <= k | floor).
+# roll r ~ U[0,1) lands on the first tier whose cumulative value is > r.
+TIERS = ("D", "C", "B", "A", "S")
+CHEST_CDF: Dict[str, Tuple[float, ...]] = {
+    "D": (0.80, 0.98, 1.00, 1.00, 1.00),
+    "C": (0.00, 0.70, 0.95, 1.00, 1.00),
+    "B": (0.00, 0.00, 0.70, 0.95, 1.00),
+    "A": (0.00, 0.00, 0.00, 0.85, 1.00),
+    "S": (0.00, 0.00, 0.00, 0.00, 1.00),
+}
+
+
 def roll_chest(floor: str, pity_b_no_a: int, pity_a_no_s: int,
-              pity_B_to_A: int, pity_A_to_S: int) -> Tuple[str, int, int]:
+              pity_B_to_A: int, pity_A_to_S: int,
+              rng: Optional[random.Random] = None) -> Tuple[str, int, int]:
     """
     NO reward pool, only returns tier.
-    Default distributions (you can tweak later).
+    Default distributions live in CHEST_CDF (you can tweak later).
     """
-    import random
     floor = floor.upper()
 
     # pity triggers
@@ -219,17 +278,9 @@ def roll_chest(floor: str, pity_b_no_a: int, pity_a_no_s: int,
     if floor == "A" and pity_a_no_s >= pity_A_to_S:
         return "S", pity_b_no_a, 0
 
-    r = random.random()
-    if floor == "D":
-        tier = "D" if r < 0.80 else ("C" if r < 0.98 else "B")
-    elif floor == "C":
-        tier = "C" if r < 0.70 else ("B" if r < 0.95 else "A")
-    elif floor == "B":
-        tier = "B" if r < 0.70 else ("A" if r < 0.95 else "S")
-    elif floor == "A":
-        tier = "A" if r < 0.85 else "S"
-    else:
-        tier = "S"
+    r = (rng or random).random()
+    cdf = CHEST_CDF.get(floor, CHEST_CDF["S"])
+    tier = next((t for t, c in zip(TIERS, cdf) if r < c), "S")
 
     # update pity
     if floor == "B":
@@ -239,6 +290,145 @@ def roll_chest(floor: str, pity_b_no_a: int, pity_a_no_s: int,
     return tier, pity_b_no_a, pity_a_no_s
 
 
+# ===== Monte-Carlo simulation of the weekly chest / pity system =====
+@dataclass(frozen=True)
+class ChestConfig:
+    streak_map: str
+    pity_B_to_A: int
+    pity_A_to_S: int
+
+
+def _simulate_batch(cfg: ChestConfig, trajectories: int, weeks: int, qualify_p: float,
+                    seed: np.random.SeedSequence) -> np.ndarray:
+    """
+    Run `trajectories` independent players for `weeks` weekly reveals, all at once:
+    one batched uniform draw per week for qualification and one for the roll.
+    Returns counts: [tier D..S (5), weeks not qualified, B->A pity, A->S pity].
+    """
+    rng = np.random.default_rng(seed)
+    pairs = parse_streak_map(cfg.streak_map)
+    thresholds = np.array([n for n, _ in pairs], dtype=np.int64)
+    map_tiers = np.array([TIERS.index(t) for _, t in pairs], dtype=np.int8)
+    cdf = np.array([CHEST_CDF[t] for t in TIERS])
+    b_idx, a_idx, s_idx = TIERS.index("B"), TIERS.index("A"), TIERS.index("S")
+
+    streak = np.zeros(trajectories, dtype=np.int64)
+    pity_b = np.zeros(trajectories, dtype=np.int64)
+    pity_a = np.zeros(trajectories, dtype=np.int64)
+    counts = np.zeros(len(TIERS) + 3, dtype=np.int64)
+
+    for _ in range(weeks):
+        qualified = rng.random(trajectories) < qualify_p
+        counts[len(TIERS)] += trajectories - int(np.count_nonzero(qualified))
+        # not qualified: streak resets, pity is kept (same as reveal_weekly)
+        streak = np.where(qualified, streak + 1, 0)
+
+        q_streak = streak[qualified]
+        # chest_floor_from_streak: last map entry with n <= streak, "D" below the first
+        pos = np.searchsorted(thresholds, q_streak, side="right") - 1
+        floor = np.where(pos >= 0, map_tiers[np.maximum(pos, 0)], 0)
+
+        r = rng.random(q_streak.size)
+        tier = (r[:, None] >= cdf[floor]).sum(axis=1)
+
+        pb = pity_b[qualified]
+        pa = pity_a[qualified]
+        on_b = floor == b_idx
+        on_a = floor == a_idx
+        trig_b = on_b & (pb >= cfg.pity_B_to_A)
+        trig_a = on_a & (pa >= cfg.pity_A_to_S)
+        tier = np.where(trig_b, a_idx, np.where(trig_a, s_idx, tier))
+        counts[len(TIERS) + 1] += int(np.count_nonzero(trig_b))
+        counts[len(TIERS) + 2] += int(np.count_nonzero(trig_a))
+
+        pity_b[qualified] = np.where(on_b, np.where(tier >= a_idx, 0, pb + 1), pb)
+        pity_a[qualified] = np.where(on_a, np.where(tier == s_idx, 0, pa + 1), pa)
+        counts[: len(TIERS)] += np.bincount(tier, minlength=len(TIERS))
+
+    return counts
+
+
+def _simulate_job(job: Tuple[int, ChestConfig, int, int, float, np.random.SeedSequence]) -> Tuple[int, np.ndarray]:
+    idx, cfg, trajectories, weeks, qualify_p, seed = job
+    return idx, _simulate_batch(cfg, trajectories, weeks, qualify_p, seed)
+
+
+def simulate_chests(configs: List[ChestConfig], trajectories: int, weeks: int, qualify_p: float,
+                    seed: int = 0, workers: int = 1, chunk: int = 200_000) -> List[Dict[str, float]]:
+    """
+    Monte-Carlo sweep over chest configs. Trajectories are split into chunks,
+    each with its own child SeedSequence, so results are reproducible for a
+    given seed regardless of worker count.
+    """
+    seeds = np.random.SeedSequence(seed)
+    jobs = []
+    for i, cfg in enumerate(configs):
+        n_chunks = max(1, -(-trajectories // chunk))
+        for k, child in enumerate(seeds.spawn(1)[0].spawn(n_chunks)):
+            size = min(chunk, trajectories - k * chunk)
+            jobs.append((i, cfg, size, weeks, qualify_p, child))
+
+    totals = [np.zeros(len(TIERS) + 3, dtype=np.int64) for _ in configs]
+    if workers > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for idx, counts in pool.map(_simulate_job, jobs):
+                totals[idx] += counts
+    else:
+        for job in jobs:
+            idx, counts = _simulate_job(job)
+            totals[idx] += counts
+
+    report = []
+    for cfg, c in zip(configs, totals):
+        chests = int(c[: len(TIERS)].sum())
+        row: Dict[str, float] = {
+            "streak_map": cfg.streak_map,
+            "pity_B_to_A": cfg.pity_B_to_A,
+            "pity_A_to_S": cfg.pity_A_to_S,
+            "weeks": trajectories * weeks,
+            "chests": chests,
+        }
+        for t, n in zip(TIERS, c[: len(TIERS)]):
+            row[t] = n / chests if chests else 0.0
+        row["pity_B_to_A_rate"] = c[len(TIERS) + 1] / chests if chests else 0.0
+        row["pity_A_to_S_rate"] = c[len(TIERS) + 2] / chests if chests else 0.0
+        report.append(row)
+    return report
+
+
+def cmd_sim(argv: List[str]) -> None:
+    ap = argparse.ArgumentParser(prog="gml sim", description="Monte-Carlo the weekly chest / pity system.")
+    ap.add_argument("--file", default=None, help="read chest_streak_map / pity_* defaults from CONFIG")
+    ap.add_argument("--streak-map", action="append", default=None, help="repeatable, e.g. 1:D,2:C,4:B,8:A,16:S")
+    ap.add_argument("--pity-B-to-A", default=None, help="comma separated values to sweep")
+    ap.add_argument("--pity-A-to-S", default=None, help="comma separated values to sweep")
+    ap.add_argument("--trajectories", type=int, default=100_000)
+    ap.add_argument("--weeks", type=int, default=52)
+    ap.add_argument("--qualify-p", type=float, default=0.8, help="chance a week qualifies")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args(argv)
+
+    cfg = read_kv(load_wb(args.file), S_CONFIG) if args.file else {}
+    streak_maps = args.streak_map or [cfg.get("chest_streak_map", "1:D,2:C,4:B,8:A,16:S")]
+    b_to_a = [int(x) for x in (args.pity_B_to_A or cfg.get("pity_B_to_A", "4") or "4").split(",")]
+    a_to_s = [int(x) for x in (args.pity_A_to_S or cfg.get("pity_A_to_S", "8") or "8").split(",")]
+    configs = [ChestConfig(m, b, a) for m in streak_maps for b in b_to_a for a in a_to_s]
+
+    report = simulate_chests(configs, args.trajectories, args.weeks, args.qualify_p,
+                             seed=args.seed, workers=args.workers)
+
+    print(f"\n{args.trajectories} trajectories x {args.weeks} weeks, qualify_p={args.qualify_p}, seed={args.seed}")
+    print(f"  {'streak_map':<24} {'B>A':>4} {'A>S':>4}  " + " ".join(f"{t:>6}" for t in TIERS)
+          + "  pityBA  pityAS")
+    for row in report:
+        print(f"  {row['streak_map']:<24} {row['pity_B_to_A']:>4} {row['pity_A_to_S']:>4}  "
+              + " ".join(f"{row[t]:6.2%}" for t in TIERS)
+              + f"  {row['pity_B_to_A_rate']:6.2%}  {row['pity_A_to_S_rate']:6.2%}")
+
+
 def already_opened(wb: Workbook, week_start: dt.date, week_end: dt.date) -> bool:
     ws = wb[S_REWARDS]
     for row in ws.iter_rows(min_row=2, values_only=True):
@@ -249,53 +439,41 @@ def already_opened(wb: Workbook, week_start: dt.date, week_end: dt.date) -> bool
     return False
 
 
-def week_stats(wb: Workbook, week_start: dt.date, week_end: dt.date, cfg: Dict[str, str]) -> Dict[str, int]:
-    logs = iter_log(wb)
+def week_stats(log: LogColumns, week_start: dt.date, week_end: dt.date, cfg: Dict[str, str]) -> Dict[str, int]:
     deep_thr = int(cfg.get("deep_minutes_threshold", "30") or 30)
 
-    days = [week_start + dt.timedelta(days=i) for i in range(7)]
-    food_done = {d: set() for d in days}
-    sleep_ok = {d: {"SLEEP_PM": False, "WAKE_AM": False} for d in days}
-
     bed_target = parse_hhmm(cfg.get("sleep_bed_target", "22:10")) or (22 * 60 + 10)
     bed_tol = int(cfg.get("sleep_bed_tol_min", "20") or 20)
     wake_target = parse_hhmm(cfg.get("wake_target", "07:30")) or (7 * 60 + 30)
     wake_tol = int(cfg.get("wake_tol_min", "10") or 10)
 
-    deep_math = 0
-    deep_code = 0
-
-    for d, tid, mins, meta in logs:
-        if d < week_start or d > week_end:
-            continue
-
-        if tid == "MATH01" and mins >= deep_thr:
-            deep_math += 1
-        if tid == "CODE01" and mins >= deep_thr:
-            deep_code += 1
-
-        if tid in ("FOOD_B", "FOOD_L", "FOOD_D"):
-            food_done[d].add(tid)
-
-        if tid in ("SLEEP_PM", "WAKE_AM"):
-            tstr = meta
-            if "t=" in meta:
-                tstr = meta.split("t=", 1)[1].strip()
-            val = parse_hhmm(tstr)
-            if val is None:
-                continue
-            if tid == "SLEEP_PM" and in_window(val, bed_target, bed_tol):
-                sleep_ok[d]["SLEEP_PM"] = True
-            if tid == "WAKE_AM" and in_window(val, wake_target, wake_tol):
-                sleep_ok[d]["WAKE_AM"] = True
-
-    pass_days = 0
-    for d in days:
-        food_ok = food_done[d] >= {"FOOD_B", "FOOD_L", "FOOD_D"}
-        day_sleep_ok = sleep_ok[d]["SLEEP_PM"] and sleep_ok[d]["WAKE_AM"]
-        if food_ok and day_sleep_ok:
-            pass_days += 1
-
+    # only this week's rows; day = 0..6 offset from week_start
+    sl = log.week_slice(week_start, week_end)
+    day = log.ordinal[sl] - week_start.toordinal()
+    task = log.task[sl]
+    mins = log.minutes[sl]
+    tmin = log.tmin[sl]
+
+    deep = mins >= deep_thr
+    deep_math = int(np.count_nonzero(deep & (task == log.code("MATH01"))))
+    deep_code = int(np.count_nonzero(deep & (task == log.code("CODE01"))))
+
+    def days_with(mask: np.ndarray) -> np.ndarray:
+        hit = np.zeros(7, dtype=bool)
+        hit[day[mask]] = True
+        return hit
+
+    def timed_ok(tid: str, target: int, tol: int) -> np.ndarray:
+        return days_with(
+            (task == log.code(tid)) & (tmin >= 0) & (tmin >= target - tol) & (tmin <= target + tol)
+        )
+
+    food_ok = np.ones(7, dtype=bool)
+    for tid in ("FOOD_B", "FOOD_L", "FOOD_D"):
+        food_ok &= days_with(task == log.code(tid))
+    sleep_ok = timed_ok("SLEEP_PM", bed_target, bed_tol) & timed_ok("WAKE_AM", wake_target, wake_tol)
+
+    pass_days = int(np.count_nonzero(food_ok & sleep_ok))
     deep_total = deep_math + deep_code
     return {"pass_days": pass_days, "deep_total": deep_total, "deep_math": deep_math, "deep_code": deep_code}
 
@@ -312,7 +490,7 @@ def reveal_weekly(wb: Workbook, today: dt.date) -> None:
         print("Already opened. (See Rewards sheet)")
         return
 
-    stats = week_stats(wb, week_start, week_end, cfg)
+    stats = week_stats(load_log_columns(wb), week_start, week_end, cfg)
 
     req_pass = int(cfg.get("weekly_pass_days_required", "5") or 5)
     req_deep = int(cfg.get("weekly_deep_sessions_required", "5") or 5)
@@ -364,6 +542,9 @@ def reveal_weekly(wb: Workbook, today: dt.date) -> None:
 
 
 def main() -> None:
+    if len(sys.argv) >= 2 and sys.argv[1] == "sim":
+        cmd_sim(sys.argv[2:])
+        return
     ap = argparse.ArgumentParser()
     ap.add_argument("--file", default="GML_v0_1.xlsx")
     ap.add_argument("--date", default=None)